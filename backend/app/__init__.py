@@ -1,10 +1,18 @@
 from datetime import timedelta
-from flask import Flask, jsonify, send_from_directory, abort
+from flask import Flask, jsonify, abort
 
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 import os
-from .db.database import close_db
+from .db.database import close_db, init_engine
+from .db.query_stats import init_query_stats
+from .db.reference_cache import init_reference_cache
+from .db.change_feed import init_change_feed
+from .db.tombstones import init_tombstone_pruning
+from .utils.password_hashing import init_password_hasher
+from .utils.rate_limit import init_rate_limiter
+from .utils.json_utils import init_json
+from .utils.compression import init_compression, send_precompressed
 
 jwt = JWTManager()
 
@@ -27,6 +35,37 @@ def create_app() -> Flask:
         DB_PASSWORD=os.environ.get("DB_PASSWORD"),
         DB_HOST=os.environ.get("DB_HOST", "localhost"),
         DB_PORT=os.environ.get("DB_PORT", "5432"),
+        DB_POOL_SIZE=int(os.environ.get("DB_POOL_SIZE", 5)),
+        DB_MAX_OVERFLOW=int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        DB_POOL_RECYCLE=int(os.environ.get("DB_POOL_RECYCLE", 1800)),
+        DB_POOL_TIMEOUT=int(os.environ.get("DB_POOL_TIMEOUT", 30)),
+        DB_POOL_SLOW_ACQUIRE_MS=float(os.environ.get("DB_POOL_SLOW_ACQUIRE_MS", 100)),
+        DB_QUERY_REPEAT_THRESHOLD=int(os.environ.get("DB_QUERY_REPEAT_THRESHOLD", 10)),
+        SERVER_TIMING_ENABLED=os.environ.get("SERVER_TIMING_ENABLED", "true").lower() in ("1", "true", "yes"),
+        ACCESS_LOG_ENABLED=os.environ.get("ACCESS_LOG_ENABLED", "true").lower() in ("1", "true", "yes"),
+        DB_NOTIFY_ENABLED=os.environ.get("DB_NOTIFY_ENABLED", "true").lower() in ("1", "true", "yes"),
+        REFERENCE_CACHE_TTL=float(os.environ.get("REFERENCE_CACHE_TTL", 30)),
+        CHANGE_STREAM_MAX_CLIENTS=int(os.environ.get("CHANGE_STREAM_MAX_CLIENTS", 50)),
+        CHANGE_STREAM_QUEUE_SIZE=int(os.environ.get("CHANGE_STREAM_QUEUE_SIZE", 500)),
+        CHANGE_STREAM_HEARTBEAT=float(os.environ.get("CHANGE_STREAM_HEARTBEAT", 15)),
+        CHANGE_STREAM_MAX_SECONDS=float(os.environ.get("CHANGE_STREAM_MAX_SECONDS", 300)),
+        CHANGE_STREAM_RETRY_MS=int(os.environ.get("CHANGE_STREAM_RETRY_MS", 3000)),
+        DELETED_ROWS_RETENTION_DAYS=float(os.environ.get("DELETED_ROWS_RETENTION_DAYS", 30)),
+        DELETED_ROWS_PRUNE_INTERVAL=float(os.environ.get("DELETED_ROWS_PRUNE_INTERVAL", 3600)),
+        PASSWORD_HASH_METHOD=os.environ.get("PASSWORD_HASH_METHOD", "scrypt"),
+        PASSWORD_HASH_WORKERS=int(os.environ.get("PASSWORD_HASH_WORKERS", 2)),
+        PASSWORD_HASH_QUEUE_SIZE=int(os.environ.get("PASSWORD_HASH_QUEUE_SIZE", 16)),
+        PASSWORD_HASH_RETRY_AFTER=int(os.environ.get("PASSWORD_HASH_RETRY_AFTER", 1)),
+        JSON_SERIALIZER=os.environ.get("JSON_SERIALIZER", "auto"),
+        COMPRESSION_ENABLED=os.environ.get("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes"),
+        COMPRESSION_MIN_SIZE=int(os.environ.get("COMPRESSION_MIN_SIZE", 1024)),
+        COMPRESSION_GZIP_LEVEL=int(os.environ.get("COMPRESSION_GZIP_LEVEL", 6)),
+        COMPRESSION_BROTLI_QUALITY=int(os.environ.get("COMPRESSION_BROTLI_QUALITY", 4)),
+        COMPRESSION_STREAMING=os.environ.get("COMPRESSION_STREAMING", "true").lower() in ("1", "true", "yes"),
+        RATE_LIMIT_ENABLED=os.environ.get("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes"),
+        RATE_LIMIT_STORAGE_URL=os.environ.get("RATE_LIMIT_STORAGE_URL", "memory://"),
+        AUTH_RATE_LIMIT_PER_IP=os.environ.get("AUTH_RATE_LIMIT_PER_IP", "30/minute"),
+        AUTH_RATE_LIMIT_PER_EMAIL=os.environ.get("AUTH_RATE_LIMIT_PER_EMAIL", "5/minute"),
         JWT_SECRET_KEY=os.environ.get("JWT_SECRET_KEY", "super-secret"),
         JWT_TOKEN_LOCATION=["cookies"],
         JWT_COOKIE_SECURE=False,  # True in production (HTTPS only)
@@ -36,6 +75,15 @@ def create_app() -> Flask:
         JWT_REFRESH_TOKEN_EXPIRES=timedelta(days=int(os.environ.get("JWT_REFRESH_TOKEN_EXPIRES_DAYS", 10))),
     )
     
+    init_engine(app)
+    init_query_stats(app)
+    init_reference_cache(app)
+    init_change_feed(app)
+    init_tombstone_pruning(app)
+    init_password_hasher(app)
+    init_rate_limiter(app)
+    init_json(app)
+    init_compression(app)
     app.teardown_appcontext(close_db)
     app.url_map.strict_slashes = False
 
@@ -54,6 +102,8 @@ def create_app() -> Flask:
     from .colleges.routes import bp as colleges_bp
     from .auth.routes import bp as auth_bp
     from .users.routes import bp as users_bp
+    from .internal.routes import bp as internal_bp
+    from .changes.routes import bp as changes_bp
 
     base = app.config["API_PREFIX"]
     app.register_blueprint(auth_bp, url_prefix=f"{base}/auth")
@@ -61,6 +111,8 @@ def create_app() -> Flask:
     app.register_blueprint(programs_bp, url_prefix=f"{base}/programs")
     app.register_blueprint(students_bp, url_prefix=f"{base}/students")
     app.register_blueprint(users_bp, url_prefix=f"{base}/users")
+    app.register_blueprint(internal_bp, url_prefix=f"{base}/internal")
+    app.register_blueprint(changes_bp, url_prefix=f"{base}/changes")
 
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
@@ -71,7 +123,7 @@ def create_app() -> Flask:
         index_path = os.path.join(app.template_folder, 'index.html')
         
         if os.path.exists(index_path):
-            return send_from_directory(app.template_folder, 'index.html')
+            return send_precompressed(app.template_folder, 'index.html')
         
         return "Index not built. Run frontend build: npm run build:flask", 500
 
@@ -7,12 +7,15 @@ from flask_jwt_extended import (
     get_jwt_identity,
 )
 from ..utils.route_utils import make_response
+from ..utils.rate_limit import rate_limit, client_ip, submitted_email
 from .services import create_user, authenticate_user, get_user_by_id
 
 bp = Blueprint("auth", __name__)
 
 
 @bp.post("/signup")
+@rate_limit("signup-ip", client_ip, "AUTH_RATE_LIMIT_PER_IP")
+@rate_limit("signup-email", submitted_email, "AUTH_RATE_LIMIT_PER_EMAIL")
 def signup():
     try:
         data = request.get_json(force=True)
@@ -31,7 +34,10 @@ def signup():
         result = create_user(username, email, password, role)
         
         if result["success"]:
-            access_token = create_access_token(identity=str(result["user"]["user_id"]))
+            access_token = create_access_token(
+                identity=str(result["user"]["user_id"]),
+                additional_claims=result["claims"]
+            )
 
             resp = make_response({
                 "status": "success",
@@ -44,8 +50,12 @@ def signup():
         else:
             # Return appropriate error response based on error code
             status_code = 400
+            headers = None
             if result["error_code"] in ["USERNAME_EXISTS", "EMAIL_EXISTS"]:
                 status_code = 409  # Conflict
+            elif result["error_code"] == "PASSWORD_HASHER_BUSY":
+                status_code = 503
+                headers = {"Retry-After": str(result["retry_after"])}
             elif result["error_code"] == "DATABASE_ERROR":
                 status_code = 500
             
@@ -54,7 +64,7 @@ def signup():
                 "message": result["message"],
                 "error_code": result["error_code"],
                 "details": result.get("details", {})
-            }, status_code)
+            }, status_code, headers)
 
     except Exception as e:
         return make_response({
@@ -65,6 +75,8 @@ def signup():
 
 
 @bp.post("/login")
+@rate_limit("login-ip", client_ip, "AUTH_RATE_LIMIT_PER_IP")
+@rate_limit("login-email", submitted_email, "AUTH_RATE_LIMIT_PER_EMAIL")
 def login():
     try:
         data = request.get_json(force=True)
@@ -81,7 +93,10 @@ def login():
         result = authenticate_user(email, password)
         
         if result["success"]:
-            access_token = create_access_token(identity=str(result["user"]["user_id"]))
+            access_token = create_access_token(
+                identity=str(result["user"]["user_id"]),
+                additional_claims=result["claims"]
+            )
 
             resp = make_response({
                 "status": "success",
@@ -91,6 +106,13 @@ def login():
             set_access_cookies(resp, access_token)
             return resp
         else:
+            if result["error_code"] == "PASSWORD_HASHER_BUSY":
+                return make_response({
+                    "status": "error",
+                    "message": result["message"],
+                    "error_code": result["error_code"]
+                }, 503, {"Retry-After": str(result["retry_after"])})
+            
             status_code = 401 if result["error_code"] == "INVALID_CREDENTIALS" else 500
             return make_response({
                 "status": "error",
@@ -1,6 +1,7 @@
 from typing import Optional, Dict, Any
 from ..models import User
 from ..models.base_model import ModelError, ValidationError, DatabaseError, NotFoundError
+from ..utils.password_hashing import PasswordHasherBusy
 
 
 def create_user(username: str, email: str, password: str, role: Optional[str] = None) -> Dict[str, Any]:
@@ -13,7 +14,15 @@ def create_user(username: str, email: str, password: str, role: Optional[str] =
         return {
             "success": True,
             "message": "User created successfully",
-            "user": saved_user.to_dict()
+            "user": saved_user.to_dict(),
+            "claims": saved_user.token_claims()
+        }
+    except PasswordHasherBusy as e:
+        return {
+            "success": False,
+            "message": "Too many password operations in progress, please retry shortly",
+            "error_code": "PASSWORD_HASHER_BUSY",
+            "retry_after": e.retry_after
         }
     except ValidationError as e:
         return {
@@ -45,7 +54,8 @@ def authenticate_user(email: str, password: str) -> Dict[str, Any]:
             return {
                 "success": True,
                 "message": "Authentication successful",
-                "user": user.to_dict()
+                "user": user.to_dict(),
+                "claims": user.token_claims()
             }
         else:
             return {
@@ -53,6 +63,13 @@ def authenticate_user(email: str, password: str) -> Dict[str, Any]:
                 "message": "Invalid email or password",
                 "error_code": "INVALID_CREDENTIALS"
             }
+    except PasswordHasherBusy as e:
+        return {
+            "success": False,
+            "message": "Too many password operations in progress, please retry shortly",
+            "error_code": "PASSWORD_HASHER_BUSY",
+            "retry_after": e.retry_after
+        }
     except Exception as e:
         return {
             "success": False,
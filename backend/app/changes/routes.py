@@ -0,0 +1,71 @@
+import time
+from flask import Blueprint, Response, current_app
+from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
+from ..db.change_feed import RESYNC, get_change_feed
+from ..utils.admin_required import current_token_version
+from ..utils.route_utils import make_response
+
+bp = Blueprint("changes", __name__)
+
+# Tables every signed-in user may follow; "users" is added for admins
+PUBLIC_TABLES = frozenset({"students", "programs", "colleges"})
+
+
+def _visible_tables() -> frozenset:
+    claims = get_jwt()
+    if claims.get("role") == "admin" and claims.get("ver") == current_token_version(get_jwt_identity()):
+        return PUBLIC_TABLES | {"users"}
+    return PUBLIC_TABLES
+
+
+@bp.get("/stream")
+@jwt_required()
+def change_stream_route():
+    try:
+        feed = get_change_feed()
+        if feed is None:
+            return make_response({
+                "status": "error",
+                "message": "Change feed is disabled",
+                "error_code": "CHANGE_FEED_UNAVAILABLE"
+            }, 503)
+
+        subscription = feed.subscribe(_visible_tables())
+        if subscription is None:
+            return make_response({
+                "status": "error",
+                "message": "Too many open change streams, retry shortly",
+                "error_code": "TOO_MANY_STREAMS"
+            }, 503, {"Retry-After": "30"})
+
+        heartbeat = current_app.config["CHANGE_STREAM_HEARTBEAT"]
+        max_seconds = current_app.config["CHANGE_STREAM_MAX_SECONDS"]
+        retry_ms = int(current_app.config["CHANGE_STREAM_RETRY_MS"])
+
+        def generate():
+            # Runs after the request context (and its pooled connection) is released.
+            # Streams end after max_seconds; the browser reconnects, re-checking the token.
+            try:
+                yield f"retry: {retry_ms}\n: connected\n\n"
+                deadline = time.monotonic() + max_seconds
+                while time.monotonic() < deadline:
+                    event = subscription.get(timeout=heartbeat)
+                    if event is None:
+                        yield ": keepalive\n\n"
+                    elif event is RESYNC:
+                        yield "event: resync\ndata: {}\n\n"
+                    else:
+                        yield f"id: {event[0]}\nevent: change\ndata: {event[2]}\n\n"
+            finally:
+                feed.unsubscribe(subscription)
+
+        return Response(generate(), mimetype="text/event-stream", headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        })
+    except Exception as e:
+        return make_response({
+            "status": "error",
+            "message": f"Unexpected error occurred: {str(e)}",
+            "error_code": "UNEXPECTED_ERROR"
+        }, 500)
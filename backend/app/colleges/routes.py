@@ -2,13 +2,16 @@ from flask import Blueprint, request
 from flask_jwt_extended import jwt_required
 from typing import Dict, Any
 from ..utils.route_utils import make_response
+from ..utils.conditional import conditional_get, expected_version
 from .services import (
+    suggest_colleges,
     search_colleges,
     get_college,
     get_all_colleges,
     create_college,
     update_college,
     delete_college,
+    get_college_changes
 )
 
 bp = Blueprint("colleges", __name__)
@@ -16,6 +19,7 @@ bp = Blueprint("colleges", __name__)
 
 @bp.get("/")
 @jwt_required()
+@conditional_get("colleges")
 def list_colleges():
     try:
         try:
@@ -32,6 +36,10 @@ def list_colleges():
         sort_order = request.args.get("sort_order", "ASC").upper()
         search_term = request.args.get("q", "")
         search_by = request.args.get("search_by", "")
+        search_mode = request.args.get("search_mode", "").lower()
+        # Presence of `after`/`before` (even empty) selects cursor pagination
+        after = request.args.get("after")
+        before = request.args.get("before")
 
         result = search_colleges(
             sort_by=sort_by,
@@ -40,6 +48,9 @@ def list_colleges():
             search_by=search_by,
             page=page,
             page_size=page_size,
+            after=after,
+            before=before,
+            search_mode=search_mode,
         )
 
         if result["success"]:
@@ -50,9 +61,48 @@ def list_colleges():
                 "meta": {
                     "page": result["page"], 
                     "per_page": result["page_size"], 
-                    "total": result["total_count"]
+                    "total": result["total_count"],
+                    "next_cursor": result.get("next_cursor"),
+                    "prev_cursor": result.get("prev_cursor")
                 },
             }, 200)
+        else:
+            status_code = 400 if result["error_code"] in ("INVALID_CURSOR", "INVALID_SEARCH_MODE") else 500
+            return make_response({
+                "status": "error",
+                "message": result["message"],
+                "error_code": result["error_code"]
+            }, status_code)
+
+    except Exception as e:
+        return make_response({
+            "status": "error", 
+            "message": f"Unexpected error occurred: {str(e)}",
+            "error_code": "UNEXPECTED_ERROR"
+        }, 500)
+
+
+@bp.get("/suggest")
+@jwt_required()
+@conditional_get("colleges")
+def suggest_colleges_route():
+    try:
+        try:
+            limit = max(min(int(request.args.get("limit", 10)), 20), 1)
+        except ValueError:
+            return make_response({
+                "status": "error",
+                "message": "Invalid limit parameter",
+                "error_code": "INVALID_LIMIT"
+            }, 400)
+
+        result = suggest_colleges(request.args.get("q", ""), limit)
+
+        if result["success"]:
+            return make_response({
+                "status": "success",
+                "data": result["data"]
+            }, 200)
         else:
             return make_response({
                 "status": "error",
@@ -108,7 +158,16 @@ def create_college_route():
 def update_college_route(college_code: str):
     updates = request.get_json(force=True) or {}
     try:
-        result = update_college(college_code, updates)
+        try:
+            version = expected_version(updates)
+        except ValueError as e:
+            return make_response({
+                "status": "error",
+                "message": str(e),
+                "error_code": "INVALID_EXPECTED_VERSION"
+            }, 400)
+        
+        result = update_college(college_code, updates, version)
         
         if result["success"]:
             return make_response({
@@ -120,7 +179,7 @@ def update_college_route(college_code: str):
             status_code = 400
             if result["error_code"] == "COLLEGE_NOT_FOUND":
                 status_code = 404
-            elif result["error_code"] == "COLLEGE_CODE_EXISTS":
+            elif result["error_code"] in ("COLLEGE_CODE_EXISTS", "VERSION_CONFLICT"):
                 status_code = 409  # Conflict
             elif result["error_code"] == "DATABASE_ERROR":
                 status_code = 500
@@ -173,3 +232,37 @@ def delete_college_route(college_code: str):
             "message": f"Unexpected error occurred: {str(e)}",
             "error_code": "UNEXPECTED_ERROR"
         }, 500)
+
+
+@bp.get("/delta")
+@jwt_required()
+def college_changes_route():
+    try:
+        since = request.args.get("since", "0")
+        if not since.isdigit():
+            return make_response({
+                "status": "error",
+                "message": "since must be a non-negative row version",
+                "error_code": "INVALID_SINCE"
+            }, 400)
+
+        result = get_college_changes(int(since))
+        if result["success"]:
+            return make_response({
+                "status": "success",
+                "message": result["message"],
+                "data": result["data"]
+            }, 200)
+
+        status_code = 410 if result["error_code"] == "DELTA_EXPIRED" else 500
+        return make_response({
+            "status": "error",
+            "message": result["message"],
+            "error_code": result["error_code"]
+        }, status_code)
+    except Exception as e:
+        return make_response({
+            "status": "error",
+            "message": f"Unexpected error occurred: {str(e)}",
+            "error_code": "UNEXPECTED_ERROR"
+        }, 500)
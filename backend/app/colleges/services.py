@@ -1,6 +1,12 @@
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Optional
 from ..models import College
 from ..models.base_model import ModelError, ValidationError, DatabaseError, NotFoundError
+from ..db.reference_cache import colleges_cache, programs_cache
+from ..utils.cache import LRUCache
+
+
+# Typeahead results keyed on (normalized prefix, limit); cleared on every college write
+_suggest_cache = LRUCache(maxsize=512, ttl=30)
 
 
 def search_colleges(
@@ -10,26 +16,66 @@ def search_colleges(
     search_by: str,
     page: int,
     page_size: int,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    search_mode: str = "",
 ) -> Dict[str, Any]:
     """Search colleges."""
     try:
-        colleges, total_count = College.search(
-            search_by=search_by,
-            search_term=search_term,
-            sort_by=sort_by,
-            sort_order=sort_order,
-            page=page,
-            page_size=page_size
-        )
+        if after is not None or before is not None:
+            colleges, next_cursor, prev_cursor = College.search_keyset(
+                search_by=search_by,
+                search_term=search_term,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                page_size=page_size,
+                after=after,
+                before=before,
+                search_mode=search_mode
+            )
+            
+            return {
+                "success": True,
+                "message": f"Found {len(colleges)} colleges",
+                "data": colleges,
+                "total_count": None,
+                "page": None,
+                "page_size": page_size,
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor
+            }
+        
+        def load() -> Tuple[List[Dict[str, Any]], int]:
+            return College.search(
+                search_by=search_by,
+                search_term=search_term,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                page=page,
+                page_size=page_size,
+                search_mode=search_mode
+            )
+        
+        # Unfiltered listings (the form dropdowns) are served from the reference cache
+        if search_term.strip():
+            colleges, total_count = load()
+        else:
+            colleges, total_count = colleges_cache.get(("list", sort_by, sort_order, page, page_size), load)
         
         return {
             "success": True,
             "message": f"Found {len(colleges)} colleges",
-            "data": [college.to_dict() for college in colleges],
+            "data": colleges,
             "total_count": total_count,
             "page": page,
             "page_size": page_size
         }
+    except ValidationError as e:
+        return {
+            "success": False,
+            "message": e.message,
+            "error_code": e.error_code
+        }
     except Exception as e:
         return {
             "success": False,
@@ -38,6 +84,36 @@ def search_colleges(
         }
 
 
+def suggest_colleges(query: str, limit: int = 10) -> Dict[str, Any]:
+    """Suggest colleges whose code or name starts with `query`."""
+    try:
+        prefix = " ".join(query.split()).lower()
+        if not prefix:
+            return {
+                "success": True,
+                "message": "Empty query",
+                "data": []
+            }
+        
+        key = (prefix, limit)
+        suggestions = _suggest_cache.get(key)
+        if suggestions is None:
+            suggestions = College.suggest(prefix, limit)
+            _suggest_cache.set(key, suggestions)
+        
+        return {
+            "success": True,
+            "message": f"Found {len(suggestions)} suggestions",
+            "data": suggestions
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Failed to suggest colleges: {str(e)}",
+            "error_code": "SUGGEST_ERROR"
+        }
+
+
 def get_college(college_code: str) -> Dict[str, Any]:
     """Get a specific college by code."""
     try:
@@ -69,7 +145,7 @@ def get_all_colleges() -> Dict[str, Any]:
         return {
             "success": True,
             "message": f"Retrieved {len(colleges)} colleges",
-            "data": [college.to_dict() for college in colleges]
+            "data": colleges
         }
     except Exception as e:
         return {
@@ -87,6 +163,8 @@ def create_college(data: Dict[str, Any]) -> Dict[str, Any]:
             college_name=data.get("college_name", "")
         )
         saved_college = college.save()
+        _suggest_cache.clear()
+        colleges_cache.invalidate()
         
         return {
             "success": True,
@@ -115,18 +193,14 @@ def create_college(data: Dict[str, Any]) -> Dict[str, Any]:
         }
 
 
-def update_college(college_code: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+def update_college(college_code: str, updates: Dict[str, Any], expected_version: Optional[int] = None) -> Dict[str, Any]:
     """Update a college with improved error handling."""
     try:
-        college = College.find_by_code(college_code)
-        if not college:
-            return {
-                "success": False,
-                "message": f"College with code '{college_code}' not found",
-                "error_code": "COLLEGE_NOT_FOUND"
-            }
-        
-        updated_college = college.update(updates)
+        # No pre-read: the model writes in one statement and reports a missing row itself
+        updated_college = College(college_code=college_code).update(updates, expected_version)
+        _suggest_cache.clear()
+        colleges_cache.invalidate()
+        programs_cache.invalidate()  # code changes and deletes cascade into programs
         return {
             "success": True,
             "message": "College updated successfully",
@@ -139,6 +213,12 @@ def update_college(college_code: str, updates: Dict[str, Any]) -> Dict[str, Any]
             "error_code": e.error_code,
             "details": e.details
         }
+    except NotFoundError as e:
+        return {
+            "success": False,
+            "message": e.message,
+            "error_code": e.error_code
+        }
     except DatabaseError as e:
         return {
             "success": False,
@@ -167,6 +247,9 @@ def delete_college(college_code: str) -> Dict[str, Any]:
         
         deleted = college.delete()
         if deleted:
+            _suggest_cache.clear()
+            colleges_cache.invalidate()
+            programs_cache.invalidate()  # code changes and deletes cascade into programs
             return {
                 "success": True,
                 "message": "College deleted successfully"
@@ -197,3 +280,27 @@ def delete_college(college_code: str) -> Dict[str, Any]:
             "message": f"Unexpected error occurred: {str(e)}",
             "error_code": "UNEXPECTED_ERROR"
         }
+
+
+def get_college_changes(since: int) -> Dict[str, Any]:
+    """Get colleges changed or deleted at or after a row version (delta sync)."""
+    try:
+        changes = College.changes_since(since)
+        return {
+            "success": True,
+            "message": f"{len(changes['changed'])} changed and {len(changes['deleted'])} deleted colleges",
+            "data": changes
+        }
+    except ValidationError as e:
+        return {
+            "success": False,
+            "message": e.message,
+            "error_code": e.error_code,
+            "details": e.details
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Failed to retrieve changes: {str(e)}",
+            "error_code": "RETRIEVAL_ERROR"
+        }
@@ -1,5 +1,5 @@
 # Database package exports
-from .database import get_connection, execute_sql
+from .database import get_connection, execute_sql, stream_sql, transaction
 from .bootstrap import bootstrap_schema_if_needed
 
-__all__ = ['get_connection', 'execute_sql', 'bootstrap_schema_if_needed']
\ No newline at end of file
+__all__ = ['get_connection', 'execute_sql', 'stream_sql', 'transaction', 'bootstrap_schema_if_needed']
\ No newline at end of file
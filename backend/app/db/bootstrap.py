@@ -1,7 +1,9 @@
 from pathlib import Path
-from .database import execute_sql
+from .database import execute_sql, get_engine, transaction
 from werkzeug.security import generate_password_hash
 
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
 def bootstrap_schema_if_needed() -> None:
     """
     Load and execute db/schema.sql if core tables are missing.
@@ -22,6 +24,7 @@ def bootstrap_schema_if_needed() -> None:
     # If tables already exist, skip bootstrap
     if result and result.scalar():
         print("[✓] Database tables already exist, skipping bootstrap")
+        apply_migrations()
         return
 
     print("[!] Bootstrapping database schema...")
@@ -37,9 +40,11 @@ def bootstrap_schema_if_needed() -> None:
         # Split into individual statements
         statements = [s.strip() for s in sql_content.split(";") if s.strip()]
 
-        for i, statement in enumerate(statements, 1):
-            print(f"  Executing statement {i}/{len(statements)}...")
-            execute_sql(statement)
+        # Create the schema atomically: a failed statement raises and rolls back the whole block
+        with transaction():
+            for i, statement in enumerate(statements, 1):
+                print(f"  Executing statement {i}/{len(statements)}...")
+                execute_sql(statement)
 
         # Create default admin user with proper password hash
         print("  Creating default admin user...")
@@ -80,4 +85,45 @@ def bootstrap_schema_if_needed() -> None:
 
     except Exception as e:
         print(f"[!] Error bootstrapping schema: {e}")
-        raise
\ No newline at end of file
+        raise
+
+    apply_migrations()
+
+
+def apply_migrations() -> None:
+    """
+    Apply db/migrations/*.sql files that have not been recorded in schema_migrations yet.
+    Each file runs as a whole (so function bodies may contain semicolons) in its own transaction.
+    """
+    engine = get_engine()
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version VARCHAR(100) PRIMARY KEY,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+            """
+        )
+        applied = {row[0] for row in conn.exec_driver_sql("SELECT version FROM schema_migrations")}
+
+    pending = [path for path in sorted(MIGRATIONS_DIR.glob("*.sql")) if path.stem not in applied]
+    if not pending:
+        print("[✓] Database migrations up to date")
+        return
+
+    for path in pending:
+        print(f"  Applying migration {path.name}...")
+        with engine.begin() as conn:
+            # Use the DBAPI cursor directly so literal '%' in the SQL is not treated as a placeholder
+            cursor = conn.connection.cursor()
+            try:
+                cursor.execute(path.read_text(encoding="utf-8"))
+            finally:
+                cursor.close()
+            conn.exec_driver_sql(
+                "INSERT INTO schema_migrations (version) VALUES (%(version)s)",
+                {"version": path.stem}
+            )
+
+    print(f"[✓] Applied {len(pending)} database migration(s)")
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+In-process fan-out of row change events to Server-Sent Events clients.
+
+Row-level triggers (db/migrations/0007_row_change_notify.sql) publish one small JSON event per
+changed row on the 'row_changes' channel. The worker's NotificationListener hands each one to the
+ChangeFeed, which copies it onto the bounded queue of every connected stream that may see that
+table. Event payloads are forwarded to clients exactly as PostgreSQL sent them.
+
+A stream that falls behind (a bulk import, a stalled client) has its queue replaced by a single
+"resync" marker, and so does every stream when the listener reconnects and may have missed events.
+Clients answer a resync by refetching what they show.
+"""
+import itertools
+import json
+import logging
+import queue
+import threading
+from typing import FrozenSet, Optional, Set, Tuple, Union
+from flask import Flask, current_app
+from .notifications import get_listener
+
+logger = logging.getLogger("app.db.change_feed")
+
+# Channel fed by the row-level triggers of db/migrations/0007_row_change_notify.sql
+ROW_CHANGES_CHANNEL = "row_changes"
+
+RESYNC = "resync"
+
+# (event id, table, JSON payload)
+ChangeEvent = Tuple[int, str, str]
+
+
+class ChangeSubscription:
+    """One connected stream: the tables it may see and its pending events."""
+
+    def __init__(self, tables: FrozenSet[str], queue_size: int):
+        self.tables = tables
+        self._queue: "queue.Queue[Union[ChangeEvent, str]]" = queue.Queue(maxsize=queue_size)
+
+    def push(self, event: Union[ChangeEvent, str]) -> None:
+        if event is not RESYNC and event[1] not in self.tables:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # Too far behind for individual events to be worth sending; ask for a refetch instead
+            self._drain()
+            self._queue.put_nowait(RESYNC)
+
+    def resync(self) -> None:
+        self._drain()
+        self._queue.put_nowait(RESYNC)
+
+    def get(self, timeout: float) -> Optional[Union[ChangeEvent, str]]:
+        """The next event, or None if nothing arrived within `timeout` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _drain(self) -> None:
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+
+class ChangeFeed:
+    """Broadcasts row change notifications to at most `max_clients` subscriptions."""
+
+    def __init__(self, max_clients: int = 50, queue_size: int = 500):
+        self.max_clients = max_clients
+        self.queue_size = queue_size
+        self._subscriptions: Set[ChangeSubscription] = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, tables: FrozenSet[str]) -> Optional[ChangeSubscription]:
+        """Register a stream for `tables`; None when the process already serves max_clients."""
+        with self._lock:
+            if len(self._subscriptions) >= self.max_clients:
+                return None
+            subscription = ChangeSubscription(tables, self.queue_size)
+            self._subscriptions.add(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription: ChangeSubscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    @property
+    def client_count(self) -> int:
+        return len(self._subscriptions)
+
+    def publish(self, payload: str) -> None:
+        """NotificationListener callback: fan one trigger payload out to the subscriptions."""
+        try:
+            table = json.loads(payload)["table"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed row change payload: %.200s", payload)
+            return
+        event = (next(self._ids), table, payload)
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.push(event)
+
+    def resync_all(self) -> None:
+        """Listener (re)connected: events may have been missed while it was down."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.resync()
+
+
+def init_change_feed(app: Flask) -> Optional[ChangeFeed]:
+    """Attach a ChangeFeed to the app's notification listener, unless notifications are disabled."""
+    listener = app.extensions.get("db_notifications")
+    if listener is None:
+        return None
+    feed = ChangeFeed(
+        max_clients=app.config["CHANGE_STREAM_MAX_CLIENTS"],
+        queue_size=app.config["CHANGE_STREAM_QUEUE_SIZE"],
+    )
+    listener.subscribe(ROW_CHANGES_CHANNEL, feed.publish)
+    listener.on_connect(feed.resync_all)
+    app.extensions["change_feed"] = feed
+    return feed
+
+
+def get_change_feed() -> Optional[ChangeFeed]:
+    """Return the current app's feed with its listener running in this process, or None."""
+    feed = current_app.extensions.get("change_feed")
+    if feed is not None:
+        get_listener()
+    return feed
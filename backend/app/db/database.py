@@ -1,69 +1,178 @@
-from typing import Optional, Any
-from flask import current_app, g
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine, Connection, Result
-from sqlalchemy.exc import SQLAlchemyError
-
-
-def _build_database_url() -> str:
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional, Any, Iterator
+from flask import Flask, current_app, g
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, Connection, Result, RowMapping
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError, TimeoutError as PoolTimeoutError
+from .pool_metrics import init_pool_metrics
+from .notifications import init_notifications
+from .statements import statements
+
+
+def _build_database_url(config: Any = None) -> str:
     """Build the PostgreSQL connection URL from app config."""
-    username = current_app.config["DB_USERNAME"]
-    password = current_app.config["DB_PASSWORD"]
-    host = current_app.config["DB_HOST"]
-    port = current_app.config["DB_PORT"]
-    database = current_app.config["DB_NAME"]
+    config = config if config is not None else current_app.config
+    username = config["DB_USERNAME"]
+    password = config["DB_PASSWORD"]
+    host = config["DB_HOST"]
+    port = config["DB_PORT"]
+    database = config["DB_NAME"]
     return f"postgresql+psycopg2://{username}:{password}@{host}:{port}/{database}"
 
 
+def init_engine(app: Flask) -> Engine:
+    """
+    Create the process-wide pooled engine for `app`.
+    Called once by the application factory; every request borrows connections from this pool.
+    """
+    engine = create_engine(
+        _build_database_url(app.config),
+        pool_size=app.config["DB_POOL_SIZE"],
+        max_overflow=app.config["DB_MAX_OVERFLOW"],
+        pool_recycle=app.config["DB_POOL_RECYCLE"],
+        pool_timeout=app.config["DB_POOL_TIMEOUT"],
+        pool_pre_ping=True,
+        future=True,
+    )
+
+    # Connections inherited from a pre-forking parent (e.g. gunicorn --preload) must not be
+    # shared with the child; drop them without closing the parent's sockets.
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+
+    init_pool_metrics(app, engine)
+    init_notifications(app, engine)
+    app.extensions["db_engine"] = engine
+    return engine
+
+
 def get_engine() -> Engine:
-    """Return a singleton SQLAlchemy engine stored in Flask's `g` context."""
-    if "db_engine" not in g:
-        g.db_engine = create_engine(
-            _build_database_url(),
-            pool_pre_ping=True,
-            future=True,
-        )
-    return g.db_engine  # type: ignore[return-value]
+    """Return the pooled SQLAlchemy engine created by `init_engine`."""
+    engine = current_app.extensions.get("db_engine")
+    if engine is None:
+        engine = init_engine(current_app)
+    return engine
 
 
 def get_connection() -> Connection:
-    """Return a persistent connection stored in Flask's `g` context."""
+    """
+    Return a connection checked out from the pool for the current app context.
+    The connection runs in AUTOCOMMIT mode: each statement outside `transaction()` is its own
+    transaction, so reads pay no BEGIN/COMMIT round trips.
+    """
     if "db_conn" not in g:
-        g.db_conn = get_engine().connect()
+        metrics = current_app.extensions.get("db_pool_metrics")
+        started = time.perf_counter()
+        try:
+            conn = get_engine().connect()
+        except PoolTimeoutError:
+            if metrics is not None:
+                metrics.record_timeout((time.perf_counter() - started) * 1000)
+            raise
+        if metrics is not None:
+            metrics.record_acquire((time.perf_counter() - started) * 1000)
+        g.db_conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        g.db_tx_depth = 0
     return g.db_conn  # type: ignore[return-value]
 
 
+def in_transaction() -> bool:
+    """Whether the current app context is inside a `transaction()` block."""
+    return g.get("db_tx_depth", 0) > 0
+
+
+@contextmanager
+def transaction() -> Iterator[Connection]:
+    """
+    Unit of work on the request connection: every statement executed inside the block is
+    committed together when it exits, or rolled back if it raises.
+    Nested blocks become savepoints, so an inner failure can be handled without losing the outer work.
+    """
+    conn = get_connection()
+    depth = g.db_tx_depth
+
+    if depth == 0:
+        # Close the no-op autobegin left by AUTOCOMMIT statements before switching isolation level
+        if conn.in_transaction():
+            conn.commit()
+        conn.execution_options(isolation_level="READ COMMITTED")
+        tx = conn.begin()
+    else:
+        tx = conn.begin_nested()
+
+    g.db_tx_depth = depth + 1
+    try:
+        yield conn
+    except BaseException:
+        if tx.is_active:
+            tx.rollback()
+        raise
+    else:
+        tx.commit()
+    finally:
+        g.db_tx_depth = depth
+        if depth == 0:
+            conn.execution_options(isolation_level="AUTOCOMMIT")
+
+
 def close_db(_: Optional[BaseException] = None) -> None:
-    """Close connection and dispose engine on app teardown."""
+    """Return the context's connection to the pool on app teardown."""
     conn: Optional[Connection] = g.pop("db_conn", None)
+    g.pop("db_tx_depth", None)
     if conn is not None:
         conn.close()
 
-    engine: Optional[Engine] = g.pop("db_engine", None)
-    if engine is not None:
-        engine.dispose()
-
 
 def execute_sql(sql, params: Optional[dict] = None) -> Optional[Result]:
     """
     Execute raw SQL (string or SQLAlchemy TextClause) with optional parameters.
-    Commits automatically for modifying queries.
+    Strings are resolved through the statement registry, so repeated SQL is parsed only once.
+    Outside `transaction()` the statement commits on its own; inside, it joins the open transaction.
+    Constraint violations are raised as IntegrityError so callers can report which constraint failed;
+    other database errors are logged and return None, except inside `transaction()`: PostgreSQL has
+    aborted the transaction by then, so the error is raised for the block to roll back and report.
     """
     try:
         conn = get_connection()
 
         if isinstance(sql, str):
-            sql = text(sql)
-
-        result = conn.execute(sql, params or {})
+            sql = statements.text(sql)
 
-        if sql.text.strip().lower().startswith((
-            "insert", "update", "delete", "create", "drop", "alter"
-        )):
-            conn.commit()
-
-        return result
+        return conn.execute(sql, params or {})
+    except IntegrityError:
+        raise
     except SQLAlchemyError as e:
         current_app.logger.error(f"SQL execution failed: {e}")
+        if in_transaction():
+            raise
         return None
 
+
+def stream_sql(sql, params: Optional[dict] = None, batch_size: int = 1000) -> Iterator[RowMapping]:
+    """
+    Stream rows of a SELECT through a server-side cursor, `batch_size` rows at a time.
+    Uses its own pooled connection (held until the generator is exhausted or closed) so the
+    request connection stays usable; memory use does not grow with the result size.
+
+    The statement is executed and its first batch fetched before this returns, so SQL errors are
+    raised here, while the caller can still send an error response, rather than mid-body.
+    """
+    engine = get_engine()
+    if isinstance(sql, str):
+        sql = statements.text(sql)
+
+    def generate() -> Iterator[RowMapping]:
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(sql, params or {})
+            rows = result.mappings()
+            first_batch = rows.fetchmany(batch_size)
+            # Primed: suspended inside the connection block, so closing the generator releases it
+            yield None
+            yield from first_batch
+            yield from rows
+
+    stream = generate()
+    next(stream)
+    return stream
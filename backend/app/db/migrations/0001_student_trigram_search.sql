@@ -0,0 +1,12 @@
+-- Trigram search over students.
+-- A single lower-cased search column concatenates the fields used by tokenized search so one
+-- GIN index can serve '%token%' patterns and similarity matching (search_mode=trigram).
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE students
+    ADD COLUMN IF NOT EXISTS search_text TEXT GENERATED ALWAYS AS (
+        lower(id_number || ' ' || first_name || ' ' || last_name || ' ' || coalesce(program_code, ''))
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS students_search_text_trgm_idx
+    ON students USING GIN (search_text gin_trgm_ops);
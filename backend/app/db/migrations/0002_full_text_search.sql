@@ -0,0 +1,22 @@
+-- Full-text search (search_mode=fts).
+-- Each table keeps a stored tsvector generated from its searchable text, indexed with GIN.
+-- Student fields are names and codes, so they use the 'simple' configuration (no stemming);
+-- program and college names are prose ("Bachelor of Science in ...") and use 'english'.
+ALTER TABLE students
+    ADD COLUMN IF NOT EXISTS search_tsv TSVECTOR GENERATED ALWAYS AS (
+        to_tsvector('simple', id_number || ' ' || first_name || ' ' || last_name || ' ' || coalesce(program_code, ''))
+    ) STORED;
+
+ALTER TABLE programs
+    ADD COLUMN IF NOT EXISTS search_tsv TSVECTOR GENERATED ALWAYS AS (
+        to_tsvector('english', program_code || ' ' || program_name || ' ' || coalesce(college_code, ''))
+    ) STORED;
+
+ALTER TABLE colleges
+    ADD COLUMN IF NOT EXISTS search_tsv TSVECTOR GENERATED ALWAYS AS (
+        to_tsvector('english', college_code || ' ' || college_name)
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS students_search_tsv_idx ON students USING GIN (search_tsv);
+CREATE INDEX IF NOT EXISTS programs_search_tsv_idx ON programs USING GIN (search_tsv);
+CREATE INDEX IF NOT EXISTS colleges_search_tsv_idx ON colleges USING GIN (search_tsv);
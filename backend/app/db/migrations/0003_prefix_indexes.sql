@@ -0,0 +1,11 @@
+-- Prefix indexes for the /suggest (typeahead) endpoints.
+-- text_pattern_ops lets btree serve LIKE 'prefix%' regardless of the database collation.
+CREATE INDEX IF NOT EXISTS students_id_number_prefix_idx ON students (id_number text_pattern_ops);
+CREATE INDEX IF NOT EXISTS students_last_name_prefix_idx ON students (lower(last_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS students_first_name_prefix_idx ON students (lower(first_name) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS programs_code_prefix_idx ON programs (lower(program_code) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS programs_name_prefix_idx ON programs (lower(program_name) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS colleges_code_prefix_idx ON colleges (lower(college_code) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS colleges_name_prefix_idx ON colleges (lower(college_name) text_pattern_ops);
@@ -0,0 +1,20 @@
+-- Announce writes to the reference tables on the 'table_changes' channel (payload: table name)
+-- so every worker's in-process reference cache can drop its copy (see app/db/notifications.py).
+-- Statement-level triggers send one notification per statement, and PostgreSQL folds duplicate
+-- notifications within a transaction; they are delivered only on commit.
+CREATE OR REPLACE FUNCTION notify_table_change() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('table_changes', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS programs_notify_change ON programs;
+CREATE TRIGGER programs_notify_change
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON programs
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
+
+DROP TRIGGER IF EXISTS colleges_notify_change ON colleges;
+CREATE TRIGGER colleges_notify_change
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON colleges
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
@@ -0,0 +1,18 @@
+-- Per-user token epoch embedded in access tokens (JWT claim "ver").
+-- Bumped automatically whenever a user's role or password changes, which makes every token
+-- issued before the change stale (see app/utils/admin_required.py).
+ALTER TABLE users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION bump_user_token_version() RETURNS trigger AS $$
+BEGIN
+    NEW.token_version := OLD.token_version + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS users_bump_token_version ON users;
+CREATE TRIGGER users_bump_token_version
+    BEFORE UPDATE OF role, password_hash ON users
+    FOR EACH ROW
+    WHEN (OLD.role IS DISTINCT FROM NEW.role OR OLD.password_hash IS DISTINCT FROM NEW.password_hash)
+    EXECUTE FUNCTION bump_user_token_version();
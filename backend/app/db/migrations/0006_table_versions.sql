@@ -0,0 +1,34 @@
+-- Per-table change counter used to build ETags for list and detail responses
+-- (see app/utils/conditional.py). A statement-level trigger bumps the table's row once per
+-- write statement. The bump is transactional, so a new version is never visible before the data
+-- it describes; concurrent writers to the same table queue briefly on the counter row.
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO table_versions (table_name)
+VALUES ('students'), ('programs'), ('colleges')
+ON CONFLICT (table_name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS students_bump_version ON students;
+CREATE TRIGGER students_bump_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON students
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS programs_bump_version ON programs;
+CREATE TRIGGER programs_bump_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON programs
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS colleges_bump_version ON colleges;
+CREATE TRIGGER colleges_bump_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON colleges
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
@@ -0,0 +1,55 @@
+-- Row-level change events for the SSE change feed (app/db/change_feed.py), sent on the
+-- 'row_changes' channel as compact JSON:
+--   {"table": "students", "op": "update", "key": "2024-0001", "old_key": "2023-0001", "row": {...}}
+-- "old_key" is present only when an update changed the primary key; deletes carry no "row".
+-- The primary key column is the trigger argument. Derived search columns and credentials are
+-- never included, and a row too large for a notification is sent without "row" (clients refetch).
+-- Like every NOTIFY, events are delivered only when the writing transaction commits.
+CREATE OR REPLACE FUNCTION notify_row_change() RETURNS trigger AS $$
+DECLARE
+    key_column TEXT := TG_ARGV[0];
+    event JSONB;
+    payload TEXT;
+BEGIN
+    event := jsonb_build_object('table', TG_TABLE_NAME, 'op', lower(TG_OP));
+
+    IF TG_OP = 'DELETE' THEN
+        event := event || jsonb_build_object('key', to_jsonb(OLD) -> key_column);
+    ELSE
+        event := event || jsonb_build_object(
+            'key', to_jsonb(NEW) -> key_column,
+            'row', to_jsonb(NEW) - ARRAY['search_text', 'search_tsv', 'password_hash', 'token_version']
+        );
+        IF TG_OP = 'UPDATE' AND (to_jsonb(OLD) -> key_column) <> (to_jsonb(NEW) -> key_column) THEN
+            event := event || jsonb_build_object('old_key', to_jsonb(OLD) -> key_column);
+        END IF;
+    END IF;
+
+    payload := event::text;
+    IF octet_length(payload) > 7900 THEN
+        payload := (event - 'row')::text;
+    END IF;
+    PERFORM pg_notify('row_changes', payload);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS students_notify_row_change ON students;
+CREATE TRIGGER students_notify_row_change
+    AFTER INSERT OR UPDATE OR DELETE ON students
+    FOR EACH ROW EXECUTE FUNCTION notify_row_change('id_number');
+
+DROP TRIGGER IF EXISTS programs_notify_row_change ON programs;
+CREATE TRIGGER programs_notify_row_change
+    AFTER INSERT OR UPDATE OR DELETE ON programs
+    FOR EACH ROW EXECUTE FUNCTION notify_row_change('program_code');
+
+DROP TRIGGER IF EXISTS colleges_notify_row_change ON colleges;
+CREATE TRIGGER colleges_notify_row_change
+    AFTER INSERT OR UPDATE OR DELETE ON colleges
+    FOR EACH ROW EXECUTE FUNCTION notify_row_change('college_code');
+
+DROP TRIGGER IF EXISTS users_notify_row_change ON users;
+CREATE TRIGGER users_notify_row_change
+    AFTER INSERT OR UPDATE OR DELETE ON users
+    FOR EACH ROW EXECUTE FUNCTION notify_row_change('user_id');
@@ -0,0 +1,115 @@
+-- Row versions, change timestamps and delete tombstones for delta sync (GET /api/<entity>/delta).
+--
+-- row_version is the 64-bit id of the transaction that last wrote the row (pg_current_xact_id,
+-- PostgreSQL 13+), set by a BEFORE trigger together with updated_at. Transaction ids grow
+-- monotonically but can commit out of order, so a delta reader resumes from the snapshot xmin
+-- (the oldest transaction still running when it read) rather than from the highest version it
+-- saw: nothing below xmin can still commit, and rows at or above it are simply re-sent.
+-- Existing rows start at version 0, which every first sync (since=0) includes.
+ALTER TABLE students ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE students ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+ALTER TABLE programs ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE programs ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+ALTER TABLE colleges ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE colleges ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+ALTER TABLE users ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE users ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+CREATE INDEX IF NOT EXISTS idx_students_row_version ON students (row_version);
+CREATE INDEX IF NOT EXISTS idx_programs_row_version ON programs (row_version);
+CREATE INDEX IF NOT EXISTS idx_colleges_row_version ON colleges (row_version);
+CREATE INDEX IF NOT EXISTS idx_users_row_version ON users (row_version);
+
+-- Keys of deleted rows (and the old key of a row whose primary key changed)
+CREATE TABLE IF NOT EXISTS deleted_rows (
+    table_name TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    row_version BIGINT NOT NULL,
+    deleted_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS idx_deleted_rows_table_version ON deleted_rows (table_name, row_version);
+
+-- Highest tombstone version pruned per table; deltas from before it can no longer be answered
+CREATE TABLE IF NOT EXISTS deleted_rows_horizon (
+    table_name TEXT PRIMARY KEY,
+    pruned_through BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION set_row_version() RETURNS trigger AS $$
+BEGIN
+    NEW.row_version := pg_current_xact_id()::text::bigint;
+    NEW.updated_at := now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger argument: the table's primary key column
+CREATE OR REPLACE FUNCTION record_deleted_row() RETURNS trigger AS $$
+DECLARE
+    old_key TEXT := to_jsonb(OLD) ->> TG_ARGV[0];
+BEGIN
+    IF TG_OP = 'DELETE' OR old_key IS DISTINCT FROM (to_jsonb(NEW) ->> TG_ARGV[0]) THEN
+        INSERT INTO deleted_rows (table_name, row_key, row_version)
+        VALUES (TG_TABLE_NAME, old_key, pg_current_xact_id()::text::bigint);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop tombstones older than `keep`; clients that last synced before them must reload in full
+CREATE OR REPLACE FUNCTION prune_deleted_rows(keep INTERVAL) RETURNS INTEGER AS $$
+DECLARE
+    pruned INTEGER;
+BEGIN
+    WITH removed AS (
+        DELETE FROM deleted_rows WHERE deleted_at < now() - keep
+        RETURNING table_name, row_version
+    ), horizon AS (
+        SELECT table_name, max(row_version) AS version, count(*) AS n FROM removed GROUP BY table_name
+    ), upserted AS (
+        INSERT INTO deleted_rows_horizon AS h (table_name, pruned_through)
+        SELECT table_name, version FROM horizon
+        ON CONFLICT (table_name) DO UPDATE
+            SET pruned_through = GREATEST(h.pruned_through, EXCLUDED.pruned_through)
+        RETURNING 1
+    )
+    SELECT COALESCE(sum(n), 0) INTO pruned FROM horizon;
+    RETURN pruned;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS students_set_row_version ON students;
+CREATE TRIGGER students_set_row_version
+    BEFORE INSERT OR UPDATE ON students
+    FOR EACH ROW EXECUTE FUNCTION set_row_version();
+DROP TRIGGER IF EXISTS students_record_deleted_row ON students;
+CREATE TRIGGER students_record_deleted_row
+    AFTER DELETE OR UPDATE OF id_number ON students
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row('id_number');
+
+DROP TRIGGER IF EXISTS programs_set_row_version ON programs;
+CREATE TRIGGER programs_set_row_version
+    BEFORE INSERT OR UPDATE ON programs
+    FOR EACH ROW EXECUTE FUNCTION set_row_version();
+DROP TRIGGER IF EXISTS programs_record_deleted_row ON programs;
+CREATE TRIGGER programs_record_deleted_row
+    AFTER DELETE OR UPDATE OF program_code ON programs
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row('program_code');
+
+DROP TRIGGER IF EXISTS colleges_set_row_version ON colleges;
+CREATE TRIGGER colleges_set_row_version
+    BEFORE INSERT OR UPDATE ON colleges
+    FOR EACH ROW EXECUTE FUNCTION set_row_version();
+DROP TRIGGER IF EXISTS colleges_record_deleted_row ON colleges;
+CREATE TRIGGER colleges_record_deleted_row
+    AFTER DELETE OR UPDATE OF college_code ON colleges
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row('college_code');
+
+DROP TRIGGER IF EXISTS users_set_row_version ON users;
+CREATE TRIGGER users_set_row_version
+    BEFORE INSERT OR UPDATE ON users
+    FOR EACH ROW EXECUTE FUNCTION set_row_version();
+DROP TRIGGER IF EXISTS users_record_deleted_row ON users;
+CREATE TRIGGER users_record_deleted_row
+    AFTER DELETE OR UPDATE OF user_id ON users
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row('user_id');
@@ -0,0 +1,12 @@
+-- Re-hashing an unchanged password on login (new hash method or cost, see User.rehash_password)
+-- is not a credential change and must not revoke the user's other sessions. That UPDATE runs with
+-- the transaction-local setting app.password_rehash = 'on'; a role change still bumps the epoch.
+CREATE OR REPLACE FUNCTION bump_user_token_version() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('app.password_rehash', true) = 'on' AND OLD.role IS NOT DISTINCT FROM NEW.role THEN
+        RETURN NEW;
+    END IF;
+    NEW.token_version := OLD.token_version + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,131 @@
+"""
+Background LISTEN/NOTIFY consumer: one dedicated connection per worker process that dispatches
+PostgreSQL notifications to in-process subscribers (cache invalidation, change feeds).
+"""
+import logging
+import os
+import select
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+from flask import Flask, current_app
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("app.db.notifications")
+
+# Channel fed by the statement-level triggers of db/migrations/0004_table_change_notify.sql
+TABLE_CHANGES_CHANNEL = "table_changes"
+
+
+class NotificationListener:
+    """
+    Listens on a fixed set of channels from a daemon thread and calls the subscribed callbacks
+    with each notification's payload. The connection is made outside the pool, so it never takes
+    a slot away from requests, and is re-established (after `reconnect_delay`) if it drops.
+    """
+
+    def __init__(self, engine: Engine, poll_timeout: float = 10.0, reconnect_delay: float = 2.0):
+        self.engine = engine
+        self.poll_timeout = poll_timeout
+        self.reconnect_delay = reconnect_delay
+        self._subscribers: Dict[str, List[Callable[[str], None]]] = defaultdict(list)
+        self._connect_callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stop = threading.Event()
+        self.connected = False
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        """Call `callback(payload)` for every notification on `channel`. Register before `start()`."""
+        self._subscribers[channel].append(callback)
+
+    def on_connect(self, callback: Callable[[], None]) -> None:
+        """
+        Call `callback()` each time the listener (re)connects. Notifications sent while it was
+        disconnected are lost, so subscribers should treat this as "everything may have changed".
+        """
+        self._connect_callbacks.append(callback)
+
+    def start(self) -> None:
+        """Start the listener thread for this process (a forked worker starts its own)."""
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self.connected = False
+            self._thread = threading.Thread(target=self._run, name="db-notifications", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _connect(self):
+        dialect = self.engine.dialect
+        cargs, cparams = dialect.create_connect_args(self.engine.url)
+        conn = dialect.dbapi.connect(*cargs, **cparams)
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            for channel in self._subscribers:
+                cursor.execute(f'LISTEN "{channel}"')
+        return conn
+
+    def _dispatch(self, channel: str, payload: str) -> None:
+        for callback in self._subscribers.get(channel, ()):
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception("Notification handler failed for channel=%s", channel)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                conn = self._connect()
+            except Exception as e:
+                logger.warning("LISTEN connection failed: %s", e)
+                self._stop.wait(self.reconnect_delay)
+                continue
+
+            try:
+                self.connected = True
+                for callback in self._connect_callbacks:
+                    callback()
+
+                while not self._stop.is_set():
+                    readable, _, _ = select.select([conn], [], [], self.poll_timeout)
+                    if not readable:
+                        # Idle: round-trip once so a dead connection is noticed and replaced
+                        with conn.cursor() as cursor:
+                            cursor.execute("SELECT 1")
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self._dispatch(notify.channel, notify.payload)
+            except Exception as e:
+                logger.warning("LISTEN connection lost: %s", e)
+            finally:
+                self.connected = False
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+            self._stop.wait(self.reconnect_delay)
+
+
+def init_notifications(app: Flask, engine: Engine) -> Optional[NotificationListener]:
+    """Create the app's listener (started lazily by its first user), unless DB_NOTIFY_ENABLED is off."""
+    if not app.config.get("DB_NOTIFY_ENABLED", True):
+        return None
+    listener = NotificationListener(engine)
+    app.extensions["db_notifications"] = listener
+    return listener
+
+
+def get_listener() -> Optional[NotificationListener]:
+    """Return the current app's listener, started for this process, or None when disabled."""
+    listener = current_app.extensions.get("db_notifications")
+    if listener is not None:
+        listener.start()
+    return listener
@@ -0,0 +1,143 @@
+"""
+Connection pool telemetry: counters and latency histograms fed by SQLAlchemy pool events.
+"""
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Optional
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("app.db.pool")
+
+# Upper bounds (milliseconds) of the histogram buckets; the last bucket is unbounded.
+DEFAULT_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (cumulative counts are derived on snapshot)."""
+
+    def __init__(self, buckets: Optional[List[float]] = None):
+        self.buckets = list(buckets or DEFAULT_BUCKETS_MS)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}" for bound in self.buckets] + ["le_inf"]
+        return {
+            "count": self.count,
+            "sum_ms": round(self.total, 3),
+            "avg_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class PoolMetrics:
+    """Counters and histograms describing how requests use the connection pool."""
+
+    def __init__(self, engine: Engine, slow_acquire_ms: float = 100.0):
+        self.engine = engine
+        self.slow_acquire_ms = slow_acquire_ms
+        self._lock = threading.Lock()
+        self.counters = {
+            "connects": 0,
+            "checkouts": 0,
+            "checkins": 0,
+            "invalidations": 0,
+            "checkout_timeouts": 0,
+            "slow_acquires": 0,
+        }
+        self.acquire_wait_ms = Histogram()
+        self.hold_time_ms = Histogram()
+
+    def _incr(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def pool_status(self) -> Dict[str, Any]:
+        """Current pool occupancy as reported by the QueuePool."""
+        pool = self.engine.pool
+        status = {"class": type(pool).__name__}
+        for name in ("size", "checkedout", "checkedin", "overflow"):
+            method = getattr(pool, name, None)
+            status[name] = method() if callable(method) else None
+        status["max_overflow"] = getattr(pool, "_max_overflow", None)
+        status["timeout"] = pool.timeout() if callable(getattr(pool, "timeout", None)) else None
+        return status
+
+    def record_acquire(self, wait_ms: float) -> None:
+        """Record how long a caller waited for `engine.connect()` to hand out a connection."""
+        with self._lock:
+            self.acquire_wait_ms.observe(wait_ms)
+        if wait_ms >= self.slow_acquire_ms:
+            self._incr("slow_acquires")
+            self.log_event("slow_acquire", wait_ms=round(wait_ms, 3))
+
+    def record_timeout(self, wait_ms: float) -> None:
+        """Record a checkout that gave up after `pool_timeout` seconds."""
+        self._incr("checkout_timeouts")
+        with self._lock:
+            self.acquire_wait_ms.observe(wait_ms)
+        self.log_event("checkout_timeout", level=logging.WARNING, wait_ms=round(wait_ms, 3))
+
+    def log_event(self, name: str, level: int = logging.INFO, **fields: Any) -> None:
+        """Emit a single key=value log line including the pool occupancy."""
+        fields.update({k: v for k, v in self.pool_status().items() if k != "class"})
+        logger.log(level, "db_pool event=%s %s", name, " ".join(f"{k}={v}" for k, v in fields.items()))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pool": self.pool_status(),
+                "counters": dict(self.counters),
+                "acquire_wait_ms": self.acquire_wait_ms.snapshot(),
+                "hold_time_ms": self.hold_time_ms.snapshot(),
+            }
+
+    # Pool event listeners
+
+    def _on_connect(self, dbapi_conn, connection_record) -> None:
+        self._incr("connects")
+
+    def _on_checkout(self, dbapi_conn, connection_record, connection_proxy) -> None:
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        self._incr("checkouts")
+
+    def _on_checkin(self, dbapi_conn, connection_record) -> None:
+        started = connection_record.info.pop("checked_out_at", None)
+        with self._lock:
+            self.counters["checkins"] += 1
+            if started is not None:
+                self.hold_time_ms.observe((time.perf_counter() - started) * 1000)
+
+    def _on_invalidate(self, dbapi_conn, connection_record, exception) -> None:
+        self._incr("invalidations")
+
+    def install(self) -> None:
+        event.listen(self.engine, "connect", self._on_connect)
+        event.listen(self.engine, "checkout", self._on_checkout)
+        event.listen(self.engine, "checkin", self._on_checkin)
+        event.listen(self.engine, "invalidate", self._on_invalidate)
+
+
+def init_pool_metrics(app: Flask, engine: Engine) -> PoolMetrics:
+    """Attach pool listeners to `engine` and register the collector on `app`."""
+    metrics = PoolMetrics(engine, slow_acquire_ms=app.config.get("DB_POOL_SLOW_ACQUIRE_MS", 100))
+    metrics.install()
+    app.extensions["db_pool_metrics"] = metrics
+    return metrics
@@ -0,0 +1,130 @@
+"""
+Per-request SQL telemetry: statement count and database time, fed by SQLAlchemy cursor events.
+
+Every statement executed for a request (through `execute_sql` or any other use of the pooled
+engine) is counted and timed. When the response is finished the totals are
+- sent to the client as a `Server-Timing` header (`db;dur=<ms>;desc="<n> queries"` and `app;dur=<ms>`),
+- written as one key=value line to the "app.access" logger (INFO, to stderr unless logging
+  configuration already gives that logger a handler),
+- checked for statement shapes repeated more than DB_QUERY_REPEAT_THRESHOLD times, the usual sign
+  of a per-row lookup in a loop (N+1), which is logged as a warning on "app.db.queries".
+
+Statements run while a streamed body is generated happen after the response headers are sent and
+are not included.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from typing import List, Optional, Tuple
+from flask import Flask, Response, current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("app.db.queries")
+access_logger = logging.getLogger("app.access")
+
+# Literals that may still be inlined in SQL text; bound parameters already share one shape
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+\b")
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with whitespace collapsed and literals replaced by `?`."""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    return " ".join(shape.split())
+
+
+class QueryStats:
+    """Statements executed for one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """(shape, count) of every statement shape executed more than `threshold` times, most frequent first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """The stats of the request being handled, or None outside a request."""
+    return g.get("query_stats") if has_app_context() else None
+
+
+# Engine event listeners
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    stats = current_query_stats()
+    if stats is not None:
+        stats.record(statement, (time.perf_counter() - started) * 1000)
+
+
+# Request hooks
+
+def _start_request() -> None:
+    g.query_stats = QueryStats()
+    g.request_started = time.perf_counter()
+
+
+def _finish_request(response: Response) -> Response:
+    stats = current_query_stats()
+    started = g.get("request_started")
+    if stats is None or started is None:
+        return response
+    duration_ms = (time.perf_counter() - started) * 1000
+    config = current_app.config
+
+    if config.get("SERVER_TIMING_ENABLED", True):
+        queries = "1 query" if stats.count == 1 else f"{stats.count} queries"
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={stats.total_ms:.2f};desc="{queries}", app;dur={duration_ms:.2f}'
+        )
+
+    threshold = config.get("DB_QUERY_REPEAT_THRESHOLD", 10)
+    repeated = stats.repeated(threshold) if threshold > 0 else []
+    for shape, count in repeated:
+        logger.warning("repeated_query method=%s path=%s count=%d statement=%.300s",
+                       request.method, request.path, count, shape)
+
+    if config.get("ACCESS_LOG_ENABLED", True):
+        access_logger.info(
+            "access method=%s path=%s status=%d duration_ms=%.3f db_queries=%d db_ms=%.3f db_repeated=%d",
+            request.method, request.path, response.status_code, duration_ms,
+            stats.count, stats.total_ms, len(repeated)
+        )
+    return response
+
+
+def init_query_stats(app: Flask) -> None:
+    """Time every statement on the app's engine and report per-request totals."""
+    # The app configures no logging, so INFO records would be dropped at the default WARNING level
+    if app.config.get("ACCESS_LOG_ENABLED", True) and not access_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        access_logger.addHandler(handler)
+        access_logger.setLevel(logging.INFO)
+        access_logger.propagate = False
+
+    engine: Engine = app.extensions["db_engine"]
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
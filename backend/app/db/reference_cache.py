@@ -0,0 +1,86 @@
+"""
+In-process cache of the small, rarely-changing reference tables (programs, colleges).
+
+Each table has a version number that is bumped whenever a `table_changes` notification names it
+(or a local write invalidates it); cached values remember the version they were loaded at and are
+discarded once it moves on. While the LISTEN connection is down, values also expire after
+REFERENCE_CACHE_TTL seconds so a worker that misses notifications cannot serve stale data for long.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, TypeVar
+from flask import Flask, current_app
+from .notifications import TABLE_CHANGES_CHANNEL, get_listener
+
+T = TypeVar("T")
+
+
+class TableCache:
+    """Versioned key -> value cache whose entries are all invalidated when `table` changes."""
+
+    def __init__(self, table: str, maxsize: int = 256):
+        self.table = table
+        self.maxsize = maxsize
+        self.version = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, load: Callable[[], T]) -> T:
+        """Return the cached value for `key`, calling `load()` when it is missing or stale."""
+        listener = get_listener()
+        ttl = None if listener is not None and listener.connected else current_app.config.get("REFERENCE_CACHE_TTL", 30)
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                version, loaded_at, value = entry
+                if version == self.version and (ttl is None or time.monotonic() - loaded_at < ttl):
+                    self._data.move_to_end(key)
+                    return value
+            version = self.version
+
+        value = load()
+        with self._lock:
+            # A change that landed while loading leaves the version moved on; don't keep the old copy
+            if version == self.version:
+                self._data[key] = (version, time.monotonic(), value)
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._data.clear()
+
+
+programs_cache = TableCache("programs")
+colleges_cache = TableCache("colleges")
+
+REFERENCE_CACHES: Dict[str, TableCache] = {
+    cache.table: cache for cache in (programs_cache, colleges_cache)
+}
+
+
+def invalidate_reference_table(table: str) -> None:
+    """Drop the cached copy of `table`, if it is a cached reference table."""
+    cache = REFERENCE_CACHES.get(table)
+    if cache is not None:
+        cache.invalidate()
+
+
+def invalidate_reference_caches() -> None:
+    for cache in REFERENCE_CACHES.values():
+        cache.invalidate()
+
+
+def init_reference_cache(app: Flask) -> None:
+    """Subscribe the reference caches to the app's change notifications."""
+    listener = app.extensions.get("db_notifications")
+    if listener is None:
+        return
+    listener.subscribe(TABLE_CHANGES_CHANNEL, invalidate_reference_table)
+    listener.on_connect(invalidate_reference_caches)
+
@@ -24,6 +24,6 @@ CREATE TABLE IF NOT EXISTS students (
     year_level INT CHECK (year_level BETWEEN 1 AND 5),
     gender VARCHAR(10) CHECK (gender IN ('MALE','FEMALE','OTHER')),
     program_code VARCHAR(20) REFERENCES programs(program_code) ON DELETE SET NULL ON UPDATE CASCADE,
-    photo_path TEXT;
+    photo_path TEXT
 );
   
\ No newline at end of file
@@ -11,7 +11,7 @@ from flask import Flask
 # Fix Python path - add this at the top
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from app.db.database import execute_sql
+from app.db.database import execute_sql, transaction
 
 # ========== SAMPLE DATA ==========
 first_names = [
@@ -202,9 +202,11 @@ def run_seed(app: Flask):
     """Run the seeding inside Flask app context."""
     with app.app_context():
         print("🚀 Starting database seeding...")
-        seed_colleges_and_programs()
-        students = generate_random_students(10000)
-        insert_students(students)
+        # One commit for the whole seed instead of one per row
+        with transaction():
+            seed_colleges_and_programs()
+            students = generate_random_students(10000)
+            insert_students(students)
         print("🎓 Seeding complete.")
 
 
@@ -0,0 +1,59 @@
+"""
+Registry of pre-built SQL statements keyed by query shape.
+
+Building a `TextClause` parses the SQL for bind parameters on every call, and the dynamic
+search queries are assembled from f-strings per request. Statements registered here are built
+once per shape (filter fields, sort order, pagination mode) and then reused, so the only per-call
+work is a dict lookup; because the SQL text of a shape never changes, SQLAlchemy's compiled
+cache keeps hitting as well.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Union
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+
+# Shapes are bounded by the model's fields and sort options; the cap only guards against misuse.
+DEFAULT_MAXSIZE = 2048
+
+
+class StatementRegistry:
+    """Thread-safe map of shape key -> `TextClause`, evicting the oldest shape past `maxsize`."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._statements: Dict[Hashable, TextClause] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, build: Callable[[], Union[str, TextClause]]) -> TextClause:
+        """Return the statement registered under `key`, building it with `build()` on first use."""
+        statement = self._statements.get(key)
+        if statement is not None:
+            self.hits += 1
+            return statement
+
+        built = build()
+        statement = text(built) if isinstance(built, str) else built
+        with self._lock:
+            self.misses += 1
+            self._statements.setdefault(key, statement)
+            while len(self._statements) > self.maxsize:
+                self._statements.pop(next(iter(self._statements)))
+            return self._statements[key]
+
+    def text(self, sql: str) -> TextClause:
+        """Return the registered `TextClause` for a literal SQL string (the string is its own key)."""
+        return self.get(sql, lambda: sql)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._statements), "hits": self.hits, "misses": self.misses}
+
+
+statements = StatementRegistry()
@@ -0,0 +1,81 @@
+"""
+Retention of the `deleted_rows` tombstones behind the GET /<entity>/delta endpoints.
+
+Tombstones older than DELETED_ROWS_RETENTION_DAYS are removed by the `prune_deleted_rows()` SQL
+function (db/migrations/0008_row_versions.sql), which also moves each table's pruned horizon
+forward so clients that last synced before it get DELTA_EXPIRED (410) and reload in full.
+
+Pruning runs
+- on demand with `flask prune-deleted-rows [--days N]`, e.g. from cron, and
+- opportunistically from delta reads, at most once every DELETED_ROWS_PRUNE_INTERVAL seconds per
+  worker (0 leaves pruning to the command).
+"""
+import logging
+import threading
+import time
+from typing import Optional
+import click
+from flask import Flask, current_app
+from .database import execute_sql
+
+logger = logging.getLogger("app.db.tombstones")
+
+
+class PruneSchedule:
+    """When this worker last pruned, so delta reads prune at most once per interval."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._last_run: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def due(self) -> bool:
+        """Claim the next run if the interval has passed; only one caller gets True."""
+        if self.interval <= 0:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if self._last_run is not None and now - self._last_run < self.interval:
+                return False
+            self._last_run = now
+            return True
+
+
+def prune_deleted_rows(retention_days: Optional[float] = None) -> int:
+    """Delete tombstones older than `retention_days` (default DELETED_ROWS_RETENTION_DAYS); return how many."""
+    if retention_days is None:
+        retention_days = current_app.config["DELETED_ROWS_RETENTION_DAYS"]
+    result = execute_sql(
+        "SELECT prune_deleted_rows(make_interval(secs => :seconds))",
+        {"seconds": float(retention_days) * 86400}
+    )
+    if result is None:
+        raise RuntimeError("Failed to prune deleted_rows")
+    return result.scalar() or 0
+
+
+def maybe_prune_deleted_rows() -> None:
+    """Prune if this worker's interval has passed; failures are logged, never raised to the reader."""
+    schedule: Optional[PruneSchedule] = current_app.extensions.get("tombstone_prune_schedule")
+    if schedule is None or not schedule.due():
+        return
+    try:
+        pruned = prune_deleted_rows()
+    except Exception as e:
+        logger.warning(f"Pruning deleted_rows failed: {e}")
+        return
+    if pruned:
+        logger.info(f"Pruned {pruned} deleted_rows tombstones")
+
+
+def init_tombstone_pruning(app: Flask) -> None:
+    """Schedule opportunistic pruning and register the `prune-deleted-rows` command."""
+    app.extensions["tombstone_prune_schedule"] = PruneSchedule(app.config["DELETED_ROWS_PRUNE_INTERVAL"])
+
+    @app.cli.command("prune-deleted-rows")
+    @click.option("--days", type=float, default=None,
+                  help="Keep tombstones this many days (default DELETED_ROWS_RETENTION_DAYS).")
+    def prune_deleted_rows_command(days: Optional[float]) -> None:
+        """Delete delta-sync tombstones past their retention."""
+        pruned = prune_deleted_rows(days)
+        click.echo(f"Pruned {pruned} deleted_rows tombstones")
@@ -0,0 +1,33 @@
+from flask import Blueprint
+from flask_jwt_extended import jwt_required
+from ..utils.route_utils import make_response
+from ..utils.admin_required import admin_required
+from .services import get_db_pool_stats
+
+bp = Blueprint("internal", __name__)
+
+
+@bp.get("/db-pool")
+@jwt_required()
+@admin_required
+def db_pool_route():
+    try:
+        result = get_db_pool_stats()
+        if result["success"]:
+            return make_response({
+                "status": "success",
+                "message": result["message"],
+                "data": result["data"]
+            }, 200)
+        else:
+            return make_response({
+                "status": "error",
+                "message": result["message"],
+                "error_code": result["error_code"]
+            }, 500)
+    except Exception as e:
+        return make_response({
+            "status": "error",
+            "message": f"Unexpected error occurred: {str(e)}",
+            "error_code": "UNEXPECTED_ERROR"
+        }, 500)
@@ -0,0 +1,26 @@
+from typing import Dict, Any
+from flask import current_app
+
+
+def get_db_pool_stats() -> Dict[str, Any]:
+    """Get connection pool counters, histograms and current occupancy."""
+    try:
+        metrics = current_app.extensions.get("db_pool_metrics")
+        if metrics is None:
+            return {
+                "success": False,
+                "message": "Connection pool metrics are not enabled",
+                "error_code": "POOL_METRICS_UNAVAILABLE"
+            }
+
+        return {
+            "success": True,
+            "message": "Connection pool metrics retrieved",
+            "data": metrics.snapshot()
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Failed to retrieve pool metrics: {str(e)}",
+            "error_code": "RETRIEVAL_ERROR"
+        }
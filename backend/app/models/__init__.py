@@ -1,8 +1,9 @@
 from .base_model import BaseModel
 from .user import User
-from .college import College
-from .program import Program
-from .student import Student
+from .college import College, CollegeRecord
+from .program import Program, ProgramRecord
+from .student import Student, StudentRecord
 
-__all__ = ['BaseModel', 'User', 'College', 'Program', 'Student']
+__all__ = ['BaseModel', 'User', 'College', 'Program', 'Student',
+           'CollegeRecord', 'ProgramRecord', 'StudentRecord']
 
@@ -1,15 +1,26 @@
 """
 Base model class providing common database operations and error handling.
 """
-from typing import Dict, Any, List, Optional, TypeVar, Generic, Tuple
+from typing import Dict, Any, Iterator, List, Optional, TypeVar, Generic, Tuple
 from abc import ABC, abstractmethod
-from ..db.database import execute_sql
+from sqlalchemy.exc import IntegrityError
+from ..db.database import execute_sql, stream_sql
+from ..db.statements import statements
+from ..db.tombstones import maybe_prune_deleted_rows
+import base64
+import json
 import logging
+import re
 
 T = TypeVar('T')
 
 logger = logging.getLogger(__name__)
 
+# PostgreSQL's detail for a single-column key violation: Key (column)=(value) ...
+_KEY_DETAIL = re.compile(r"Key \((\w+)\)=\((.*)\) (?:already exists|is not present)")
+# A quoted template placeholder, e.g. " '{program_code}'"
+_PLACEHOLDER = re.compile(r"\s*'?\{\w+\}'?")
+
 
 class ModelError(Exception):
     """Base exception for model-related errors."""
@@ -38,6 +49,26 @@ class NotFoundError(ModelError):
 class BaseModel(ABC, Generic[T]):
     """Base model class with common database operations."""
     
+    # Supported values of the `search_mode` list parameter ("" is the default ILIKE search)
+    SEARCH_MODES = ("", "ilike", "trigram", "fts")
+    
+    # Lower-cased, trigram-indexed column concatenating the tokenized search fields (see db/migrations)
+    TRIGRAM_COLUMN: Optional[str] = None
+    
+    # Generated tsvector column and the text search configuration it was built with
+    FTS_COLUMN: Optional[str] = None
+    FTS_CONFIG: str = "simple"
+    
+    # Slotted dataclass returned by the list read paths; its fields follow SELECT_COLUMNS order.
+    # Treat instances as read-only (frozen=True would make construction about 4x slower).
+    RECORD: Optional[type] = None
+    
+    # Constraint name -> (error code, message template). A write that violates one of these raises
+    # ValidationError with that code, the message formatted with the statement's parameters (or,
+    # for multi-row statements, the offending key PostgreSQL reports), so writes detect duplicates
+    # and missing references themselves instead of checking first.
+    CONSTRAINT_ERRORS: Dict[str, Tuple[str, str]] = {}
+    
     @property
     @abstractmethod
     def table_name(self) -> str:
@@ -61,11 +92,19 @@ class BaseModel(ABC, Generic[T]):
         """Create model instance from dictionary."""
         pass
     
-    def _execute_query(self, query: str, params: Dict[str, Any] = None) -> Any:
+    @classmethod
+    def _records(cls, result: Any) -> List[Any]:
+        """Build RECORD instances positionally from a result selecting SELECT_COLUMNS."""
+        record = cls.RECORD
+        return [record(*row) for row in result.all()] if result else []
+    
+    def _execute_query(self, query: Any, params: Dict[str, Any] = None) -> Any:
         """Execute a database query with error handling."""
         try:
             result = execute_sql(query, params or {})
             return result
+        except IntegrityError as e:
+            raise self._constraint_error(e, params or {})
         except Exception as e:
             logger.error(f"Database query failed: {query}, params: {params}, error: {str(e)}")
             raise DatabaseError(
@@ -74,6 +113,138 @@ class BaseModel(ABC, Generic[T]):
                 details={"query": query, "params": params}
             )
     
+    def _constraint_error(self, error: IntegrityError, params: Dict[str, Any]) -> ModelError:
+        """Translate a constraint violation into the error declared for it in CONSTRAINT_ERRORS."""
+        diag = getattr(error.orig, "diag", None)
+        constraint = getattr(diag, "constraint_name", None)
+        if constraint in self.CONSTRAINT_ERRORS:
+            error_code, template = self.CONSTRAINT_ERRORS[constraint]
+            # Batch statements bind arrays under other names; fall back to the key in the error detail
+            key = _KEY_DETAIL.match(getattr(diag, "message_detail", None) or "")
+            for fields in (params, {key.group(1): key.group(2)} if key else {}):
+                try:
+                    message = template.format(**fields)
+                    break
+                except (KeyError, IndexError):
+                    continue
+            else:
+                message = _PLACEHOLDER.sub("", template)
+            return ValidationError(message, error_code=error_code)
+        
+        logger.error(f"Unmapped constraint violation on {self.table_name}: {error.orig}")
+        return DatabaseError(
+            f"Database operation failed: {error.orig}",
+            error_code="DATABASE_ERROR",
+            details={"constraint": constraint}
+        )
+    
+    def _update_row(self, set_items: List[str], params: Dict[str, Any], key_value: Any,
+                    expected_version: Optional[int] = None, old_columns: Tuple[str, ...] = ()) -> Optional[Any]:
+        """
+        Apply `set_items` to the row keyed `key_value` in a single statement and return the written
+        row (SELECT_COLUMNS, plus `old_<column>` holding the pre-update value of each of
+        `old_columns`), or None when there is no such row. With `expected_version` only a row still
+        at that row_version is written; a row at any other version raises ValidationError(VERSION_CONFLICT).
+        """
+        table, key = self.table_name, self.primary_key
+        params = dict(params, orig_key=key_value)
+        where = f"{key} = :orig_key"
+        if expected_version is not None:
+            where += " AND row_version = :expected_version"
+            params["expected_version"] = expected_version
+
+        if old_columns:
+            # The row lock makes the CTE read the same row version the UPDATE then writes
+            old = ", ".join(f"{column} AS old_{column}" for column in old_columns)
+            query = f"""
+                WITH old AS (SELECT {key} AS old_key, {old} FROM {table} WHERE {where} FOR UPDATE)
+                UPDATE {table} SET {', '.join(set_items)}
+                FROM old
+                WHERE {key} = old.old_key
+                RETURNING {self.SELECT_COLUMNS}, {', '.join(f'old_{column}' for column in old_columns)}
+            """
+        else:
+            query = f"UPDATE {table} SET {', '.join(set_items)} WHERE {where} RETURNING {self.SELECT_COLUMNS}"
+
+        result = self._execute_query(query, params)
+        row = result.mappings().first() if result else None
+        if row is not None or expected_version is None:
+            return row
+
+        # Nothing written: tell a stale version apart from a missing row (failure path only)
+        current = self._execute_query(
+            f"SELECT row_version FROM {table} WHERE {key} = :orig_key", {"orig_key": key_value}
+        ).scalar()
+        if current is None:
+            return None
+        raise ValidationError(
+            "This record was changed by someone else; reload it and try again",
+            error_code="VERSION_CONFLICT",
+            details={"expected_version": expected_version, "current_version": current}
+        )
+
+    @classmethod
+    def changes_since(cls, since: int) -> Dict[str, Any]:
+        """
+        Rows written and keys deleted at or after row version `since` (0 for everything), plus the
+        version to resume from next time. Raises ValidationError(DELTA_EXPIRED) when tombstones
+        from that far back have been pruned and the client must reload in full.
+        """
+        instance = cls()
+        table, key = instance.table_name, instance.primary_key
+        params = {"table": table, "since": since}
+        maybe_prune_deleted_rows()
+
+        # Resume point first: taken before the reads, so anything they miss is at or above it
+        head = instance._execute_query(
+            """
+            SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint,
+                   (SELECT pruned_through FROM deleted_rows_horizon WHERE table_name = :table)
+            """,
+            params
+        )
+        row = head.first() if head else None
+        if row is None:
+            raise DatabaseError("Failed to read the sync position", error_code="DATABASE_ERROR")
+        version, pruned_through = row
+        if since > 0 and pruned_through is not None and since <= pruned_through:
+            raise ValidationError(
+                "Changes since this version are no longer available, reload everything",
+                error_code="DELTA_EXPIRED",
+                details={"since": since, "pruned_through": pruned_through}
+            )
+
+        changed = instance._execute_query(
+            instance._statement("delta_changed", build=lambda: f"""
+                SELECT {cls.SELECT_COLUMNS}, updated_at
+                FROM {table}
+                WHERE row_version >= :since
+                ORDER BY row_version, {key}
+            """),
+            params
+        )
+        # A key deleted and then re-created is reported only as changed
+        deleted = instance._execute_query(
+            instance._statement("delta_deleted", build=lambda: f"""
+                SELECT DISTINCT d.row_key
+                FROM deleted_rows d
+                WHERE d.table_name = :table AND d.row_version >= :since
+                  AND NOT EXISTS (
+                      SELECT 1 FROM {table} t
+                      WHERE t.{key}::text = d.row_key AND t.row_version >= d.row_version
+                  )
+            """),
+            params
+        )
+        if changed is None or deleted is None:
+            raise DatabaseError("Failed to read changes", error_code="DATABASE_ERROR")
+
+        return {
+            "changed": [dict(row) for row in changed.mappings().all()],
+            "deleted": [row[0] for row in deleted.all()],
+            "version": version,
+        }
+    
     def _validate_required_fields(self, data: Dict[str, Any], required_fields: List[str]) -> None:
         """Validate that all required fields are present and not empty."""
         missing_fields = []
@@ -88,8 +259,15 @@ class BaseModel(ABC, Generic[T]):
                 details={"missing_fields": missing_fields}
             )
     
-    def _build_search_filter(self, search_by: str, search_term: str, allowed_fields: List[str]) -> Tuple[str, Dict]:
+    def _build_search_filter(self, search_by: str, search_term: str, allowed_fields: List[str],
+                             search_mode: str = "") -> Tuple[str, Dict]:
         """Build search filter with support for tokenized multi-field search."""
+        if search_mode not in self.SEARCH_MODES:
+            raise ValidationError(
+                f"Invalid search mode: {search_mode}. Must be one of {', '.join(m for m in self.SEARCH_MODES if m)}",
+                error_code="INVALID_SEARCH_MODE"
+            )
+        
         if not search_term or not search_term.strip():
             return "", {}
         
@@ -100,9 +278,34 @@ class BaseModel(ABC, Generic[T]):
         if search_by and search_by in allowed_fields:
             return self._build_single_field_filter(search_by, search_term, params)
         
+        # Index-backed fuzzy search where the model has a trigram column
+        if search_mode == "trigram" and self.TRIGRAM_COLUMN:
+            return self._build_trigram_search_filter(search_term, params)
+        
+        # Ranked full-text search over the generated tsvector column
+        if search_mode == "fts" and self.FTS_COLUMN:
+            params["fts_query"] = search_term
+            return f"WHERE {self.FTS_COLUMN} @@ websearch_to_tsquery('{self.FTS_CONFIG}', :fts_query)", params
+        
         # Otherwise, use tokenized search across multiple fields
         return self._build_tokenized_search_filter(search_term, allowed_fields, params)
     
+    @staticmethod
+    def _like_prefix(prefix: str) -> str:
+        """Escape LIKE wildcards in `prefix` and append the trailing `%`."""
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return f"{escaped}%"
+    
+    def _build_search_rank(self, search_by: str, search_term: str, search_mode: str = "") -> str:
+        """Build the relevance ORDER BY term matching `_build_search_filter`, or "" when unranked."""
+        if search_by or not search_term or not search_term.strip():
+            return ""
+        if search_mode == "trigram" and self.TRIGRAM_COLUMN:
+            return f"word_similarity(:trigram_query, {self.TRIGRAM_COLUMN}) DESC"
+        if search_mode == "fts" and self.FTS_COLUMN:
+            return f"ts_rank({self.FTS_COLUMN}, websearch_to_tsquery('{self.FTS_CONFIG}', :fts_query)) DESC"
+        return ""
+    
     def _build_single_field_filter(self, field: str, search_term: str, params: Dict) -> Tuple[str, Dict]:
         """Build filter for a single field."""
         param_name = f"search_{field}"
@@ -146,8 +349,8 @@ class BaseModel(ABC, Generic[T]):
         where_clause = "WHERE " + " AND ".join(conditions)
         return where_clause, params
     
-    def _build_sort_clause(self, sort_by: str, sort_order: str, allowed_sort_fields: List[str]) -> str:
-        """Build ORDER BY clause with context-aware secondary sorting rules."""
+    def _resolve_sort_fields(self, sort_by: str, sort_order: str, allowed_sort_fields: List[str]) -> List[Tuple[str, str]]:
+        """Resolve (field, order) pairs with context-aware secondary sorting rules."""
         if sort_by not in allowed_sort_fields:
             sort_by = allowed_sort_fields[0]
 
@@ -178,10 +381,219 @@ class BaseModel(ABC, Generic[T]):
         else:
             sort_fields = [(sort_by, sort_order)]
 
-        sort_clause = ", ".join(f"{field} {order}" for field, order in sort_fields if field in allowed_sort_fields)
+        return [(field, order) for field, order in sort_fields if field in allowed_sort_fields]
+
+    def _build_trigram_search_filter(self, search_term: str, params: Dict) -> Tuple[str, Dict]:
+        """
+        Build tokenized search over the trigram column.
+        Each token must appear as a substring or as a close (typo-tolerant) word match; both
+        predicates are served by the pg_trgm GIN index instead of a sequential scan.
+        """
+        tokens = [token.strip().lower() for token in search_term.split() if token.strip()]
+        
+        if not tokens:
+            return "", {}
+        
+        column = self.TRIGRAM_COLUMN
+        conditions = []
+        for i, token in enumerate(tokens):
+            params[f"trigram_like_{i}"] = f"%{token}%"
+            params[f"trigram_token_{i}"] = token
+            conditions.append(f"({column} LIKE :trigram_like_{i} OR :trigram_token_{i} <% {column})")
+        
+        params["trigram_query"] = " ".join(tokens)
+        return "WHERE " + " AND ".join(conditions), params
+    
+    def _build_sort_clause(self, sort_by: str, sort_order: str, allowed_sort_fields: List[str],
+                           rank: str = "") -> str:
+        """Build ORDER BY clause with context-aware secondary sorting rules, after an optional rank term."""
+        sort_fields = self._resolve_sort_fields(sort_by, sort_order, allowed_sort_fields)
+        sort_clause = ", ".join(f"{field} {order}" for field, order in sort_fields)
+        if rank:
+            sort_clause = f"{rank}, {sort_clause}"
         return f"ORDER BY {sort_clause}"
     
-    def _build_pagination_clause(self, limit: int, offset: int) -> str:
-        """Build LIMIT and OFFSET clause."""
-        return f"LIMIT {limit} OFFSET {offset}"
+    def _build_pagination_clause(self, limit: int, offset: int, params: Dict[str, Any]) -> str:
+        """Build LIMIT and OFFSET clause; the values are bound so every page shares one statement."""
+        params["limit"] = int(limit)
+        params["offset"] = int(offset)
+        return "LIMIT :limit OFFSET :offset"
+    
+    def _statement(self, *shape: Any, build) -> Any:
+        """Look up the statement for `shape` on this table, building it with `build()` on first use."""
+        return statements.get((type(self).__name__, *shape), build)
+
+    def _search_with_count(self, columns: str, filters: str, params: Dict[str, Any], sort_clause: str,
+                           limit: Optional[int] = None, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Run a paged search and return the page rows (as plain dicts) together with the unpaged total.
+        The total rides on each row as a window count, so the filter is evaluated only once.
+        """
+        params = dict(params)
+        pagination_clause = self._build_pagination_clause(limit, offset, params) if limit else ""
+        query = self._statement("search_with_count", columns, filters, sort_clause, pagination_clause, build=lambda: f"""
+            SELECT {columns}, COUNT(*) OVER() AS total_count
+            FROM {self.table_name}
+            {filters}
+            {sort_clause}
+            {pagination_clause}
+        """)
+
+        result = self._execute_query(query, params)
+        if result:
+            # zip() stops before the trailing total_count column
+            keys = list(result.keys())[:-1]
+            raw_rows = result.all()
+            rows = [dict(zip(keys, row)) for row in raw_rows]
+        else:
+            raw_rows, rows = [], []
+        if rows:
+            return rows, raw_rows[0][-1]
+
+        # A page past the end has no row to carry the window count; only then count separately
+        if offset > 0:
+            count_query = self._statement("count", filters, build=lambda: f"SELECT COUNT(*) FROM {self.table_name} {filters}")
+            count_result = self._execute_query(count_query, params)
+            return rows, (count_result.scalar() or 0) if count_result else 0
+
+        return rows, 0
+
+    def _stream_search(self, columns: str, filters: str, params: Dict[str, Any], sort_clause: str) -> Iterator[Any]:
+        """Stream every row matching the search filter, in sort order, through a server-side cursor."""
+        query = self._statement("stream", columns, filters, sort_clause, build=lambda: f"""
+            SELECT {columns}
+            FROM {self.table_name}
+            {filters}
+            {sort_clause}
+        """)
+        try:
+            return stream_sql(query, params)
+        except Exception as e:
+            logger.error(f"Database query failed: {query}, params: {params}, error: {str(e)}")
+            raise DatabaseError(
+                f"Database operation failed: {str(e)}",
+                error_code="DATABASE_ERROR",
+                details={"query": query, "params": params}
+            )
+
+    def _keyset_sort_fields(self, sort_by: str, sort_order: str, allowed_sort_fields: List[str]) -> List[Tuple[str, str]]:
+        """Resolve the sort fields and append the primary key so the ordering is total."""
+        keyset = []
+        for field, order in self._resolve_sort_fields(sort_by, sort_order, allowed_sort_fields):
+            if field not in (f for f, _ in keyset):
+                keyset.append((field, order))
+        if self.primary_key not in (f for f, _ in keyset):
+            keyset.append((self.primary_key, "ASC"))
+        return keyset
+
+    def _encode_cursor(self, row: Any, sort_fields: List[Tuple[str, str]]) -> str:
+        """Encode the sort key of `row` as an opaque, URL-safe cursor."""
+        payload = {
+            "s": [f"{field} {order}" for field, order in sort_fields],
+            "k": [row[field] for field, _ in sort_fields],
+        }
+        raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def _decode_cursor(self, cursor: str, sort_fields: List[Tuple[str, str]]) -> List[Any]:
+        """Decode a cursor produced by `_encode_cursor` for the same sort order."""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            keys = payload["k"]
+            signature = payload["s"]
+        except (ValueError, TypeError, KeyError):
+            raise ValidationError(
+                "Invalid pagination cursor",
+                error_code="INVALID_CURSOR"
+            )
+
+        if signature != [f"{field} {order}" for field, order in sort_fields] or len(keys) != len(sort_fields):
+            raise ValidationError(
+                "Pagination cursor does not match the requested sort order",
+                error_code="INVALID_CURSOR"
+            )
+        return keys
+
+    def _build_keyset_condition(self, sort_fields: List[Tuple[str, str]], keys: List[Any], params: Dict) -> str:
+        """
+        Build the predicate selecting rows strictly after `keys` in `sort_fields` order.
+        Follows PostgreSQL's default NULL placement (last for ASC, first for DESC).
+        """
+        alternatives = []
+        for i, (field, order) in enumerate(sort_fields):
+            terms = []
+            for j, (prev_field, _) in enumerate(sort_fields[:i]):
+                if keys[j] is None:
+                    terms.append(f"{prev_field} IS NULL")
+                else:
+                    terms.append(f"{prev_field} = :cursor_{j}")
+
+            if keys[i] is None:
+                if order == "ASC":
+                    continue  # NULLs sort last; nothing comes after them on this field
+                terms.append(f"{field} IS NOT NULL")
+            elif order == "ASC":
+                terms.append(f"({field} > :cursor_{i} OR {field} IS NULL)")
+            else:
+                terms.append(f"{field} < :cursor_{i}")
+
+            alternatives.append(" AND ".join(terms))
+
+        for i, key in enumerate(keys):
+            if key is not None:
+                params[f"cursor_{i}"] = key
+
+        if not alternatives:
+            return "FALSE"
+        return " OR ".join(f"({alternative})" for alternative in alternatives)
+
+    def _search_keyset(self, columns: str, filters: str, params: Dict[str, Any], sort_fields: List[Tuple[str, str]],
+                       limit: int, after: Optional[str] = None,
+                       before: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[str]]:
+        """
+        Run a cursor-paginated search and return (rows as plain dicts, next_cursor, prev_cursor).
+        Pages are located by comparing sort keys instead of skipping `OFFSET` rows.
+        """
+        backwards = bool(before)
+        cursor = before if backwards else after
+        params = dict(params)
+
+        # Walking backwards is walking forwards over the reversed ordering
+        scan_fields = [(field, "DESC" if order == "ASC" else "ASC") for field, order in sort_fields] \
+            if backwards else sort_fields
+
+        where = filters
+        if cursor:
+            keys = self._decode_cursor(cursor, sort_fields)
+            condition = self._build_keyset_condition(scan_fields, keys, params)
+            where = f"{filters} AND ({condition})" if filters else f"WHERE {condition}"
+
+        sort_clause = ", ".join(f"{field} {order}" for field, order in scan_fields)
+        params["keyset_limit"] = int(limit) + 1
+        query = self._statement("keyset", columns, where, sort_clause, build=lambda: f"""
+            SELECT {columns}
+            FROM {self.table_name}
+            {where}
+            ORDER BY {sort_clause}
+            LIMIT :keyset_limit
+        """)
+
+        result = self._execute_query(query, params)
+        if result:
+            keys = list(result.keys())
+            rows = [dict(zip(keys, row)) for row in result.all()]
+        else:
+            rows = []
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        if backwards:
+            rows = rows[::-1]
+            next_cursor = self._encode_cursor(rows[-1], sort_fields) if rows else None
+            prev_cursor = self._encode_cursor(rows[0], sort_fields) if rows and has_more else None
+        else:
+            next_cursor = self._encode_cursor(rows[-1], sort_fields) if rows and has_more else None
+            prev_cursor = self._encode_cursor(rows[0], sort_fields) if rows and cursor else None
 
+        return rows, next_cursor, prev_cursor
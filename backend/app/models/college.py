@@ -1,16 +1,43 @@
 """
 College model for college management.
 """
+from dataclasses import dataclass
 from typing import Dict, Any, List, Optional, Tuple
 from .base_model import BaseModel, ValidationError, DatabaseError, NotFoundError
 
 
+@dataclass(slots=True)
+class CollegeRecord:
+    """College row from a read query; serialized directly by the JSON provider."""
+    college_code: str
+    college_name: str
+    row_version: int
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "college_code": self.college_code,
+            "college_name": self.college_name,
+            "row_version": self.row_version
+        }
+
+
 class College(BaseModel):
     """College model for college management."""
     
-    def __init__(self, college_code: str = "", college_name: str = ""):
+    SELECT_COLUMNS = "college_code, college_name, row_version"
+    RECORD = CollegeRecord
+    SORT_FIELDS = ["college_code", "college_name"]
+    SEARCH_FIELDS = ["college_code", "college_name"]
+    FTS_COLUMN = "search_tsv"
+    FTS_CONFIG = "english"
+    CONSTRAINT_ERRORS = {
+        "colleges_pkey": ("COLLEGE_CODE_EXISTS", "College code '{college_code}' already exists"),
+    }
+    
+    def __init__(self, college_code: str = "", college_name: str = "", row_version: int = 0):
         self.college_code = college_code
         self.college_name = college_name
+        self.row_version = row_version
     
     @property
     def table_name(self) -> str:
@@ -24,7 +51,8 @@ class College(BaseModel):
         """Convert college instance to dictionary."""
         return {
             "college_code": self.college_code,
-            "college_name": self.college_name
+            "college_name": self.college_name,
+            "row_version": self.row_version
         }
     
     @classmethod
@@ -32,7 +60,8 @@ class College(BaseModel):
         """Create college instance from dictionary."""
         return cls(
             college_code=data.get("college_code", ""),
-            college_name=data.get("college_name", "")
+            college_name=data.get("college_name", ""),
+            row_version=data.get("row_version", 0)
         )
     
     def validate(self) -> None:
@@ -65,20 +94,14 @@ class College(BaseModel):
             )
     
     def save(self) -> 'College':
-        """Save college to database."""
+        """Insert the college in a single statement; a taken code is reported by the primary key (COLLEGE_CODE_EXISTS)."""
         self.validate()
         
-        # Check for duplicate college code
-        if self._code_exists(self.college_code):
-            raise ValidationError(
-                f"College code '{self.college_code}' already exists",
-                error_code="COLLEGE_CODE_EXISTS"
-            )
-        
         result = self._execute_query(
             """
             INSERT INTO colleges (college_code, college_name)
             VALUES (:college_code, :college_name)
+            RETURNING row_version
             """,
             {
                 "college_code": self.college_code,
@@ -86,33 +109,31 @@ class College(BaseModel):
             }
         )
         
-        if not result:
+        row = result.first() if result else None
+        if row is None:
             raise DatabaseError(
                 "Failed to create college",
                 error_code="COLLEGE_CREATION_FAILED"
             )
         
+        self.row_version = row[0]
         return self
     
-    def update(self, updates: Dict[str, Any]) -> 'College':
-        """Update college with new data."""
+    def update(self, updates: Dict[str, Any], expected_version: Optional[int] = None) -> 'College':
+        """
+        Update the college keyed by this instance's code in a single statement, without reading it
+        first; the instance is refreshed from the written row. With `expected_version`, the update
+        only applies while the row is still at that version (VERSION_CONFLICT otherwise).
+        """
         allowed_fields = {"college_code", "college_name"}
         set_items = []
-        params = {"orig_college_code": self.college_code}
+        params = {}
         
         # Validate updates
         for field, value in updates.items():
             if field not in allowed_fields:
                 continue
             
-            if field == "college_code" and value != self.college_code:
-                # Check if new code already exists
-                if self._code_exists(value):
-                    raise ValidationError(
-                        f"College code '{value}' already exists",
-                        error_code="COLLEGE_CODE_EXISTS"
-                    )
-            
             set_items.append(f"{field} = :{field}")
             params[field] = value
         
@@ -122,21 +143,18 @@ class College(BaseModel):
                 error_code="NO_UPDATE_FIELDS"
             )
         
-        result = self._execute_query(
-            f"UPDATE colleges SET {', '.join(set_items)} WHERE college_code = :orig_college_code",
-            params
-        )
+        # A taken code is reported by the primary key (see CONSTRAINT_ERRORS)
+        row = self._update_row(set_items, params, self.college_code, expected_version)
         
-        if not result or result.rowcount == 0:
+        if row is None:
             raise NotFoundError(
                 f"College with code '{self.college_code}' not found",
                 error_code="COLLEGE_NOT_FOUND"
             )
         
-        # Update instance with new values
-        for field, value in updates.items():
-            if field in allowed_fields:
-                setattr(self, field, value)
+        # Update instance with the written row
+        for field in self.SELECT_COLUMNS.split(", "):
+            setattr(self, field, row[field])
         
         return self
     
@@ -155,14 +173,6 @@ class College(BaseModel):
         
         return bool(result and result.rowcount > 0)
     
-    def _code_exists(self, college_code: str) -> bool:
-        """Check if college code already exists."""
-        result = self._execute_query(
-            "SELECT 1 FROM colleges WHERE college_code = :college_code",
-            {"college_code": college_code}
-        )
-        return result.scalar() is not None if result else False
-    
     def _count_programs(self) -> int:
         """Count programs associated with this college."""
         result = self._execute_query(
@@ -177,7 +187,7 @@ class College(BaseModel):
         instance = cls()
         result = instance._execute_query(
             """
-            SELECT college_code, college_name
+            SELECT college_code, college_name, row_version
             FROM colleges
             WHERE college_code = :college_code
             """,
@@ -189,61 +199,99 @@ class College(BaseModel):
     
     @classmethod
     def search(cls, search_by: str = "", search_term: str = "", sort_by: str = "college_code", 
-               sort_order: str = "ASC", page: int = 1, page_size: Optional[int] = 10) -> Tuple[List['College'], int]:
-        """Search colleges with pagination."""
+               sort_order: str = "ASC", page: int = 1, page_size: Optional[int] = 10,
+               search_mode: str = "") -> Tuple[List[Dict[str, Any]], int]:
+        """Search colleges with pagination, returning row dicts ready for serialization and the total."""
         # Validate sort field
-        allowed_sort_fields = ["college_code", "college_name"]
+        allowed_sort_fields = cls.SORT_FIELDS
         if sort_by not in allowed_sort_fields:
             sort_by = "college_code"
         
         # Validate search field
-        allowed_search_fields = ["college_code", "college_name"]
+        allowed_search_fields = cls.SEARCH_FIELDS
         if search_by and search_by not in allowed_search_fields:
             search_by = ""
         
         # Build search filter
         instance = cls()
-        filters, params = instance._build_search_filter(search_by, search_term, allowed_search_fields)
+        filters, params = instance._build_search_filter(search_by, search_term, allowed_search_fields, search_mode)
         
-        # Build sort clause
-        sort_clause = instance._build_sort_clause(sort_by, sort_order, allowed_sort_fields)
+        # Build sort clause (relevance first when the search mode ranks results)
+        rank = instance._build_search_rank(search_by, search_term, search_mode)
+        sort_clause = instance._build_sort_clause(sort_by, sort_order, allowed_sort_fields, rank)
         
-        # Build pagination
-        if not page_size or page_size <= 0:
-            pagination_clause = ""
-        else:
-            offset = (page - 1) * page_size
-            pagination_clause = instance._build_pagination_clause(page_size, offset)
+        # Execute search query (rows and total in one round trip)
+        limit = page_size if page_size and page_size > 0 else None
+        offset = (page - 1) * page_size if limit else 0
+        rows, total_count = instance._search_with_count(
+            cls.SELECT_COLUMNS,
+            filters, params, sort_clause, limit, offset
+        )
+        return rows, total_count
+    
+    @classmethod
+    def search_keyset(cls, search_by: str = "", search_term: str = "", sort_by: str = "college_code",
+                      sort_order: str = "ASC", page_size: int = 10, after: Optional[str] = None,
+                      before: Optional[str] = None, search_mode: str = "") -> Tuple[List[Dict[str, Any]], Optional[str], Optional[str]]:
+        """Search colleges with cursor pagination, returning (row dicts, next_cursor, prev_cursor).
         
-        # Execute search query
-        query = f"""
-            SELECT college_code, college_name
-            FROM colleges
-            {filters}
-            {sort_clause}
-            {pagination_clause}
+        Results follow the sort keys only (no relevance ranking) so that cursors stay stable.
         """
+        if sort_by not in cls.SORT_FIELDS:
+            sort_by = "college_code"
         
-        result = instance._execute_query(query, params)
-        colleges = [cls.from_dict(dict(row)) for row in result.mappings().all()] if result else []
+        if search_by and search_by not in cls.SEARCH_FIELDS:
+            search_by = ""
         
-        # Get total count
-        count_query = f"SELECT COUNT(*) FROM colleges {filters}"
-        count_result = instance._execute_query(count_query, params)
-        total_count = count_result.scalar() or 0
+        instance = cls()
+        filters, params = instance._build_search_filter(search_by, search_term, cls.SEARCH_FIELDS, search_mode)
+        sort_fields = instance._keyset_sort_fields(sort_by, sort_order, cls.SORT_FIELDS)
         
-        return colleges, total_count
+        rows, next_cursor, prev_cursor = instance._search_keyset(
+            cls.SELECT_COLUMNS, filters, params, sort_fields, page_size, after, before
+        )
+        return rows, next_cursor, prev_cursor
     
     @classmethod
-    def get_all(cls) -> List['College']:
-        """Get all colleges."""
+    def suggest(cls, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return up to `limit` codes and names starting with `prefix` (served by prefix indexes)."""
         instance = cls()
         result = instance._execute_query(
             """
             SELECT college_code, college_name
             FROM colleges
+            WHERE lower(college_code) LIKE :prefix OR lower(college_name) LIKE :prefix
+            ORDER BY college_code
+            LIMIT :limit
+            """,
+            {"prefix": cls._like_prefix(prefix.lower()), "limit": limit}
+        )
+        
+        return [dict(row) for row in result.mappings().all()] if result else []
+    
+    @classmethod
+    def get_all_codes(cls) -> set:
+        """Get the set of all college codes."""
+        instance = cls()
+        result = instance._execute_query("SELECT college_code FROM colleges")
+        # Raise rather than return an empty set, which the reference cache would keep as valid
+        if result is None:
+            raise DatabaseError(
+                "Failed to load college codes",
+                error_code="DATABASE_ERROR"
+            )
+        return {row[0] for row in result.all()}
+    
+    @classmethod
+    def get_all(cls) -> List[CollegeRecord]:
+        """Get all colleges."""
+        instance = cls()
+        result = instance._execute_query(
+            """
+            SELECT college_code, college_name, row_version
+            FROM colleges
             ORDER BY college_code
             """
         )
         
-        return [cls.from_dict(dict(row)) for row in result.mappings().all()] if result else []
+        return cls._records(result)
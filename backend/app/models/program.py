@@ -1,17 +1,47 @@
 """
 Program model for program management.
 """
+from dataclasses import dataclass
 from typing import Dict, Any, List, Optional, Tuple
 from .base_model import BaseModel, ValidationError, DatabaseError, NotFoundError
 
 
+@dataclass(slots=True)
+class ProgramRecord:
+    """Program row from a read query; serialized directly by the JSON provider."""
+    program_code: str
+    program_name: str
+    college_code: str
+    row_version: int
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "program_code": self.program_code,
+            "program_name": self.program_name,
+            "college_code": self.college_code,
+            "row_version": self.row_version
+        }
+
+
 class Program(BaseModel):
     """Program model for program management."""
     
-    def __init__(self, program_code: str = "", program_name: str = "", college_code: str = ""):
+    SELECT_COLUMNS = "program_code, program_name, college_code, row_version"
+    RECORD = ProgramRecord
+    SORT_FIELDS = ["program_code", "program_name", "college_code"]
+    SEARCH_FIELDS = ["program_code", "program_name", "college_code"]
+    FTS_COLUMN = "search_tsv"
+    FTS_CONFIG = "english"
+    CONSTRAINT_ERRORS = {
+        "programs_pkey": ("PROGRAM_CODE_EXISTS", "Program code '{program_code}' already exists"),
+        "programs_college_code_fkey": ("COLLEGE_NOT_FOUND", "College with code '{college_code}' does not exist"),
+    }
+    
+    def __init__(self, program_code: str = "", program_name: str = "", college_code: str = "", row_version: int = 0):
         self.program_code = program_code
         self.program_name = program_name
         self.college_code = college_code
+        self.row_version = row_version
     
     @property
     def table_name(self) -> str:
@@ -26,7 +56,8 @@ class Program(BaseModel):
         return {
             "program_code": self.program_code,
             "program_name": self.program_name,
-            "college_code": self.college_code
+            "college_code": self.college_code,
+            "row_version": self.row_version
         }
     
     @classmethod
@@ -35,11 +66,12 @@ class Program(BaseModel):
         return cls(
             program_code=data.get("program_code", ""),
             program_name=data.get("program_name", ""),
-            college_code=data.get("college_code", "")
+            college_code=data.get("college_code", ""),
+            row_version=data.get("row_version", 0)
         )
     
-    def validate(self) -> None:
-        """Validate program data."""
+    def validate_fields(self) -> None:
+        """Validate program fields without touching the database."""
         required_fields = ["program_code", "program_name", "college_code"]
         self._validate_required_fields(self.to_dict(), required_fields)
         
@@ -72,29 +104,19 @@ class Program(BaseModel):
                 "Program name cannot exceed 50 characters",
                 error_code="PROGRAM_NAME_TOO_LONG"
             )
-        
-        # Validate college exists
-        if not self._college_exists(self.college_code):
-            raise ValidationError(
-                f"College with code '{self.college_code}' does not exist",
-                error_code="COLLEGE_NOT_FOUND"
-            )
     
     def save(self) -> 'Program':
-        """Save program to database."""
-        self.validate()
-        
-        # Check for duplicate program code
-        if self._code_exists(self.program_code):
-            raise ValidationError(
-                f"Program code '{self.program_code}' already exists",
-                error_code="PROGRAM_CODE_EXISTS"
-            )
+        """
+        Insert the program in a single statement; a taken code or unknown college is reported by
+        the table's constraints (PROGRAM_CODE_EXISTS, COLLEGE_NOT_FOUND).
+        """
+        self.validate_fields()
         
         result = self._execute_query(
             """
             INSERT INTO programs (program_code, program_name, college_code)
             VALUES (:program_code, :program_name, :college_code)
+            RETURNING row_version
             """,
             {
                 "program_code": self.program_code,
@@ -103,41 +125,31 @@ class Program(BaseModel):
             }
         )
         
-        if not result:
+        row = result.first() if result else None
+        if row is None:
             raise DatabaseError(
                 "Failed to create program",
                 error_code="PROGRAM_CREATION_FAILED"
             )
         
+        self.row_version = row[0]
         return self
     
-    def update(self, updates: Dict[str, Any]) -> 'Program':
-        """Update program with new data."""
+    def update(self, updates: Dict[str, Any], expected_version: Optional[int] = None) -> 'Program':
+        """
+        Update the program keyed by this instance's code in a single statement, without reading it
+        first; the instance is refreshed from the written row. With `expected_version`, the update
+        only applies while the row is still at that version (VERSION_CONFLICT otherwise).
+        """
         allowed_fields = {"program_code", "program_name", "college_code"}
         set_items = []
-        params = {"orig_program_code": self.program_code}
+        params = {}
         
         # Validate updates
         for field, value in updates.items():
             if field not in allowed_fields:
                 continue
             
-            if field == "program_code" and value != self.program_code:
-                # Check if new code already exists
-                if self._code_exists(value):
-                    raise ValidationError(
-                        f"Program code '{value}' already exists",
-                        error_code="PROGRAM_CODE_EXISTS"
-                    )
-            
-            if field == "college_code" and value != self.college_code:
-                # Validate new college exists
-                if not self._college_exists(value):
-                    raise ValidationError(
-                        f"College with code '{value}' does not exist",
-                        error_code="COLLEGE_NOT_FOUND"
-                    )
-            
             set_items.append(f"{field} = :{field}")
             params[field] = value
         
@@ -147,21 +159,18 @@ class Program(BaseModel):
                 error_code="NO_UPDATE_FIELDS"
             )
         
-        result = self._execute_query(
-            f"UPDATE programs SET {', '.join(set_items)} WHERE program_code = :orig_program_code",
-            params
-        )
+        # A taken code or unknown college is reported by the constraints (see CONSTRAINT_ERRORS)
+        row = self._update_row(set_items, params, self.program_code, expected_version)
         
-        if not result or result.rowcount == 0:
+        if row is None:
             raise NotFoundError(
                 f"Program with code '{self.program_code}' not found",
                 error_code="PROGRAM_NOT_FOUND"
             )
         
-        # Update instance with new values
-        for field, value in updates.items():
-            if field in allowed_fields:
-                setattr(self, field, value)
+        # Update instance with the written row
+        for field in self.SELECT_COLUMNS.split(", "):
+            setattr(self, field, row[field])
         
         return self
     
@@ -180,22 +189,6 @@ class Program(BaseModel):
         
         return bool(result and result.rowcount > 0)
     
-    def _code_exists(self, program_code: str) -> bool:
-        """Check if program code already exists."""
-        result = self._execute_query(
-            "SELECT 1 FROM programs WHERE program_code = :program_code",
-            {"program_code": program_code}
-        )
-        return result.scalar() is not None
-    
-    def _college_exists(self, college_code: str) -> bool:
-        """Check if college exists."""
-        result = self._execute_query(
-            "SELECT 1 FROM colleges WHERE college_code = :college_code",
-            {"college_code": college_code}
-        )
-        return result.scalar() is not None
-    
     def _count_students(self) -> int:
         """Count students enrolled in this program."""
         result = self._execute_query(
@@ -210,7 +203,7 @@ class Program(BaseModel):
         instance = cls()
         result = instance._execute_query(
             """
-            SELECT program_code, program_name, college_code
+            SELECT program_code, program_name, college_code, row_version
             FROM programs
             WHERE program_code = :program_code
             """,
@@ -221,12 +214,12 @@ class Program(BaseModel):
         return cls.from_dict(dict(row)) if row else None
     
     @classmethod
-    def find_by_college(cls, college_code: str) -> List['Program']:
+    def find_by_college(cls, college_code: str) -> List[ProgramRecord]:
         """Find all programs for a specific college."""
         instance = cls()
         result = instance._execute_query(
             """
-            SELECT program_code, program_name, college_code
+            SELECT program_code, program_name, college_code, row_version
             FROM programs
             WHERE college_code = :college_code
             ORDER BY program_code
@@ -234,65 +227,103 @@ class Program(BaseModel):
             {"college_code": college_code}
         )
         
-        return [cls.from_dict(dict(row)) for row in result.mappings().all()] if result else []
+        return cls._records(result)
     
     @classmethod
     def search(cls, search_by: str = "", search_term: str = "", sort_by: str = "program_code", 
-               sort_order: str = "ASC", page: int = 1, page_size: Optional[int] = 10) -> Tuple[List['Program'], int]:
-        """Search programs with pagination."""
+               sort_order: str = "ASC", page: int = 1, page_size: Optional[int] = 10,
+               search_mode: str = "") -> Tuple[List[Dict[str, Any]], int]:
+        """Search programs with pagination, returning row dicts ready for serialization and the total."""
         # Validate sort field
-        allowed_sort_fields = ["program_code", "program_name", "college_code"]
+        allowed_sort_fields = cls.SORT_FIELDS
         if sort_by not in allowed_sort_fields:
             sort_by = "program_code"
         
         # Validate search field
-        allowed_search_fields = ["program_code", "program_name", "college_code"]
+        allowed_search_fields = cls.SEARCH_FIELDS
         if search_by and search_by not in allowed_search_fields:
             search_by = ""
         
         # Build search filter
         instance = cls()
-        filters, params = instance._build_search_filter(search_by, search_term, allowed_search_fields)
+        filters, params = instance._build_search_filter(search_by, search_term, allowed_search_fields, search_mode)
         
-        # Build sort clause
-        sort_clause = instance._build_sort_clause(sort_by, sort_order, allowed_sort_fields)
+        # Build sort clause (relevance first when the search mode ranks results)
+        rank = instance._build_search_rank(search_by, search_term, search_mode)
+        sort_clause = instance._build_sort_clause(sort_by, sort_order, allowed_sort_fields, rank)
         
-        # Build pagination
-        if not page_size or page_size <= 0:
-            pagination_clause = ""
-        else:
-            offset = (page - 1) * page_size
-            pagination_clause = instance._build_pagination_clause(page_size, offset)
+        # Execute search query (rows and total in one round trip)
+        limit = page_size if page_size and page_size > 0 else None
+        offset = (page - 1) * page_size if limit else 0
+        rows, total_count = instance._search_with_count(
+            cls.SELECT_COLUMNS,
+            filters, params, sort_clause, limit, offset
+        )
+        return rows, total_count
+    
+    @classmethod
+    def search_keyset(cls, search_by: str = "", search_term: str = "", sort_by: str = "program_code",
+                      sort_order: str = "ASC", page_size: int = 10, after: Optional[str] = None,
+                      before: Optional[str] = None, search_mode: str = "") -> Tuple[List[Dict[str, Any]], Optional[str], Optional[str]]:
+        """Search programs with cursor pagination, returning (row dicts, next_cursor, prev_cursor).
         
-        # Execute search query
-        query = f"""
-            SELECT program_code, program_name, college_code
-            FROM programs
-            {filters}
-            {sort_clause}
-            {pagination_clause}
+        Results follow the sort keys only (no relevance ranking) so that cursors stay stable.
         """
+        if sort_by not in cls.SORT_FIELDS:
+            sort_by = "program_code"
         
-        result = instance._execute_query(query, params)
-        programs = [cls.from_dict(dict(row)) for row in result.mappings().all()] if result else []
+        if search_by and search_by not in cls.SEARCH_FIELDS:
+            search_by = ""
         
-        # Get total count
-        count_query = f"SELECT COUNT(*) FROM programs {filters}"
-        count_result = instance._execute_query(count_query, params)
-        total_count = count_result.scalar() or 0
+        instance = cls()
+        filters, params = instance._build_search_filter(search_by, search_term, cls.SEARCH_FIELDS, search_mode)
+        sort_fields = instance._keyset_sort_fields(sort_by, sort_order, cls.SORT_FIELDS)
         
-        return programs, total_count
+        rows, next_cursor, prev_cursor = instance._search_keyset(
+            cls.SELECT_COLUMNS, filters, params, sort_fields, page_size, after, before
+        )
+        return rows, next_cursor, prev_cursor
+    
+    @classmethod
+    def suggest(cls, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return up to `limit` codes and names starting with `prefix` (served by prefix indexes)."""
+        instance = cls()
+        result = instance._execute_query(
+            """
+            SELECT program_code, program_name
+            FROM programs
+            WHERE lower(program_code) LIKE :prefix OR lower(program_name) LIKE :prefix
+            ORDER BY program_code
+            LIMIT :limit
+            """,
+            {"prefix": cls._like_prefix(prefix.lower()), "limit": limit}
+        )
+        
+        return [dict(row) for row in result.mappings().all()] if result else []
+    
+    @classmethod
+    def get_all_codes(cls) -> set:
+        """Get the set of all program codes."""
+        instance = cls()
+        result = instance._execute_query("SELECT program_code FROM programs")
+        # Raise rather than return an empty set, which the reference cache would keep as valid
+        if result is None:
+            raise DatabaseError(
+                "Failed to load program codes",
+                error_code="DATABASE_ERROR"
+            )
+        return {row[0] for row in result.all()}
     
     @classmethod
-    def get_all(cls) -> List['Program']:
+    def get_all(cls) -> List[ProgramRecord]:
         """Get all programs."""
         instance = cls()
         result = instance._execute_query(
             """
-            SELECT program_code, program_name, college_code
+            SELECT program_code, program_name, college_code, row_version
             FROM programs
             ORDER BY program_code
             """
         )
         
-        return [cls.from_dict(dict(row)) for row in result.mappings().all()] if result else []
+        return cls._records(result)
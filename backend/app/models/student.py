@@ -1,22 +1,64 @@
 """
 Student model for student management.
 """
-from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from .base_model import BaseModel, ValidationError, DatabaseError, NotFoundError
+from ..db.database import transaction
+from ..db.reference_cache import programs_cache
+from .program import Program
 from ..utils.validation_utils import _valid_id_number
 from ..supabase_client import supabase  # Add this import
 import os  # Add this import
 
 
+@dataclass(slots=True)
+class StudentRecord:
+    """Student row from a read query; serialized directly by the JSON provider."""
+    id_number: str
+    first_name: str
+    last_name: str
+    year_level: Optional[int]
+    gender: str
+    program_code: str
+    photo_path: Optional[str]
+    row_version: int
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id_number": self.id_number,
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            "year_level": self.year_level,
+            "gender": self.gender,
+            "program_code": self.program_code,
+            "photo_path": self.photo_path,
+            "row_version": self.row_version
+        }
+
+
 class Student(BaseModel):
     """Student model for student management."""
     
     ALLOWED_GENDERS = {"MALE", "FEMALE", "OTHER"}
     BUCKET_NAME = os.environ.get("SUPABASE_BUCKET_NAME", "ssis_web_bucket")  # Add bucket name
+    TRIGRAM_COLUMN = "search_text"
+    FTS_COLUMN = "search_tsv"
+    FTS_CONFIG = "simple"
+    SELECT_COLUMNS = "id_number, first_name, last_name, year_level, gender, program_code, photo_path, row_version"
+    RECORD = StudentRecord
+    SORT_FIELDS = ["id_number", "first_name", "last_name", "year_level", "gender", "program_code"]
+    SEARCH_FIELDS = ["id_number", "first_name", "last_name", "year_level", "gender", "program_code"]
+    # Fields that make sense to set to one value across many students at once
+    BATCH_UPDATE_FIELDS = ["year_level", "gender", "program_code"]
+    CONSTRAINT_ERRORS = {
+        "students_pkey": ("STUDENT_ID_EXISTS", "Student with ID number '{id_number}' already exists"),
+        "students_program_code_fkey": ("PROGRAM_NOT_FOUND", "Program with code '{program_code}' does not exist"),
+    }
     
     def __init__(self, id_number: str = "", first_name: str = "", last_name: str = "", 
                  year_level: Optional[int] = None, gender: str = "", program_code: str = "",
-                 photo_path: str = ""):
+                 photo_path: str = "", row_version: int = 0):
         self.id_number = id_number
         self.first_name = first_name
         self.last_name = last_name
@@ -24,6 +66,7 @@ class Student(BaseModel):
         self.gender = gender
         self.program_code = program_code
         self.photo_path = photo_path
+        self.row_version = row_version
     
     @property
     def table_name(self) -> str:
@@ -42,7 +85,8 @@ class Student(BaseModel):
             "year_level": self.year_level,
             "gender": self.gender,
             "program_code": self.program_code,
-            "photo_path": self.photo_path
+            "photo_path": self.photo_path,
+            "row_version": self.row_version
         }
     
     @classmethod
@@ -55,11 +99,12 @@ class Student(BaseModel):
             year_level=data.get("year_level"),
             gender=data.get("gender", ""),
             program_code=data.get("program_code", ""),
-            photo_path=data.get("photo_path", "")
+            photo_path=data.get("photo_path", ""),
+            row_version=data.get("row_version", 0)
         )
     
-    def validate(self) -> None:
-        """Validate student data."""
+    def validate_fields(self) -> None:
+        """Validate student fields without touching the database."""
         required_fields = ["id_number", "first_name", "last_name", "year_level", "gender", "program_code"]
         self._validate_required_fields(self.to_dict(), required_fields)
         
@@ -109,29 +154,19 @@ class Student(BaseModel):
                 f"Invalid gender: {self.gender}. Must be one of {', '.join(self.ALLOWED_GENDERS)}",
                 error_code="INVALID_GENDER"
             )
-        
-        # Validate program exists
-        if not self._program_exists(self.program_code):
-            raise ValidationError(
-                f"Program with code '{self.program_code}' does not exist",
-                error_code="PROGRAM_NOT_FOUND"
-            )
     
     def save(self) -> 'Student':
-        """Save student to database."""
-        self.validate()
-        
-        # Check for duplicate ID number
-        if self._id_exists(self.id_number):
-            raise ValidationError(
-                f"Student with ID number '{self.id_number}' already exists",
-                error_code="STUDENT_ID_EXISTS"
-            )
+        """
+        Insert the student in a single statement; a taken ID number or unknown program is reported
+        by the table's constraints (STUDENT_ID_EXISTS, PROGRAM_NOT_FOUND).
+        """
+        self.validate_fields()
         
         result = self._execute_query(
             """
             INSERT INTO students (id_number, first_name, last_name, year_level, gender, program_code, photo_path)
             VALUES (:id_number, :first_name, :last_name, :year_level, :gender, :program_code, :photo_path)
+            RETURNING row_version
             """,
             {
                 "id_number": self.id_number,
@@ -144,22 +179,25 @@ class Student(BaseModel):
             }
         )
         
-        if not result:
+        row = result.first() if result else None
+        if row is None:
             raise DatabaseError(
                 "Failed to create student",
                 error_code="STUDENT_CREATION_FAILED"
             )
         
+        self.row_version = row[0]
         return self
     
-    def update(self, updates: Dict[str, Any]) -> 'Student':
-        """Update student with new data."""
+    def update(self, updates: Dict[str, Any], expected_version: Optional[int] = None) -> 'Student':
+        """
+        Update the student keyed by this instance's ID number in a single statement, without reading
+        it first; the instance is refreshed from the written row. With `expected_version`, the
+        update only applies while the row is still at that version (VERSION_CONFLICT otherwise).
+        """
         allowed_fields = {"id_number", "first_name", "last_name", "year_level", "gender", "program_code", "photo_path"}
         set_items = []
-        params = {"orig_id_number": self.id_number}
-        
-        # Store original photo path before updates
-        original_photo_path = self.photo_path
+        params = {}
         
         # Validate updates
         for field, value in updates.items():
@@ -173,12 +211,6 @@ class Student(BaseModel):
                         "Invalid ID number format",
                         error_code="INVALID_ID_NUMBER"
                     )
-                # Check if new ID already exists
-                if self._id_exists(value):
-                    raise ValidationError(
-                        f"Student with ID number '{value}' already exists",
-                        error_code="STUDENT_ID_EXISTS"
-                    )
             
             if field == "year_level":
                 if not isinstance(value, int) or value < 1 or value > 5:
@@ -194,14 +226,6 @@ class Student(BaseModel):
                         error_code="INVALID_GENDER"
                     )
             
-            if field == "program_code" and value != self.program_code:
-                # Validate new program exists
-                if not self._program_exists(value):
-                    raise ValidationError(
-                        f"Program with code '{value}' does not exist",
-                        error_code="PROGRAM_NOT_FOUND"
-                    )
-            
             set_items.append(f"{field} = :{field}")
             params[field] = value
         
@@ -211,30 +235,25 @@ class Student(BaseModel):
                 error_code="NO_UPDATE_FIELDS"
             )
         
-        result = self._execute_query(
-            f"UPDATE students SET {', '.join(set_items)} WHERE id_number = :orig_id_number",
-            params
-        )
+        # A taken ID number or unknown program is reported by the constraints (see CONSTRAINT_ERRORS);
+        # the photo path before the write comes back from the same statement
+        row = self._update_row(set_items, params, self.id_number, expected_version, old_columns=("photo_path",))
         
-        if not result or result.rowcount == 0:
+        if row is None:
             raise NotFoundError(
                 f"Student with ID '{self.id_number}' not found",
                 error_code="STUDENT_NOT_FOUND"
             )
-        
+    
         # Handle photo cleanup if photo_path is being updated or cleared
-        if "photo_path" in updates:
-            new_photo_path = updates.get("photo_path")
-            
-            # If we have an original photo and it's being changed or removed, delete it
-            if original_photo_path and original_photo_path.strip():
-                if not new_photo_path or new_photo_path != original_photo_path:
-                    self._delete_photo_from_storage(original_photo_path)
+        original_photo_path = row["old_photo_path"]
+        if "photo_path" in updates and original_photo_path and original_photo_path.strip():
+            if original_photo_path != row["photo_path"]:
+                self._delete_photo_from_storage(original_photo_path)
         
-        # Update instance with new values
-        for field, value in updates.items():
-            if field in allowed_fields:
-                setattr(self, field, value)
+        # Update instance with the written row
+        for field in self.SELECT_COLUMNS.split(", "):
+            setattr(self, field, row[field])
         
         return self
     
@@ -246,27 +265,127 @@ class Student(BaseModel):
                 error_code="NO_ID_NUMBER"
             )
         
-        # Delete photo from storage before deleting student record
-        if self.photo_path and self.photo_path.strip():
-            self._delete_photo_from_storage(self.photo_path)
-        
         result = self._execute_query(
             "DELETE FROM students WHERE id_number = :id_number",
             {"id_number": self.id_number}
         )
+        deleted = bool(result and result.rowcount > 0)
+        
+        # Only drop the photo once the record is gone, so a failed delete keeps its avatar
+        if deleted and self.photo_path and self.photo_path.strip():
+            self._delete_photo_from_storage(self.photo_path)
         
-        return bool(result and result.rowcount > 0)
+        return deleted
     
-    def _id_exists(self, id_number: str) -> bool:
-        """Check if student ID already exists."""
-        result = self._execute_query(
-            "SELECT 1 FROM students WHERE id_number = :id_number",
-            {"id_number": id_number}
+    @classmethod
+    def validate_batch_updates(cls, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate a change set applied to many students; returns the fields to set."""
+        unknown = sorted(set(updates) - set(cls.BATCH_UPDATE_FIELDS))
+        if unknown:
+            raise ValidationError(
+                f"Fields cannot be batch updated: {', '.join(unknown)}. Allowed: {', '.join(cls.BATCH_UPDATE_FIELDS)}",
+                error_code="INVALID_BATCH_FIELDS",
+                details={"fields": unknown}
+            )
+        
+        if not updates:
+            raise ValidationError(
+                "No valid fields to update",
+                error_code="NO_UPDATE_FIELDS"
+            )
+        
+        if "year_level" in updates:
+            value = updates["year_level"]
+            if not isinstance(value, int) or value < 1 or value > 5:
+                raise ValidationError(
+                    "Year level must be an integer between 1 and 5",
+                    error_code="INVALID_YEAR_LEVEL"
+                )
+        
+        if "gender" in updates and updates["gender"] not in cls.ALLOWED_GENDERS:
+            raise ValidationError(
+                f"Invalid gender: {updates['gender']}. Must be one of {', '.join(cls.ALLOWED_GENDERS)}",
+                error_code="INVALID_GENDER"
+            )
+        
+        if "program_code" in updates and not cls()._program_exists(updates["program_code"]):
+            raise ValidationError(
+                f"Program with code '{updates['program_code']}' does not exist",
+                error_code="PROGRAM_NOT_FOUND"
+            )
+        
+        return dict(updates)
+    
+    @classmethod
+    def batch_update(cls, id_numbers: List[str], updates: Dict[str, Any]) -> List[str]:
+        """
+        Apply one validated change set to every listed student in a single statement.
+        Returns the ID numbers that were actually updated.
+        """
+        with transaction():
+            updates = cls.validate_batch_updates(updates)
+            if not id_numbers:
+                return []
+            
+            set_items = [f"{field} = :{field}" for field in updates]
+            params = dict(updates, id_numbers=list(id_numbers))
+            
+            instance = cls()
+            result = instance._execute_query(
+                f"""
+                UPDATE students SET {', '.join(set_items)}
+                WHERE id_number = ANY(:id_numbers)
+                RETURNING id_number
+                """,
+                params
+            )
+        
+        if not result:
+            raise DatabaseError(
+                "Failed to update students",
+                error_code="STUDENT_BATCH_UPDATE_FAILED"
+            )
+        
+        return [row[0] for row in result.all()]
+    
+    @classmethod
+    def batch_delete(cls, id_numbers: List[str]) -> List[str]:
+        """
+        Delete every listed student in a single statement and clean up their photos.
+        Returns the ID numbers that were actually deleted.
+        """
+        if not id_numbers:
+            return []
+        
+        instance = cls()
+        result = instance._execute_query(
+            """
+            DELETE FROM students
+            WHERE id_number = ANY(:id_numbers)
+            RETURNING id_number, photo_path
+            """,
+            {"id_numbers": list(id_numbers)}
         )
-        return result.scalar() is not None
+        
+        if not result:
+            raise DatabaseError(
+                "Failed to delete students",
+                error_code="STUDENT_BATCH_DELETE_FAILED"
+            )
+        
+        rows = result.all()
+        photo_paths = [row.photo_path for row in rows if row.photo_path and row.photo_path.strip()]
+        if photo_paths:
+            instance._delete_photos_from_storage(photo_paths)
+        
+        return [row.id_number for row in rows]
     
     def _program_exists(self, program_code: str) -> bool:
-        """Check if program exists."""
+        """Check if program exists, answering from the reference cache when it knows the code."""
+        if program_code in programs_cache.get("codes", Program.get_all_codes):
+            return True
+        
+        # A miss may be a program created moments ago in another worker; confirm with the database
         result = self._execute_query(
             "SELECT 1 FROM programs WHERE program_code = :program_code",
             {"program_code": program_code}
@@ -275,15 +394,17 @@ class Student(BaseModel):
     
     def _delete_photo_from_storage(self, photo_path: str) -> bool:
         """Delete photo from Supabase storage."""
+        return self._delete_photos_from_storage([photo_path])
+    
+    def _delete_photos_from_storage(self, photo_paths: List[str]) -> bool:
+        """Delete photos from Supabase storage in a single request."""
         try:
-            if not photo_path or not photo_path.strip():
-                return True
-            
             # Remove leading slash if present
-            if photo_path.startswith('/'):
-                photo_path = photo_path[1:]
+            photo_paths = [path.lstrip('/') for path in photo_paths if path and path.strip()]
+            if not photo_paths:
+                return True
             
-            response = supabase.storage.from_(self.BUCKET_NAME).remove([photo_path])
+            response = supabase.storage.from_(self.BUCKET_NAME).remove(photo_paths)
             
             # Check if deletion was successful
             if hasattr(response, 'error') and response.error:
@@ -307,7 +428,7 @@ class Student(BaseModel):
         instance = cls()
         result = instance._execute_query(
             """
-            SELECT id_number, first_name, last_name, year_level, gender, program_code, photo_path
+            SELECT id_number, first_name, last_name, year_level, gender, program_code, photo_path, row_version
             FROM students
             WHERE id_number = :id_number
             """,
@@ -318,12 +439,12 @@ class Student(BaseModel):
         return cls.from_dict(dict(row)) if row else None
     
     @classmethod
-    def find_by_program(cls, program_code: str) -> List['Student']:
+    def find_by_program(cls, program_code: str) -> List[StudentRecord]:
         """Find all students in a specific program."""
         instance = cls()
         result = instance._execute_query(
             """
-            SELECT id_number, first_name, last_name, year_level, gender, program_code, photo_path
+            SELECT id_number, first_name, last_name, year_level, gender, program_code, photo_path, row_version
             FROM students
             WHERE program_code = :program_code
             ORDER BY last_name, first_name
@@ -331,62 +452,153 @@ class Student(BaseModel):
             {"program_code": program_code}
         )
         
-        return [cls.from_dict(dict(row)) for row in result.mappings().all()] if result else []
+        return cls._records(result)
     
     @classmethod
     def search(cls, search_by: str = "", search_term: str = "", sort_by: str = "id_number", 
-               sort_order: str = "ASC", page: int = 1, page_size: int = 10) -> Tuple[List['Student'], int]:
-        """Search students with pagination."""
+               sort_order: str = "ASC", page: int = 1, page_size: int = 10,
+               search_mode: str = "") -> Tuple[List[Dict[str, Any]], int]:
+        """Search students with pagination, returning row dicts ready for serialization and the total."""
         # Validate sort field
-        allowed_sort_fields = ["id_number", "first_name", "last_name", "year_level", "gender", "program_code"]
+        allowed_sort_fields = cls.SORT_FIELDS
         if sort_by not in allowed_sort_fields:
             sort_by = "id_number"
         
         # Validate search field
-        allowed_search_fields = ["id_number", "first_name", "last_name", "year_level", "gender", "program_code"]
+        allowed_search_fields = cls.SEARCH_FIELDS
         if search_by and search_by not in allowed_search_fields:
             search_by = ""
         
         # Build search filter
         instance = cls()
-        filters, params = instance._build_search_filter(search_by, search_term, allowed_search_fields)
+        filters, params = instance._build_search_filter(search_by, search_term, allowed_search_fields, search_mode)
         
-        # Build sort clause
-        sort_clause = instance._build_sort_clause(sort_by, sort_order, allowed_sort_fields)
+        # Build sort clause (relevance first when the search mode ranks results)
+        rank = instance._build_search_rank(search_by, search_term, search_mode)
+        sort_clause = instance._build_sort_clause(sort_by, sort_order, allowed_sort_fields, rank)
         
-        # Build pagination
+        # Execute search query (rows and total in one round trip)
         offset = (page - 1) * page_size
-        pagination_clause = instance._build_pagination_clause(page_size, offset)
+        rows, total_count = instance._search_with_count(
+            cls.SELECT_COLUMNS,
+            filters, params, sort_clause, page_size, offset
+        )
+        return rows, total_count
+    
+    @classmethod
+    def iter_search(cls, search_by: str = "", search_term: str = "", sort_by: str = "id_number",
+                    sort_order: str = "ASC", search_mode: str = "") -> Iterator[Any]:
+        """
+        Stream every student matching the search as row mappings, without building model instances.
+        Filters are validated and the query run eagerly; rows after the first batch are fetched lazily.
+        """
+        if sort_by not in cls.SORT_FIELDS:
+            sort_by = "id_number"
+        
+        if search_by and search_by not in cls.SEARCH_FIELDS:
+            search_by = ""
+        
+        instance = cls()
+        filters, params = instance._build_search_filter(search_by, search_term, cls.SEARCH_FIELDS, search_mode)
+        rank = instance._build_search_rank(search_by, search_term, search_mode)
+        sort_clause = instance._build_sort_clause(sort_by, sort_order, cls.SORT_FIELDS, rank)
         
-        # Execute search query
-        query = f"""
-            SELECT id_number, first_name, last_name, year_level, gender, program_code, photo_path
+        return instance._stream_search(cls.SELECT_COLUMNS, filters, params, sort_clause)
+    
+    @classmethod
+    def search_keyset(cls, search_by: str = "", search_term: str = "", sort_by: str = "id_number",
+                      sort_order: str = "ASC", page_size: int = 10, after: Optional[str] = None,
+                      before: Optional[str] = None, search_mode: str = "") -> Tuple[List[Dict[str, Any]], Optional[str], Optional[str]]:
+        """Search students with cursor pagination, returning (row dicts, next_cursor, prev_cursor).
+        
+        Results follow the sort keys only (no relevance ranking) so that cursors stay stable.
+        """
+        if sort_by not in cls.SORT_FIELDS:
+            sort_by = "id_number"
+        
+        if search_by and search_by not in cls.SEARCH_FIELDS:
+            search_by = ""
+        
+        instance = cls()
+        filters, params = instance._build_search_filter(search_by, search_term, cls.SEARCH_FIELDS, search_mode)
+        sort_fields = instance._keyset_sort_fields(sort_by, sort_order, cls.SORT_FIELDS)
+        
+        rows, next_cursor, prev_cursor = instance._search_keyset(
+            cls.SELECT_COLUMNS, filters, params, sort_fields, page_size, after, before
+        )
+        return rows, next_cursor, prev_cursor
+    
+    @classmethod
+    def suggest(cls, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return up to `limit` ID numbers and names starting with `prefix` (served by prefix indexes)."""
+        instance = cls()
+        result = instance._execute_query(
+            """
+            SELECT id_number, first_name, last_name
             FROM students
-            {filters}
-            {sort_clause}
-            {pagination_clause}
+            WHERE id_number LIKE :prefix OR lower(last_name) LIKE :prefix OR lower(first_name) LIKE :prefix
+            ORDER BY last_name, first_name, id_number
+            LIMIT :limit
+            """,
+            {"prefix": cls._like_prefix(prefix.lower()), "limit": limit}
+        )
+        
+        return [dict(row) for row in result.mappings().all()] if result else []
+    
+    @classmethod
+    def bulk_insert(cls, students: List['Student']) -> List[str]:
+        """
+        Insert many validated students in one statement.
+        Rows whose ID number already exists are skipped; returns the ID numbers actually inserted.
         """
+        if not students:
+            return []
         
-        result = instance._execute_query(query, params)
-        students = [cls.from_dict(dict(row)) for row in result.mappings().all()] if result else []
+        instance = cls()
+        result = instance._execute_query(
+            """
+            INSERT INTO students (id_number, first_name, last_name, year_level, gender, program_code, photo_path)
+            SELECT * FROM unnest(
+                CAST(:id_numbers AS VARCHAR[]),
+                CAST(:first_names AS VARCHAR[]),
+                CAST(:last_names AS VARCHAR[]),
+                CAST(:year_levels AS INT[]),
+                CAST(:genders AS VARCHAR[]),
+                CAST(:program_codes AS VARCHAR[]),
+                CAST(:photo_paths AS TEXT[])
+            )
+            ON CONFLICT (id_number) DO NOTHING
+            RETURNING id_number
+            """,
+            {
+                "id_numbers": [s.id_number for s in students],
+                "first_names": [s.first_name for s in students],
+                "last_names": [s.last_name for s in students],
+                "year_levels": [s.year_level for s in students],
+                "genders": [s.gender for s in students],
+                "program_codes": [s.program_code for s in students],
+                "photo_paths": [s.photo_path or "" for s in students]
+            }
+        )
         
-        # Get total count
-        count_query = f"SELECT COUNT(*) FROM students {filters}"
-        count_result = instance._execute_query(count_query, params)
-        total_count = count_result.scalar() or 0
+        if not result:
+            raise DatabaseError(
+                "Failed to import students",
+                error_code="STUDENT_IMPORT_FAILED"
+            )
         
-        return students, total_count
+        return [row[0] for row in result.all()]
     
     @classmethod
-    def get_all(cls) -> List['Student']:
+    def get_all(cls) -> List[StudentRecord]:
         """Get all students."""
         instance = cls()
         result = instance._execute_query(
             """
-            SELECT id_number, first_name, last_name, year_level, gender, program_code, photo_path
+            SELECT id_number, first_name, last_name, year_level, gender, program_code, photo_path, row_version
             FROM students
             ORDER BY last_name, first_name
             """
         )
         
-        return [cls.from_dict(dict(row)) for row in result.mappings().all()] if result else []
\ No newline at end of file
+        return cls._records(result)
\ No newline at end of file
@@ -2,20 +2,32 @@
 User model for authentication and user management.
 """
 from typing import Dict, Any, Optional
-from werkzeug.security import generate_password_hash, check_password_hash
 from .base_model import BaseModel, ValidationError, DatabaseError, NotFoundError
+from ..db.database import transaction
+from ..utils.password_hashing import PasswordHasherBusy, get_password_hasher
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class User(BaseModel):
     """User model for authentication and user management."""
     
+    # Public columns (no credentials) and the row version, as returned by delta sync
+    SELECT_COLUMNS = "user_id, username, email, role, row_version"
+    CONSTRAINT_ERRORS = {
+        "users_username_key": ("USERNAME_EXISTS", "Username '{username}' already exists"),
+        "users_email_key": ("EMAIL_EXISTS", "Email '{email}' already exists"),
+    }
+    
     def __init__(self, user_id: Optional[int] = None, username: str = "", email: str = "", 
-                 password_hash: str = "", role: str = "admin"):
+                 password_hash: str = "", role: str = "admin", token_version: int = 0):
         self.user_id = user_id
         self.username = username
         self.email = email
         self.password_hash = password_hash
         self.role = role
+        self.token_version = token_version
     
     @property
     def table_name(self) -> str:
@@ -51,7 +63,8 @@ class User(BaseModel):
             username=data.get("username", ""),
             email=data.get("email", ""),
             password_hash=data.get("password_hash", ""),
-            role=data.get("role", "admin")
+            role=data.get("role", "admin"),
+            token_version=data.get("token_version", 0)
         )
     
     def set_password(self, password: str) -> None:
@@ -61,11 +74,28 @@ class User(BaseModel):
                 "Password cannot be empty",
                 error_code="EMPTY_PASSWORD"
             )
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = get_password_hasher().hash(password)
     
     def check_password(self, password: str) -> bool:
         """Check if provided password matches the stored hash."""
-        return check_password_hash(self.password_hash, password)
+        return get_password_hasher().verify(self.password_hash, password)
+    
+    def rehash_password(self, password: str) -> None:
+        """
+        Re-hash a verified password with the configured method and cost, and store it.
+        The password itself is unchanged, so the token epoch is kept and other sessions stay valid.
+        """
+        self.set_password(password)
+        with transaction():
+            # Tells the token epoch trigger this is a rehash (db/migrations/0009), for this transaction only
+            self._execute_query("SELECT set_config('app.password_rehash', 'on', true)")
+            result = self._execute_query(
+                "UPDATE users SET password_hash = :password_hash WHERE user_id = :user_id RETURNING token_version",
+                {"user_id": self.user_id, "password_hash": self.password_hash}
+            )
+            row = result.first() if result else None
+        if row:
+            self.token_version = row[0]
     
     def validate(self) -> None:
         """Validate user data."""
@@ -97,22 +127,12 @@ class User(BaseModel):
             )
     
     def save(self) -> 'User':
-        """Save user to database."""
+        """
+        Insert or update the user in a single statement; a taken username or email is reported by
+        the unique constraints (USERNAME_EXISTS, EMAIL_EXISTS).
+        """
         self.validate()
         
-        # Check for duplicate username or email
-        if self._username_exists(self.username, self.user_id):
-            raise ValidationError(
-                f"Username '{self.username}' already exists",
-                error_code="USERNAME_EXISTS"
-            )
-        
-        if self._email_exists(self.email, self.user_id):
-            raise ValidationError(
-                f"Email '{self.email}' already exists",
-                error_code="EMAIL_EXISTS"
-            )
-        
         if self.user_id is None:
             # Insert new user
             result = self._execute_query(
@@ -129,7 +149,7 @@ class User(BaseModel):
                 }
             )
             
-            row = result.mappings().first()
+            row = result.mappings().first() if result else None
             if not row:
                 raise DatabaseError(
                     "Failed to create user",
@@ -145,6 +165,7 @@ class User(BaseModel):
                 SET username = :username, email = :email, 
                     password_hash = :password_hash, role = :role
                 WHERE user_id = :user_id
+                RETURNING token_version
                 """,
                 {
                     "user_id": self.user_id,
@@ -155,11 +176,15 @@ class User(BaseModel):
                 }
             )
             
-            if not result or result.rowcount == 0:
+            row = result.first() if result else None
+            if not row:
                 raise NotFoundError(
                     f"User with ID {self.user_id} not found",
                     error_code="USER_NOT_FOUND"
                 )
+            
+            # A role or password change bumps the epoch (see migration 0005)
+            self.token_version = row[0]
         
         return self
     
@@ -178,37 +203,13 @@ class User(BaseModel):
         
         return bool(result and result.rowcount > 0)
     
-    def _username_exists(self, username: str, exclude_user_id: Optional[int] = None) -> bool:
-        """Check if username already exists."""
-        query = "SELECT 1 FROM users WHERE username = :username"
-        params = {"username": username}
-        
-        if exclude_user_id:
-            query += " AND user_id != :user_id"
-            params["user_id"] = exclude_user_id
-        
-        result = self._execute_query(query, params)
-        return result.scalar() is not None
-    
-    def _email_exists(self, email: str, exclude_user_id: Optional[int] = None) -> bool:
-        """Check if email already exists."""
-        query = "SELECT 1 FROM users WHERE email = :email"
-        params = {"email": email}
-        
-        if exclude_user_id:
-            query += " AND user_id != :user_id"
-            params["user_id"] = exclude_user_id
-        
-        result = self._execute_query(query, params)
-        return result.scalar() is not None
-    
     @classmethod
     def find_by_email(cls, email: str) -> Optional['User']:
         """Find user by email."""
         instance = cls()
         result = instance._execute_query(
             """
-            SELECT user_id, username, email, password_hash, role
+            SELECT user_id, username, email, password_hash, role, token_version
             FROM users
             WHERE email = :email
             """,
@@ -234,7 +235,7 @@ class User(BaseModel):
         instance = cls()
         result = instance._execute_query(
             """
-            SELECT user_id, username, email, password_hash, role
+            SELECT user_id, username, email, password_hash, role, token_version
             FROM users
             WHERE username = :username
             """,
@@ -250,7 +251,7 @@ class User(BaseModel):
         instance = cls()
         result = instance._execute_query(
             """
-            SELECT user_id, username, email, password_hash, role
+            SELECT user_id, username, email, password_hash, role, token_version
             FROM users
             WHERE user_id = :user_id
             """,
@@ -260,10 +261,30 @@ class User(BaseModel):
         row = result.mappings().first() if result else None
         return cls.from_dict(dict(row)) if row else None
     
+    @classmethod
+    def get_token_version(cls, user_id: int) -> Optional[int]:
+        """Return the user's current token epoch, or None if the user no longer exists."""
+        instance = cls()
+        result = instance._execute_query(
+            "SELECT token_version FROM users WHERE user_id = :user_id",
+            {"user_id": user_id}
+        )
+        return result.scalar() if result else None
+    
+    def token_claims(self) -> Dict[str, Any]:
+        """Additional access-token claims: the role and the token epoch it was issued at."""
+        return {"role": self.role, "ver": self.token_version}
+    
     @classmethod
     def authenticate(cls, email: str, password: str) -> Optional['User']:
         """Authenticate user with email and password."""
         user = cls.find_by_email(email)
         if user and user.check_password(password):
+            # Upgrade hashes made under older parameters while the plaintext is at hand
+            if get_password_hasher().needs_rehash(user.password_hash):
+                try:
+                    user.rehash_password(password)
+                except (PasswordHasherBusy, DatabaseError) as e:
+                    logger.warning(f"Skipped password rehash for user {user.user_id}: {e}")
             return user
         return None
@@ -2,14 +2,17 @@ from flask import Blueprint, request
 from flask_jwt_extended import jwt_required
 from typing import Dict, Any
 from ..utils.route_utils import make_response
+from ..utils.conditional import conditional_get, expected_version
 from .services import (
+    suggest_programs,
     search_programs,
     get_program,
     get_programs_by_college,
     get_all_programs,
     create_program,
     update_program,
-    delete_program
+    delete_program,
+    get_program_changes
 )
 
 bp = Blueprint("programs", __name__)
@@ -17,6 +20,7 @@ bp = Blueprint("programs", __name__)
 
 @bp.get("/")
 @jwt_required()
+@conditional_get("programs")
 def list_programs_route():
     try:
         try:
@@ -33,6 +37,10 @@ def list_programs_route():
         sort_order = request.args.get("sort_order", "ASC").upper()
         search_term = request.args.get("q", "")
         search_by = request.args.get("search_by", "")
+        search_mode = request.args.get("search_mode", "").lower()
+        # Presence of `after`/`before` (even empty) selects cursor pagination
+        after = request.args.get("after")
+        before = request.args.get("before")
 
         result = search_programs(
             sort_by=sort_by,
@@ -41,6 +49,9 @@ def list_programs_route():
             search_by=search_by,
             page=page,
             page_size=page_size,
+            after=after,
+            before=before,
+            search_mode=search_mode,
         )
 
         if result["success"]:
@@ -51,9 +62,48 @@ def list_programs_route():
                 "meta": {
                     "page": result["page"], 
                     "per_page": result["page_size"], 
-                    "total": result["total_count"]
+                    "total": result["total_count"],
+                    "next_cursor": result.get("next_cursor"),
+                    "prev_cursor": result.get("prev_cursor")
                 },
             }, 200)
+        else:
+            status_code = 400 if result["error_code"] in ("INVALID_CURSOR", "INVALID_SEARCH_MODE") else 500
+            return make_response({
+                "status": "error",
+                "message": result["message"],
+                "error_code": result["error_code"]
+            }, status_code)
+
+    except Exception as e:
+        return make_response({
+            "status": "error", 
+            "message": f"Unexpected error occurred: {str(e)}",
+            "error_code": "UNEXPECTED_ERROR"
+        }, 500)
+
+
+@bp.get("/suggest")
+@jwt_required()
+@conditional_get("programs")
+def suggest_programs_route():
+    try:
+        try:
+            limit = max(min(int(request.args.get("limit", 10)), 20), 1)
+        except ValueError:
+            return make_response({
+                "status": "error",
+                "message": "Invalid limit parameter",
+                "error_code": "INVALID_LIMIT"
+            }, 400)
+
+        result = suggest_programs(request.args.get("q", ""), limit)
+
+        if result["success"]:
+            return make_response({
+                "status": "success",
+                "data": result["data"]
+            }, 200)
         else:
             return make_response({
                 "status": "error",
@@ -111,7 +161,16 @@ def create_program_route():
 def update_program_route(program_code: str):
     updates = request.get_json(force=True) or {}
     try:
-        result = update_program(program_code, updates)
+        try:
+            version = expected_version(updates)
+        except ValueError as e:
+            return make_response({
+                "status": "error",
+                "message": str(e),
+                "error_code": "INVALID_EXPECTED_VERSION"
+            }, 400)
+        
+        result = update_program(program_code, updates, version)
         
         if result["success"]:
             return make_response({
@@ -123,7 +182,7 @@ def update_program_route(program_code: str):
             status_code = 400
             if result["error_code"] == "PROGRAM_NOT_FOUND":
                 status_code = 404
-            elif result["error_code"] == "PROGRAM_CODE_EXISTS":
+            elif result["error_code"] in ("PROGRAM_CODE_EXISTS", "VERSION_CONFLICT"):
                 status_code = 409  # Conflict
             elif result["error_code"] == "COLLEGE_NOT_FOUND":
                 status_code = 400
@@ -178,3 +237,37 @@ def delete_program_route(program_code: str):
             "message": f"Unexpected error occurred: {str(e)}",
             "error_code": "UNEXPECTED_ERROR"
         }, 500)
+
+
+@bp.get("/delta")
+@jwt_required()
+def program_changes_route():
+    try:
+        since = request.args.get("since", "0")
+        if not since.isdigit():
+            return make_response({
+                "status": "error",
+                "message": "since must be a non-negative row version",
+                "error_code": "INVALID_SINCE"
+            }, 400)
+
+        result = get_program_changes(int(since))
+        if result["success"]:
+            return make_response({
+                "status": "success",
+                "message": result["message"],
+                "data": result["data"]
+            }, 200)
+
+        status_code = 410 if result["error_code"] == "DELTA_EXPIRED" else 500
+        return make_response({
+            "status": "error",
+            "message": result["message"],
+            "error_code": result["error_code"]
+        }, status_code)
+    except Exception as e:
+        return make_response({
+            "status": "error",
+            "message": f"Unexpected error occurred: {str(e)}",
+            "error_code": "UNEXPECTED_ERROR"
+        }, 500)
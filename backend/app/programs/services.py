@@ -1,6 +1,12 @@
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Optional
 from ..models import Program
 from ..models.base_model import ModelError, ValidationError, DatabaseError, NotFoundError
+from ..db.reference_cache import programs_cache
+from ..utils.cache import LRUCache
+
+
+# Typeahead results keyed on (normalized prefix, limit); cleared on every program write
+_suggest_cache = LRUCache(maxsize=512, ttl=30)
 
 
 def search_programs(
@@ -10,26 +16,66 @@ def search_programs(
     search_by: str,
     page: int,
     page_size: int,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    search_mode: str = "",
 ) -> Dict[str, Any]:
     """Search programs."""
     try:
-        programs, total_count = Program.search(
-            search_by=search_by,
-            search_term=search_term,
-            sort_by=sort_by,
-            sort_order=sort_order,
-            page=page,
-            page_size=page_size
-        )
+        if after is not None or before is not None:
+            programs, next_cursor, prev_cursor = Program.search_keyset(
+                search_by=search_by,
+                search_term=search_term,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                page_size=page_size,
+                after=after,
+                before=before,
+                search_mode=search_mode
+            )
+            
+            return {
+                "success": True,
+                "message": f"Found {len(programs)} programs",
+                "data": programs,
+                "total_count": None,
+                "page": None,
+                "page_size": page_size,
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor
+            }
+        
+        def load() -> Tuple[List[Dict[str, Any]], int]:
+            return Program.search(
+                search_by=search_by,
+                search_term=search_term,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                page=page,
+                page_size=page_size,
+                search_mode=search_mode
+            )
+        
+        # Unfiltered listings (the form dropdowns) are served from the reference cache
+        if search_term.strip():
+            programs, total_count = load()
+        else:
+            programs, total_count = programs_cache.get(("list", sort_by, sort_order, page, page_size), load)
         
         return {
             "success": True,
             "message": f"Found {len(programs)} programs",
-            "data": [program.to_dict() for program in programs],
+            "data": programs,
             "total_count": total_count,
             "page": page,
             "page_size": page_size
         }
+    except ValidationError as e:
+        return {
+            "success": False,
+            "message": e.message,
+            "error_code": e.error_code
+        }
     except Exception as e:
         return {
             "success": False,
@@ -38,6 +84,36 @@ def search_programs(
         }
 
 
+def suggest_programs(query: str, limit: int = 10) -> Dict[str, Any]:
+    """Suggest programs whose code or name starts with `query`."""
+    try:
+        prefix = " ".join(query.split()).lower()
+        if not prefix:
+            return {
+                "success": True,
+                "message": "Empty query",
+                "data": []
+            }
+        
+        key = (prefix, limit)
+        suggestions = _suggest_cache.get(key)
+        if suggestions is None:
+            suggestions = Program.suggest(prefix, limit)
+            _suggest_cache.set(key, suggestions)
+        
+        return {
+            "success": True,
+            "message": f"Found {len(suggestions)} suggestions",
+            "data": suggestions
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Failed to suggest programs: {str(e)}",
+            "error_code": "SUGGEST_ERROR"
+        }
+
+
 def get_program(program_code: str) -> Dict[str, Any]:
     """Get a specific program by code."""
     try:
@@ -69,7 +145,7 @@ def get_programs_by_college(college_code: str) -> Dict[str, Any]:
         return {
             "success": True,
             "message": f"Found {len(programs)} programs for college '{college_code}'",
-            "data": [program.to_dict() for program in programs]
+            "data": programs
         }
     except Exception as e:
         return {
@@ -86,7 +162,7 @@ def get_all_programs() -> Dict[str, Any]:
         return {
             "success": True,
             "message": f"Retrieved {len(programs)} programs",
-            "data": [program.to_dict() for program in programs]
+            "data": programs
         }
     except Exception as e:
         return {
@@ -105,6 +181,8 @@ def create_program(data: Dict[str, Any]) -> Dict[str, Any]:
             college_code=data.get("college_code", "")
         )
         saved_program = program.save()
+        _suggest_cache.clear()
+        programs_cache.invalidate()
         
         return {
             "success": True,
@@ -133,18 +211,13 @@ def create_program(data: Dict[str, Any]) -> Dict[str, Any]:
         }
 
 
-def update_program(program_code: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+def update_program(program_code: str, updates: Dict[str, Any], expected_version: Optional[int] = None) -> Dict[str, Any]:
     """Update a program with improved error handling."""
     try:
-        program = Program.find_by_code(program_code)
-        if not program:
-            return {
-                "success": False,
-                "message": f"Program with code '{program_code}' not found",
-                "error_code": "PROGRAM_NOT_FOUND"
-            }
-        
-        updated_program = program.update(updates)
+        # No pre-read: the model writes in one statement and reports a missing row itself
+        updated_program = Program(program_code=program_code).update(updates, expected_version)
+        _suggest_cache.clear()
+        programs_cache.invalidate()
         return {
             "success": True,
             "message": "Program updated successfully",
@@ -157,6 +230,12 @@ def update_program(program_code: str, updates: Dict[str, Any]) -> Dict[str, Any]
             "error_code": e.error_code,
             "details": e.details
         }
+    except NotFoundError as e:
+        return {
+            "success": False,
+            "message": e.message,
+            "error_code": e.error_code
+        }
     except DatabaseError as e:
         return {
             "success": False,
@@ -185,6 +264,8 @@ def delete_program(program_code: str) -> Dict[str, Any]:
         
         deleted = program.delete()
         if deleted:
+            _suggest_cache.clear()
+            programs_cache.invalidate()
             return {
                 "success": True,
                 "message": "Program deleted successfully"
@@ -215,3 +296,27 @@ def delete_program(program_code: str) -> Dict[str, Any]:
             "message": f"Unexpected error occurred: {str(e)}",
             "error_code": "UNEXPECTED_ERROR"
         }
+
+
+def get_program_changes(since: int) -> Dict[str, Any]:
+    """Get programs changed or deleted at or after a row version (delta sync)."""
+    try:
+        changes = Program.changes_since(since)
+        return {
+            "success": True,
+            "message": f"{len(changes['changed'])} changed and {len(changes['deleted'])} deleted programs",
+            "data": changes
+        }
+    except ValidationError as e:
+        return {
+            "success": False,
+            "message": e.message,
+            "error_code": e.error_code,
+            "details": e.details
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Failed to retrieve changes: {str(e)}",
+            "error_code": "RETRIEVAL_ERROR"
+        }
@@ -1,19 +1,27 @@
-from flask import Blueprint, request
+from flask import Blueprint, Response, request, stream_with_context
 from flask_jwt_extended import jwt_required
 from typing import Dict, Any
 import logging
 import os
 import uuid
 from ..utils.route_utils import make_response
+from ..utils.conditional import conditional_get, conditional_row_get, expected_version
+from ..utils.import_utils import detect_import_format
 from ..supabase_client import supabase
 from .services import (
+    suggest_students,
     search_students,
     get_student,
     get_students_by_program,
     get_all_students,
     create_student,
     update_student,
-    delete_student
+    delete_student,
+    import_students,
+    export_students,
+    batch_update_students,
+    batch_delete_students,
+    get_student_changes
 )
 
 bp = Blueprint("students", __name__)
@@ -21,6 +29,7 @@ bucket = os.environ.get("SUPABASE_BUCKET_NAME", "ssis_web_bucket")
 
 @bp.get("/")
 @jwt_required()
+@conditional_get("students")
 def list_students_route():
     try: 
         try:
@@ -37,6 +46,10 @@ def list_students_route():
         sort_order = request.args.get("sort_order", "ASC").upper()
         search_term = request.args.get("q", "")
         search_by = request.args.get("search_by", "")
+        search_mode = request.args.get("search_mode", "").lower()
+        # Presence of `after`/`before` (even empty) selects cursor pagination
+        after = request.args.get("after")
+        before = request.args.get("before")
 
         result = search_students(
             sort_by=sort_by,
@@ -45,6 +58,9 @@ def list_students_route():
             search_by=search_by,
             page=page,
             page_size=page_size,
+            after=after,
+            before=before,
+            search_mode=search_mode,
         )
 
         if result["success"]:
@@ -55,15 +71,18 @@ def list_students_route():
                 "meta": {
                     "page": result["page"], 
                     "per_page": result["page_size"], 
-                    "total": result["total_count"]
+                    "total": result["total_count"],
+                    "next_cursor": result.get("next_cursor"),
+                    "prev_cursor": result.get("prev_cursor")
                 },
             }, 200)
         else:
+            status_code = 400 if result["error_code"] in ("INVALID_CURSOR", "INVALID_SEARCH_MODE") else 500
             return make_response({
                 "status": "error",
                 "message": result["message"],
                 "error_code": result["error_code"]
-            }, 500)
+            }, status_code)
     
     except Exception as e:
         return make_response({
@@ -73,6 +92,42 @@ def list_students_route():
         }, 500)
 
 
+@bp.get("/suggest")
+@jwt_required()
+@conditional_get("students")
+def suggest_students_route():
+    try:
+        try:
+            limit = max(min(int(request.args.get("limit", 10)), 20), 1)
+        except ValueError:
+            return make_response({
+                "status": "error",
+                "message": "Invalid limit parameter",
+                "error_code": "INVALID_LIMIT"
+            }, 400)
+
+        result = suggest_students(request.args.get("q", ""), limit)
+
+        if result["success"]:
+            return make_response({
+                "status": "success",
+                "data": result["data"]
+            }, 200)
+        else:
+            return make_response({
+                "status": "error",
+                "message": result["message"],
+                "error_code": result["error_code"]
+            }, 500)
+
+    except Exception as e:
+        return make_response({
+            "status": "error", 
+            "message": f"Unexpected error occurred: {str(e)}",
+            "error_code": "UNEXPECTED_ERROR"
+        }, 500)
+
+
 @bp.post("/")
 @jwt_required()
 def create_student_route():
@@ -110,8 +165,91 @@ def create_student_route():
         }, 500)
 
 
+@bp.get("/export")
+@jwt_required()
+def export_students_route():
+    """Stream all students matching the list filters as CSV or NDJSON."""
+    try:
+        result = export_students(
+            file_format=request.args.get("format", "csv").lower(),
+            sort_by=request.args.get("sort_by", "id_number"),
+            sort_order=request.args.get("sort_order", "ASC").upper(),
+            search_term=request.args.get("q", ""),
+            search_by=request.args.get("search_by", ""),
+            search_mode=request.args.get("search_mode", "").lower(),
+        )
+        
+        if result["success"]:
+            return Response(
+                stream_with_context(result["data"]),
+                mimetype=result["mimetype"],
+                headers={"Content-Disposition": f'attachment; filename="{result["filename"]}"'}
+            )
+        else:
+            status_code = 400 if result["error_code"] in ("INVALID_EXPORT_FORMAT", "INVALID_SEARCH_MODE") else 500
+            return make_response({
+                "status": "error",
+                "message": result["message"],
+                "error_code": result["error_code"]
+            }, status_code)
+    
+    except Exception as e:
+        return make_response({
+            "status": "error", 
+            "message": f"Unexpected error occurred: {str(e)}",
+            "error_code": "UNEXPECTED_ERROR"
+        }, 500)
+
+
+@bp.post("/import")
+@jwt_required()
+def import_students_route():
+    """Bulk-import students from an uploaded CSV or NDJSON file (multipart `file` or raw body)."""
+    try:
+        upload = request.files.get("file")
+        if upload is not None:
+            stream = upload.stream
+            filename, content_type = upload.filename, upload.mimetype
+        else:
+            stream = request.stream
+            filename, content_type = None, request.mimetype
+        
+        file_format = detect_import_format(request.args.get("format"), filename, content_type)
+        if file_format is None:
+            return make_response({
+                "status": "error",
+                "message": "Unsupported import format. Use CSV or NDJSON (or pass ?format=csv|ndjson)",
+                "error_code": "INVALID_IMPORT_FORMAT"
+            }, 400)
+        
+        result = import_students(stream, file_format)
+        
+        if result["success"]:
+            return make_response({
+                "status": "success",
+                "message": result["message"],
+                "data": result["data"]
+            }, 200)
+        else:
+            status_code = 400 if result["error_code"] == "INVALID_FILE_ENCODING" else 500
+            return make_response({
+                "status": "error",
+                "message": result["message"],
+                "error_code": result["error_code"],
+                "details": result.get("details", {})
+            }, status_code)
+    
+    except Exception as e:
+        return make_response({
+            "status": "error", 
+            "message": f"Unexpected error occurred: {str(e)}",
+            "error_code": "UNEXPECTED_ERROR"
+        }, 500)
+
+
 @bp.get("/<id_number>")
 @jwt_required()
+@conditional_row_get("students", "id_number")
 def get_student_route(id_number: str):
     try:
         result = get_student(id_number)
@@ -141,12 +279,91 @@ def get_student_route(id_number: str):
         }, 500)
 
 
+@bp.patch("/batch")
+@jwt_required()
+def batch_update_students_route():
+    payload = request.get_json(force=True, silent=True) or {}
+    try:
+        result = batch_update_students(payload.get("ids"), payload.get("updates") or {})
+        
+        if result["success"]:
+            return make_response({
+                "status": "success",
+                "message": result["message"],
+                "data": result["data"]
+            }, 200)
+        else:
+            status_code = 400
+            if result["error_code"] == "BATCH_TOO_LARGE":
+                status_code = 413
+            elif result["error_code"] in ("DATABASE_ERROR", "STUDENT_BATCH_UPDATE_FAILED"):
+                status_code = 500
+            
+            return make_response({
+                "status": "error",
+                "message": result["message"],
+                "error_code": result["error_code"],
+                "details": result.get("details", {})
+            }, status_code)
+            
+    except Exception as e:
+        return make_response({
+            "status": "error", 
+            "message": f"Unexpected error occurred: {str(e)}",
+            "error_code": "UNEXPECTED_ERROR"
+        }, 500)
+
+
+@bp.delete("/batch")
+@jwt_required()
+def batch_delete_students_route():
+    payload = request.get_json(force=True, silent=True) or {}
+    try:
+        result = batch_delete_students(payload.get("ids"))
+        
+        if result["success"]:
+            return make_response({
+                "status": "success",
+                "message": result["message"],
+                "data": result["data"]
+            }, 200)
+        else:
+            status_code = 400
+            if result["error_code"] == "BATCH_TOO_LARGE":
+                status_code = 413
+            elif result["error_code"] in ("DATABASE_ERROR", "STUDENT_BATCH_DELETE_FAILED"):
+                status_code = 500
+            
+            return make_response({
+                "status": "error",
+                "message": result["message"],
+                "error_code": result["error_code"],
+                "details": result.get("details", {})
+            }, status_code)
+            
+    except Exception as e:
+        return make_response({
+            "status": "error", 
+            "message": f"Unexpected error occurred: {str(e)}",
+            "error_code": "UNEXPECTED_ERROR"
+        }, 500)
+
+
 @bp.put("/<id_number>")
 @jwt_required()
 def update_student_route(id_number: str):
     updates = request.get_json(force=True) or {}
     try:
-        result = update_student(id_number, updates)
+        try:
+            version = expected_version(updates)
+        except ValueError as e:
+            return make_response({
+                "status": "error",
+                "message": str(e),
+                "error_code": "INVALID_EXPECTED_VERSION"
+            }, 400)
+        
+        result = update_student(id_number, updates, version)
         
         if result["success"]:
             return make_response({
@@ -158,7 +375,7 @@ def update_student_route(id_number: str):
             status_code = 400
             if result["error_code"] == "STUDENT_NOT_FOUND":
                 status_code = 404
-            elif result["error_code"] == "STUDENT_ID_EXISTS":
+            elif result["error_code"] in ("STUDENT_ID_EXISTS", "VERSION_CONFLICT"):
                 status_code = 409  # Conflict
             elif result["error_code"] == "PROGRAM_NOT_FOUND":
                 status_code = 400
@@ -418,4 +635,38 @@ def get_avatar_url(id_number: str):
             "status": "error", 
             "message": f"Unexpected error occurred: {str(e)}",
             "error_code": "UNEXPECTED_ERROR"
-        }, 500)
\ No newline at end of file
+        }, 500)
+
+
+@bp.get("/delta")
+@jwt_required()
+def student_changes_route():
+    try:
+        since = request.args.get("since", "0")
+        if not since.isdigit():
+            return make_response({
+                "status": "error",
+                "message": "since must be a non-negative row version",
+                "error_code": "INVALID_SINCE"
+            }, 400)
+
+        result = get_student_changes(int(since))
+        if result["success"]:
+            return make_response({
+                "status": "success",
+                "message": result["message"],
+                "data": result["data"]
+            }, 200)
+
+        status_code = 410 if result["error_code"] == "DELTA_EXPIRED" else 500
+        return make_response({
+            "status": "error",
+            "message": result["message"],
+            "error_code": result["error_code"]
+        }, status_code)
+    except Exception as e:
+        return make_response({
+            "status": "error",
+            "message": f"Unexpected error occurred: {str(e)}",
+            "error_code": "UNEXPECTED_ERROR"
+        }, 500)
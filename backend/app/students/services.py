@@ -1,11 +1,26 @@
 from typing import Dict, Any, List, Tuple, Optional
-from ..models import Student
+from ..models import Student, Program
 from ..models.base_model import ModelError, ValidationError, DatabaseError, NotFoundError
+from ..db.reference_cache import programs_cache
+from ..utils.cache import LRUCache
+from ..utils.import_utils import iter_csv_rows, iter_ndjson_rows
+from ..utils.export_utils import EXPORT_FORMATS, iter_csv_chunks, iter_ndjson_chunks
 from ..utils.validation_utils import _valid_id_number
 import os
 from ..supabase_client import supabase  # Add this import
 
 
+# Typeahead results keyed on (normalized prefix, limit); cleared on every student write
+_suggest_cache = LRUCache(maxsize=512, ttl=30)
+
+# Rows validated and inserted per statement during bulk import
+IMPORT_BATCH_SIZE = 1000
+# Cap on per-row errors returned in one import report
+IMPORT_MAX_ERRORS = 1000
+# Upper bound on the number of IDs accepted by one batch update/delete request
+BATCH_MAX_IDS = 1000
+
+
 def search_students(
     sort_by: str,
     sort_order: str,
@@ -13,26 +28,59 @@ def search_students(
     search_by: str,
     page: int,
     page_size: int,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    search_mode: str = "",
 ) -> Dict[str, Any]:
     """Search students with improved error handling."""
     try:
+        if after is not None or before is not None:
+            students, next_cursor, prev_cursor = Student.search_keyset(
+                search_by=search_by,
+                search_term=search_term,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                page_size=page_size,
+                after=after,
+                before=before,
+                search_mode=search_mode
+            )
+            
+            return {
+                "success": True,
+                "message": f"Found {len(students)} students",
+                "data": students,
+                "total_count": None,
+                "page": None,
+                "page_size": page_size,
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor
+            }
+        
         students, total_count = Student.search(
             search_by=search_by,
             search_term=search_term,
             sort_by=sort_by,
             sort_order=sort_order,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            search_mode=search_mode
         )
         
         return {
             "success": True,
             "message": f"Found {len(students)} students",
-            "data": [student.to_dict() for student in students],
+            "data": students,
             "total_count": total_count,
             "page": page,
             "page_size": page_size
         }
+    except ValidationError as e:
+        return {
+            "success": False,
+            "message": e.message,
+            "error_code": e.error_code
+        }
     except Exception as e:
         return {
             "success": False,
@@ -41,6 +89,86 @@ def search_students(
         }
 
 
+def suggest_students(query: str, limit: int = 10) -> Dict[str, Any]:
+    """Suggest students whose ID number or name starts with `query`."""
+    try:
+        prefix = " ".join(query.split()).lower()
+        if not prefix:
+            return {
+                "success": True,
+                "message": "Empty query",
+                "data": []
+            }
+        
+        key = (prefix, limit)
+        suggestions = _suggest_cache.get(key)
+        if suggestions is None:
+            suggestions = Student.suggest(prefix, limit)
+            _suggest_cache.set(key, suggestions)
+        
+        return {
+            "success": True,
+            "message": f"Found {len(suggestions)} suggestions",
+            "data": suggestions
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Failed to suggest students: {str(e)}",
+            "error_code": "SUGGEST_ERROR"
+        }
+
+
+def export_students(
+    file_format: str,
+    sort_by: str,
+    sort_order: str,
+    search_term: str,
+    search_by: str,
+    search_mode: str = "",
+) -> Dict[str, Any]:
+    """Prepare a streaming export of the students matching the search filters."""
+    try:
+        if file_format not in EXPORT_FORMATS:
+            return {
+                "success": False,
+                "message": f"Invalid export format: {file_format}. Must be one of {', '.join(EXPORT_FORMATS)}",
+                "error_code": "INVALID_EXPORT_FORMAT"
+            }
+        
+        rows = Student.iter_search(
+            search_by=search_by,
+            search_term=search_term,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            search_mode=search_mode
+        )
+        # row_version is sync bookkeeping, not student data; exports keep the import columns
+        columns = [column.strip() for column in Student.SELECT_COLUMNS.split(",") if column.strip() != "row_version"]
+        encode = iter_csv_chunks if file_format == "csv" else iter_ndjson_chunks
+        mimetype, extension = EXPORT_FORMATS[file_format]
+        
+        return {
+            "success": True,
+            "message": "Export ready",
+            "data": encode(rows, columns),
+            "mimetype": mimetype,
+            "filename": f"students.{extension}"
+        }
+    except ValidationError as e:
+        return {
+            "success": False,
+            "message": e.message,
+            "error_code": e.error_code
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Failed to export students: {str(e)}",
+            "error_code": "EXPORT_ERROR"
+        }
+
+
 def get_student(id_number: str) -> Dict[str, Any]:
     """Get a specific student by ID number."""
     try:
@@ -79,7 +207,7 @@ def get_students_by_program(program_code: str) -> Dict[str, Any]:
         return {
             "success": True,
             "message": f"Found {len(students)} students in program '{program_code}'",
-            "data": [student.to_dict() for student in students]
+            "data": students
         }
     except Exception as e:
         return {
@@ -96,7 +224,7 @@ def get_all_students() -> Dict[str, Any]:
         return {
             "success": True,
             "message": f"Retrieved {len(students)} students",
-            "data": [student.to_dict() for student in students]
+            "data": students
         }
     except Exception as e:
         return {
@@ -119,6 +247,7 @@ def create_student(data: Dict[str, Any]) -> Dict[str, Any]:
             photo_path=data.get("photo_path", "")
         )
         saved_student = student.save()
+        _suggest_cache.clear()
         
         return {
             "success": True,
@@ -147,18 +276,12 @@ def create_student(data: Dict[str, Any]) -> Dict[str, Any]:
         }
 
 
-def update_student(id_number: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+def update_student(id_number: str, updates: Dict[str, Any], expected_version: Optional[int] = None) -> Dict[str, Any]:
     """Update a student."""
     try:
-        student = Student.find_by_id(id_number)
-        if not student:
-            return {
-                "success": False,
-                "message": f"Student with ID '{id_number}' not found",
-                "error_code": "STUDENT_NOT_FOUND"
-            }
-        
-        updated_student = student.update(updates)
+        # No pre-read: the model writes in one statement and reports a missing row itself
+        updated_student = Student(id_number=id_number).update(updates, expected_version)
+        _suggest_cache.clear()
         return {
             "success": True,
             "message": "Student updated successfully",
@@ -171,6 +294,12 @@ def update_student(id_number: str, updates: Dict[str, Any]) -> Dict[str, Any]:
             "error_code": e.error_code,
             "details": e.details
         }
+    except NotFoundError as e:
+        return {
+            "success": False,
+            "message": e.message,
+            "error_code": e.error_code
+        }
     except DatabaseError as e:
         return {
             "success": False,
@@ -199,6 +328,7 @@ def delete_student(id_number: str) -> Dict[str, Any]:
         
         deleted = student.delete()
         if deleted:
+            _suggest_cache.clear()
             return {
                 "success": True,
                 "message": "Student deleted successfully"
@@ -228,4 +358,287 @@ def delete_student(id_number: str) -> Dict[str, Any]:
             "success": False,
             "message": f"Unexpected error occurred: {str(e)}",
             "error_code": "UNEXPECTED_ERROR"
-        }
\ No newline at end of file
+        }
+
+
+def _parse_batch_ids(id_numbers: Any) -> Tuple[List[str], List[str]]:
+    """Split the requested IDs into well-formed (deduplicated, in order) and malformed ones."""
+    if not isinstance(id_numbers, list) or not id_numbers:
+        raise ValidationError(
+            "ids must be a non-empty list of student ID numbers",
+            error_code="INVALID_BATCH_IDS"
+        )
+    
+    if len(id_numbers) > BATCH_MAX_IDS:
+        raise ValidationError(
+            f"A batch may contain at most {BATCH_MAX_IDS} IDs",
+            error_code="BATCH_TOO_LARGE",
+            details={"max_ids": BATCH_MAX_IDS}
+        )
+    
+    valid, invalid = [], []
+    for id_number in dict.fromkeys(str(value).strip() for value in id_numbers):
+        (valid if _valid_id_number(id_number) else invalid).append(id_number)
+    return valid, invalid
+
+
+def _batch_results(valid: List[str], invalid: List[str], done: List[str], done_status: str) -> List[Dict[str, str]]:
+    """Per-ID outcome of a batch operation, in request order."""
+    done = set(done)
+    results = [
+        {"id_number": id_number, "status": done_status if id_number in done else "not_found"}
+        for id_number in valid
+    ]
+    results.extend({"id_number": id_number, "status": "invalid_id"} for id_number in invalid)
+    return results
+
+
+def batch_update_students(id_numbers: Any, updates: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply one change set to many students with a single set-based UPDATE."""
+    try:
+        valid, invalid = _parse_batch_ids(id_numbers)
+        updated = Student.batch_update(valid, updates)
+        if updated:
+            _suggest_cache.clear()
+        
+        return {
+            "success": True,
+            "message": f"Updated {len(updated)} of {len(valid) + len(invalid)} students",
+            "data": {
+                "updated": len(updated),
+                "results": _batch_results(valid, invalid, updated, "updated")
+            }
+        }
+    except ValidationError as e:
+        return {
+            "success": False,
+            "message": e.message,
+            "error_code": e.error_code,
+            "details": e.details
+        }
+    except DatabaseError as e:
+        return {
+            "success": False,
+            "message": "Failed to update students due to database error",
+            "error_code": e.error_code,
+            "details": e.details
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Unexpected error occurred: {str(e)}",
+            "error_code": "UNEXPECTED_ERROR"
+        }
+
+
+def batch_delete_students(id_numbers: Any) -> Dict[str, Any]:
+    """Delete many students with a single set-based DELETE."""
+    try:
+        valid, invalid = _parse_batch_ids(id_numbers)
+        deleted = Student.batch_delete(valid)
+        if deleted:
+            _suggest_cache.clear()
+        
+        return {
+            "success": True,
+            "message": f"Deleted {len(deleted)} of {len(valid) + len(invalid)} students",
+            "data": {
+                "deleted": len(deleted),
+                "results": _batch_results(valid, invalid, deleted, "deleted")
+            }
+        }
+    except ValidationError as e:
+        return {
+            "success": False,
+            "message": e.message,
+            "error_code": e.error_code,
+            "details": e.details
+        }
+    except DatabaseError as e:
+        return {
+            "success": False,
+            "message": "Failed to delete students due to database error",
+            "error_code": e.error_code,
+            "details": e.details
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Unexpected error occurred: {str(e)}",
+            "error_code": "UNEXPECTED_ERROR"
+        }
+
+
+def _student_from_import_row(row: Dict[str, Any]) -> Student:
+    """Build a student from an uploaded row, normalizing the loosely typed CSV/JSON values."""
+    def text_value(field: str) -> str:
+        value = row.get(field)
+        return str(value).strip() if value is not None else ""
+    
+    year_level = row.get("year_level")
+    if isinstance(year_level, str):
+        year_level = year_level.strip()
+        year_level = int(year_level) if year_level.isdigit() else (year_level or None)
+    
+    return Student(
+        id_number=text_value("id_number"),
+        first_name=text_value("first_name"),
+        last_name=text_value("last_name"),
+        year_level=year_level,
+        gender=text_value("gender").upper(),
+        program_code=text_value("program_code")
+    )
+
+
+def import_students(stream, file_format: str) -> Dict[str, Any]:
+    """
+    Import students from a CSV or NDJSON byte stream.
+    Rows are validated in memory against a preloaded program set and inserted in batches with
+    one multi-row INSERT ... ON CONFLICT DO NOTHING per batch; failures are reported per row.
+    A program code missing from the set is confirmed once against the database, since it may have
+    been created in another worker since the set was cached; rows whose program is deleted while
+    the file is being imported are reported per row when their batch is inserted.
+    """
+    try:
+        rows = iter_csv_rows(stream) if file_format == "csv" else iter_ndjson_rows(stream)
+        program_codes = set(programs_cache.get("codes", Program.get_all_codes))
+        missing_program_codes = set()
+        
+        report = {"total_rows": 0, "imported": 0, "failed": 0, "errors": [], "errors_truncated": False}
+        seen_ids = set()
+        batch: List[Tuple[int, Student]] = []
+        
+        def add_error(row_number: int, id_number: Optional[str], error_code: str, message: str) -> None:
+            report["failed"] += 1
+            if len(report["errors"]) < IMPORT_MAX_ERRORS:
+                report["errors"].append({
+                    "row": row_number,
+                    "id_number": id_number,
+                    "error_code": error_code,
+                    "message": message
+                })
+            else:
+                report["errors_truncated"] = True
+        
+        def flush() -> None:
+            pending = list(batch)
+            batch.clear()
+            while pending:
+                try:
+                    inserted = set(Student.bulk_insert([student for _, student in pending]))
+                except ValidationError as e:
+                    if e.error_code != "PROGRAM_NOT_FOUND":
+                        raise
+                    # A program was deleted after its rows were checked: report those rows, insert the rest
+                    program_codes.intersection_update(Program.get_all_codes())
+                    remaining = []
+                    for row_number, student in pending:
+                        if student.program_code in program_codes:
+                            remaining.append((row_number, student))
+                        else:
+                            missing_program_codes.add(student.program_code)
+                            add_error(row_number, student.id_number, "PROGRAM_NOT_FOUND",
+                                      f"Program with code '{student.program_code}' does not exist")
+                    if len(remaining) == len(pending):
+                        raise
+                    pending = remaining
+                    continue
+                
+                report["imported"] += len(inserted)
+                for row_number, student in pending:
+                    if student.id_number not in inserted:
+                        add_error(row_number, student.id_number, "STUDENT_ID_EXISTS",
+                                  f"Student with ID number '{student.id_number}' already exists")
+                break
+        
+        for row_number, row, parse_error in rows:
+            report["total_rows"] += 1
+            if parse_error:
+                add_error(row_number, None, "INVALID_ROW", parse_error)
+                continue
+            
+            student = _student_from_import_row(row)
+            try:
+                student.validate_fields()
+            except ValidationError as e:
+                add_error(row_number, student.id_number or None, e.error_code, e.message)
+                continue
+            
+            code = student.program_code
+            if code not in program_codes:
+                # Confirmed codes (found or not) are remembered for the rest of the file
+                if code not in missing_program_codes and student._program_exists(code):
+                    program_codes.add(code)
+                else:
+                    missing_program_codes.add(code)
+                    add_error(row_number, student.id_number, "PROGRAM_NOT_FOUND",
+                              f"Program with code '{code}' does not exist")
+                    continue
+            
+            if student.id_number in seen_ids:
+                add_error(row_number, student.id_number, "DUPLICATE_ID_IN_FILE",
+                          f"ID number '{student.id_number}' appears more than once in the file")
+                continue
+            seen_ids.add(student.id_number)
+            
+            batch.append((row_number, student))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                flush()
+        
+        if batch:
+            flush()
+        
+        # Conflicts are only known after each batch insert; report errors in file order
+        report["errors"].sort(key=lambda error: error["row"])
+        
+        if report["imported"]:
+            _suggest_cache.clear()
+        
+        return {
+            "success": True,
+            "message": f"Imported {report['imported']} of {report['total_rows']} students",
+            "data": report
+        }
+    except UnicodeDecodeError as e:
+        return {
+            "success": False,
+            "message": f"File is not valid UTF-8: {str(e)}",
+            "error_code": "INVALID_FILE_ENCODING"
+        }
+    except DatabaseError as e:
+        return {
+            "success": False,
+            "message": "Failed to import students due to database error",
+            "error_code": e.error_code,
+            "details": e.details
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Unexpected error occurred: {str(e)}",
+            "error_code": "UNEXPECTED_ERROR"
+        }
+
+
+def get_student_changes(since: int) -> Dict[str, Any]:
+    """Get students changed or deleted at or after a row version (delta sync)."""
+    try:
+        changes = Student.changes_since(since)
+        return {
+            "success": True,
+            "message": f"{len(changes['changed'])} changed and {len(changes['deleted'])} deleted students",
+            "data": changes
+        }
+    except ValidationError as e:
+        return {
+            "success": False,
+            "message": e.message,
+            "error_code": e.error_code,
+            "details": e.details
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Failed to retrieve changes: {str(e)}",
+            "error_code": "RETRIEVAL_ERROR"
+        }
@@ -9,7 +9,8 @@ from .services import (
     get_user_by_id,
     create_user,
     update_user,
-    delete_user
+    delete_user,
+    get_user_changes
 )
 
 bp = Blueprint("users", __name__)
@@ -83,8 +84,12 @@ def create_user_route():
             }, 201)
         else:
             status_code = 400
+            headers = None
             if result["error_code"] in ["USERNAME_EXISTS", "EMAIL_EXISTS"]:
                 status_code = 409
+            elif result["error_code"] == "PASSWORD_HASHER_BUSY":
+                status_code = 503
+                headers = {"Retry-After": str(result["retry_after"])}
             elif result["error_code"] == "DATABASE_ERROR":
                 status_code = 500
 
@@ -93,7 +98,7 @@ def create_user_route():
                 "message": result["message"],
                 "error_code": result["error_code"],
                 "details": result.get("details", {})
-            }, status_code)
+            }, status_code, headers)
     except Exception as e:
         return make_response({
             "status": "error",
@@ -154,3 +159,38 @@ def delete_user_route(user_id: int):
             "message": f"Unexpected error occurred: {str(e)}",
             "error_code": "UNEXPECTED_ERROR"
         }, 500)
+
+
+@bp.get("/delta")
+@jwt_required()
+@admin_required
+def user_changes_route():
+    try:
+        since = request.args.get("since", "0")
+        if not since.isdigit():
+            return make_response({
+                "status": "error",
+                "message": "since must be a non-negative row version",
+                "error_code": "INVALID_SINCE"
+            }, 400)
+
+        result = get_user_changes(int(since))
+        if result["success"]:
+            return make_response({
+                "status": "success",
+                "message": result["message"],
+                "data": result["data"]
+            }, 200)
+
+        status_code = 410 if result["error_code"] == "DELTA_EXPIRED" else 500
+        return make_response({
+            "status": "error",
+            "message": result["message"],
+            "error_code": result["error_code"]
+        }, status_code)
+    except Exception as e:
+        return make_response({
+            "status": "error",
+            "message": f"Unexpected error occurred: {str(e)}",
+            "error_code": "UNEXPECTED_ERROR"
+        }, 500)
@@ -1,6 +1,8 @@
 from typing import Dict, Any
 from ..models import User
 from ..models.base_model import ValidationError, DatabaseError, NotFoundError
+from ..utils.admin_required import forget_token_version
+from ..utils.password_hashing import PasswordHasherBusy
 
 
 def get_all_users() -> Dict[str, Any]:
@@ -55,6 +57,13 @@ def create_user(data: Dict[str, Any]) -> Dict[str, Any]:
             "message": "User created successfully",
             "data": saved.to_dict()
         }
+    except PasswordHasherBusy as e:
+        return {
+            "success": False,
+            "message": "Too many password operations in progress, please retry shortly",
+            "error_code": "PASSWORD_HASHER_BUSY",
+            "retry_after": e.retry_after
+        }
     except ValidationError as e:
         return {
             "success": False,
@@ -100,6 +109,7 @@ def update_user(user_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
                 setattr(user, key, value)
 
         updated_user = user.save()
+        forget_token_version(user_id)
         return {
             "success": True,
             "message": "User updated successfully",
@@ -137,6 +147,7 @@ def delete_user(user_id: int) -> Dict[str, Any]:
                 "error_code": "USER_NOT_FOUND"
             }
         deleted = user.delete()
+        forget_token_version(user_id)
         if not deleted:
             return {
                 "success": False,
@@ -153,3 +164,27 @@ def delete_user(user_id: int) -> Dict[str, Any]:
             "message": f"Unexpected error occurred: {str(e)}",
             "error_code": "UNEXPECTED_ERROR"
         }
+
+
+def get_user_changes(since: int) -> Dict[str, Any]:
+    """Get users changed or deleted at or after a row version (delta sync)."""
+    try:
+        changes = User.changes_since(since)
+        return {
+            "success": True,
+            "message": f"{len(changes['changed'])} changed and {len(changes['deleted'])} deleted users",
+            "data": changes
+        }
+    except ValidationError as e:
+        return {
+            "success": False,
+            "message": e.message,
+            "error_code": e.error_code,
+            "details": e.details
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Failed to retrieve changes: {str(e)}",
+            "error_code": "RETRIEVAL_ERROR"
+        }
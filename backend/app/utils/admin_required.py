@@ -1,21 +1,56 @@
-from flask_jwt_extended import get_jwt_identity
+from functools import wraps
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from ..utils.cache import LRUCache
 from ..utils.route_utils import make_response
 from ..models import User
 
+# Current token epoch per user id (-1 once the user is gone). Entries expire after a few seconds,
+# so a demotion made through another worker still takes effect quickly.
+TOKEN_VERSION_TTL = 15
+_token_versions = LRUCache(maxsize=1024, ttl=TOKEN_VERSION_TTL)
+
+
+def current_token_version(user_id: str) -> int:
+    """Return the user's token epoch, from the cache when possible (-1 if the user no longer exists)."""
+    version = _token_versions.get(user_id)
+    if version is None:
+        version = User.get_token_version(user_id)
+        version = -1 if version is None else version
+        _token_versions.set(user_id, version)
+    return version
+
+
+def forget_token_version(user_id) -> None:
+    """Drop the cached epoch after a local change to the user so it is re-read on the next request."""
+    _token_versions.delete(str(user_id))
+
+
 def admin_required(func):
     """Decorator to restrict route access to admin users only."""
-    from functools import wraps
 
     @wraps(func)
     def wrapper(*args, **kwargs):
         current_user_id = get_jwt_identity()
-        user = User.find_by_id(current_user_id)
+        claims = get_jwt()
+
+        if "role" not in claims or "ver" not in claims:
+            # Token issued before role claims existed; fall back to the database
+            user = User.find_by_id(current_user_id)
+            is_admin = bool(user and user.role == "admin")
+        else:
+            if claims["ver"] != current_token_version(current_user_id):
+                return make_response({
+                    "status": "error",
+                    "message": "Session is no longer valid, please log in again",
+                    "error_code": "TOKEN_REVOKED"
+                }, 401)
+            is_admin = claims["role"] == "admin"
 
-        if not user or user.role != "admin":
+        if not is_admin:
             return make_response({
                 "status": "error",
                 "message": "Admin privileges required",
                 "error_code": "UNAUTHORIZED_ACCESS"
             }, 403)
         return func(*args, **kwargs)
-    return wrapper
\ No newline at end of file
+    return wrapper
@@ -0,0 +1,167 @@
+"""
+Negotiated gzip/brotli compression of responses.
+
+Dynamic responses (API JSON, CSV/NDJSON exports, the SPA shell) are compressed in an after_request
+hook when the client accepts it, the mimetype is text-like and the body is at least
+COMPRESSION_MIN_SIZE bytes. Streamed responses are compressed chunk by chunk and flushed after
+each one, so clients still receive data as it is produced.
+
+Built frontend files get precompressed `.br`/`.gz` siblings from scripts/copy_dist.py;
+`send_precompressed` serves those as they are instead of compressing the same bytes per request.
+Brotli needs the optional `brotli` package; without it only gzip is offered.
+"""
+import mimetypes
+import os
+import zlib
+from typing import Iterable, Iterator, List, Optional
+from flask import Flask, Response, current_app, request, send_from_directory
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/manifest+json",
+    "image/svg+xml",
+    "text/css",
+    "text/csv",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+}
+
+# File suffix of each precompressed sibling, in server preference order
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def available_encodings() -> List[str]:
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate_encoding(offered: List[str]) -> Optional[str]:
+    """The offered encoding the client accepts with the highest quality (ties go to the first offered)."""
+    if not offered:
+        return None
+    return request.accept_encodings.best_match(offered)
+
+
+def _gzip_compressor(level: int):
+    # wbits=31: zlib stream with a gzip header and trailer
+    return zlib.compressobj(level, zlib.DEFLATED, 31)
+
+
+def _level(encoding: str) -> int:
+    return current_app.config["COMPRESSION_BROTLI_QUALITY" if encoding == "br" else "COMPRESSION_GZIP_LEVEL"]
+
+
+def compress_bytes(data: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    compressor = _gzip_compressor(level)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str, level: int, close=None) -> Iterator[bytes]:
+    """Compress `chunks` incrementally, flushing after every chunk so nothing is held back."""
+    try:
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=level)
+            for chunk in chunks:
+                data = compressor.process(chunk) + compressor.flush()
+                if data:
+                    yield data
+            yield compressor.finish()
+        else:
+            compressor = _gzip_compressor(level)
+            for chunk in chunks:
+                data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                if data:
+                    yield data
+            yield compressor.flush()
+    finally:
+        if close is not None:
+            close()
+
+
+def _is_compressible(response: Response) -> bool:
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return False
+    if "Content-Encoding" in response.headers or "Content-Range" in response.headers:
+        return False
+    return "no-transform" not in response.headers.get("Cache-Control", "")
+
+
+def compress_response(response: Response) -> Response:
+    """after_request hook: compress the body when the client accepts an encoding we offer."""
+    app = current_app
+    if not app.config.get("COMPRESSION_ENABLED", True) or not _is_compressible(response):
+        return response
+    # File responses without precompressed siblings are passed through untouched
+    if response.direct_passthrough:
+        return response
+
+    streamed = response.is_streamed
+    if streamed and not app.config.get("COMPRESSION_STREAMING", True):
+        return response
+    if not streamed and response.content_length is not None \
+            and response.content_length < app.config["COMPRESSION_MIN_SIZE"]:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding(available_encodings())
+    if encoding is None:
+        return response
+
+    if streamed:
+        original = response.response
+        # Runs after the request context is gone; everything it needs is passed in
+        response.response = compress_stream(response.iter_encoded(), encoding, _level(encoding),
+                                            close=getattr(original, "close", None))
+        response.headers.pop("Content-Length", None)
+    else:
+        response.set_data(compress_bytes(response.get_data(), encoding, _level(encoding)))
+
+    response.headers["Content-Encoding"] = encoding
+    # The compressed body is a different representation; a strong validator must not be shared
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def send_precompressed(directory: str, filename: str, **kwargs) -> Response:
+    """send_from_directory, preferring a `.br`/`.gz` sibling of the file when the client accepts it."""
+    path = safe_join(directory, filename)
+    # Serving an existing .br file does not need the brotli package
+    offered = [
+        encoding for encoding, suffix in PRECOMPRESSED_SUFFIXES.items()
+        if path and os.path.isfile(path + suffix)
+    ] if current_app.config.get("COMPRESSION_ENABLED", True) else []
+
+    encoding = negotiate_encoding(offered)
+    if encoding is None:
+        response = send_from_directory(directory, filename, **kwargs)
+    else:
+        kwargs.setdefault("mimetype", mimetypes.guess_type(filename)[0] or "application/octet-stream")
+        response = send_from_directory(directory, filename + PRECOMPRESSED_SUFFIXES[encoding], **kwargs)
+        response.headers["Content-Encoding"] = encoding
+
+    if offered:
+        response.vary.add("Accept-Encoding")
+    return response
+
+
+def init_compression(app: Flask) -> None:
+    app.after_request(compress_response)
+
+    if app.has_static_folder:
+        def static(filename: str) -> Response:
+            return send_precompressed(app.static_folder, filename)
+        app.view_functions["static"] = static
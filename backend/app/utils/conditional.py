@@ -0,0 +1,133 @@
+"""
+Conditional requests.
+
+Reads: the weak ETag of a list or search response is derived from the change counters of the
+tables it reads (table_versions, bumped by triggers) and the request path and query string. A
+single-row response is tagged with the row's own row_version instead (`"<row_version>"`), so
+writes to other rows leave it valid. A matching If-None-Match is answered with 304 after a single
+primary-key lookup, before the view runs its query.
+
+Writes: an update may be made conditional on the row_version the client last saw, sent as
+`If-Match: "<row_version>"` or as `expected_version` in the JSON body (see `expected_version`).
+The ETag of a single-row GET is exactly that If-Match value, so clients can echo it back.
+"""
+import hashlib
+from functools import wraps
+from typing import Any, Dict, Optional, Sequence
+from flask import Response, request
+from ..db.database import execute_sql
+
+
+def get_table_versions(tables: Sequence[str]) -> Optional[Dict[str, int]]:
+    """Current change counter of each table, or None when they cannot be read."""
+    result = execute_sql(
+        "SELECT table_name, version FROM table_versions WHERE table_name = ANY(:tables)",
+        {"tables": list(tables)}
+    )
+    if result is None:
+        return None
+    return {row[0]: row[1] for row in result.all()}
+
+
+def compute_etag(versions: Dict[str, int]) -> str:
+    digest = hashlib.sha1()
+    for table in sorted(versions):
+        digest.update(f"{table}={versions[table]};".encode())
+    digest.update(request.path.encode())
+    for key, value in sorted(request.args.items(multi=True)):
+        digest.update(f"&{key}={value}".encode())
+    return digest.hexdigest()[:24]
+
+
+def get_row_version(table: str, key_column: str, key: Any) -> Optional[int]:
+    """The row_version of one row, or None when the row does not exist or cannot be read."""
+    result = execute_sql(
+        f"SELECT row_version FROM {table} WHERE {key_column} = :key",
+        {"key": key}
+    )
+    return result.scalar() if result is not None else None
+
+
+def _validate(response: Response, etag: str, weak: bool = True) -> Response:
+    response.set_etag(etag, weak=weak)
+    # Authenticated data: browsers may keep it but must revalidate before reuse
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def conditional_get(*tables: str):
+    """
+    Tag successful responses of the decorated GET route with a weak ETag built from `tables`'
+    versions and answer a matching If-None-Match with 304 without calling the view.
+    Apply below the auth decorator so unauthenticated requests never see a 304.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            versions = get_table_versions(tables)
+            if versions is None:
+                return func(*args, **kwargs)
+
+            # Versions are read before the query; a write landing in between only makes the
+            # response newer than its tag, which costs the client one extra download later.
+            etag = compute_etag(versions)
+            if request.if_none_match.contains_weak(etag):
+                return _validate(Response(status=304), etag)
+
+            response = func(*args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                _validate(response, etag)
+            return response
+        return wrapper
+    return decorator
+
+
+def conditional_row_get(table: str, key_column: str):
+    """
+    Tag successful responses of the decorated single-row GET route with the row's row_version as a
+    strong ETag, read from the returned `data`, and answer a matching If-None-Match with 304 after
+    looking up that version (keyed by the `key_column` view argument) without calling the view.
+    Apply below the auth decorator so unauthenticated requests never see a 304.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # Unconditional requests skip the lookup; the view reads the row anyway
+            if request.if_none_match:
+                version = get_row_version(table, key_column, kwargs[key_column])
+                if version is not None and request.if_none_match.contains_weak(str(version)):
+                    return _validate(Response(status=304), str(version), weak=False)
+
+            response = func(*args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                data = (response.get_json(silent=True) or {}).get("data")
+                if isinstance(data, dict) and data.get("row_version") is not None:
+                    _validate(response, str(data["row_version"]), weak=False)
+            return response
+        return wrapper
+    return decorator
+
+
+def expected_version(payload: Any) -> Optional[int]:
+    """
+    The row version an update is conditional on, from `If-Match: "<row_version>"` (the ETag of the
+    row's GET) and/or the body's `expected_version` (removed from `payload`). None when neither is
+    given or If-Match is `*`. Raises ValueError when either is malformed or the two disagree.
+    """
+    versions = set()
+    value = payload.pop("expected_version", None) if isinstance(payload, dict) else None
+    if value is not None:
+        if isinstance(value, bool) or not str(value).isdigit():
+            raise ValueError("expected_version must be a non-negative row version")
+        versions.add(int(value))
+
+    if "If-Match" in request.headers and not request.if_match.star_tag:
+        # Compression weakens the ETag a client received (W/"123"); it still names the same row version
+        tags = list(request.if_match.as_set(include_weak=True))
+        if len(tags) != 1 or not tags[0].isdigit():
+            raise ValueError('If-Match must be a single quoted row version, e.g. "123"')
+        versions.add(int(tags[0]))
+
+    if len(versions) > 1:
+        raise ValueError("If-Match and expected_version name different row versions")
+    return versions.pop() if versions else None
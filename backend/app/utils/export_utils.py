@@ -0,0 +1,44 @@
+import csv
+import io
+import json
+from typing import Any, Iterable, Iterator, List, Mapping
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+# Rows buffered per yielded chunk; keeps write calls cheap without holding the whole export
+EXPORT_CHUNK_ROWS = 500
+
+
+def iter_csv_chunks(rows: Iterable[Mapping[str, Any]], columns: List[str]) -> Iterator[str]:
+    """Encode rows as CSV (header first), yielding one string chunk per EXPORT_CHUNK_ROWS rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    pending = 0
+    for row in rows:
+        writer.writerow(["" if row[column] is None else row[column] for column in columns])
+        pending += 1
+        if pending >= EXPORT_CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    yield buffer.getvalue()
+
+
+def iter_ndjson_chunks(rows: Iterable[Mapping[str, Any]], columns: List[str]) -> Iterator[str]:
+    """Encode rows as newline-delimited JSON objects, yielding one chunk per EXPORT_CHUNK_ROWS rows."""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({column: row[column] for column in columns}, default=str))
+        if len(lines) >= EXPORT_CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+
+    if lines:
+        yield "\n".join(lines) + "\n"
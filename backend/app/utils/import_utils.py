@@ -0,0 +1,63 @@
+import codecs
+import csv
+import io
+import json
+from typing import IO, Any, Dict, Iterator, Optional, Tuple
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+def detect_import_format(requested: Optional[str], filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """Resolve the upload format from an explicit parameter, the file extension or the content type."""
+    if requested:
+        requested = requested.lower()
+        return requested if requested in IMPORT_FORMATS else None
+
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+
+    mimetype = (content_type or "").split(";")[0].strip().lower()
+    if mimetype in ("text/csv", "application/csv"):
+        return "csv"
+    if mimetype in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        return "ndjson"
+    return None
+
+
+def iter_csv_rows(stream: IO[bytes]) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Yield (row_number, row, error) for each data row of a UTF-8 CSV byte stream with a header line.
+    The stream is decoded incrementally, so memory use does not grow with the file size.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    try:
+        for row in reader:
+            # reader.line_num counts physical lines, so quoted newlines do not shift the numbering
+            if None in row:
+                yield reader.line_num, None, "Row has more values than header columns"
+                continue
+            yield reader.line_num, {k.strip(): v for k, v in row.items() if k is not None}, None
+    finally:
+        text.detach()
+
+
+def iter_ndjson_rows(stream: IO[bytes]) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """Yield (line_number, row, error) for each non-blank line of a newline-delimited JSON byte stream."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    for line_number, raw in enumerate(stream, start=1):
+        line = decoder.decode(raw).strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Each line must be a JSON object"
+            continue
+        yield line_number, row, None
@@ -0,0 +1,59 @@
+"""
+Pluggable JSON serialization for API responses.
+
+JSON_SERIALIZER selects the Flask JSON provider: "orjson" (native encoder, several times faster on
+large list payloads), "stdlib" (Flask's default json module provider) or "auto" (orjson when it is
+installed). `make_response` and `jsonify` both go through the selected provider.
+"""
+from typing import Any, Union
+from flask import Flask, current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson; calls with stdlib-only options fall back to the default."""
+
+    def _option(self) -> int:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        # `default` covers what orjson lacks natively (Decimal, objects with __html__, ...)
+        return orjson.dumps(obj, default=self.default, option=self._option())
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+def init_json(app: Flask) -> None:
+    """Install the JSON provider named by JSON_SERIALIZER on `app`."""
+    name = app.config.get("JSON_SERIALIZER", "auto")
+    if name == "orjson" and orjson is None:
+        raise RuntimeError("JSON_SERIALIZER=orjson but the 'orjson' package is not installed")
+    if name not in ("auto", "orjson", "stdlib"):
+        raise ValueError(f"Unsupported JSON_SERIALIZER: {name}")
+
+    if name != "stdlib" and orjson is not None:
+        app.json = OrjsonProvider(app)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize `obj` with the current app's provider, straight to UTF-8 bytes when it can."""
+    provider = current_app.json
+    if isinstance(provider, OrjsonProvider):
+        return provider.dumps_bytes(obj)
+    return provider.dumps(obj).encode("utf-8")
@@ -0,0 +1,86 @@
+"""
+Password hashing on a small, bounded thread pool.
+
+scrypt/pbkdf2 are deliberately slow and CPU-bound. Running them on a fixed number of threads caps
+how much CPU a login burst can take from everything else, and the bounded queue turns overload
+into an immediate "try again shortly" instead of requests piling up behind each other.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+from flask import Flask, current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+T = TypeVar("T")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when every hashing worker is busy and the queue is full."""
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(f"Password hashing is at capacity, retry after {retry_after}s")
+
+
+class PasswordHasher:
+    """Runs werkzeug hash/verify calls on `workers` threads with at most `queue_size` waiting."""
+
+    def __init__(self, method: str = "scrypt", workers: int = 2, queue_size: int = 16, retry_after: int = 1):
+        self.method = method
+        self.workers = workers
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._method_prefix: Optional[str] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Worker threads do not survive a fork; each process gets its own pool
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn: Callable[..., T], *args) -> T:
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy(self.retry_after)
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        """Whether `pwhash` was made with a different method or cost than the configured one."""
+        if self._method_prefix is None:
+            # werkzeug fills in default parameters ("scrypt" -> "scrypt:32768:8:1"); learn them once
+            self._method_prefix = generate_password_hash("", self.method, salt_length=1).split("$", 1)[0]
+        return pwhash.split("$", 1)[0] != self._method_prefix
+
+
+def init_password_hasher(app: Flask) -> PasswordHasher:
+    hasher = PasswordHasher(
+        method=app.config["PASSWORD_HASH_METHOD"],
+        workers=app.config["PASSWORD_HASH_WORKERS"],
+        queue_size=app.config["PASSWORD_HASH_QUEUE_SIZE"],
+        retry_after=app.config["PASSWORD_HASH_RETRY_AFTER"],
+    )
+    app.extensions["password_hasher"] = hasher
+    return hasher
+
+
+def get_password_hasher() -> PasswordHasher:
+    hasher = current_app.extensions.get("password_hasher")
+    if hasher is None:
+        hasher = init_password_hasher(current_app)
+    return hasher
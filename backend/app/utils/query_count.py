@@ -0,0 +1,37 @@
+"""
+Test helper asserting how many SQL statements a block executes, e.g. one per create:
+
+    with assert_query_count(1, app):
+        client.post("/api/students", json=payload)
+
+Only statements run on the calling thread are counted; the Flask test client handles requests in
+the caller's thread, so other workers and the notification listener do not interfere.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+from flask import Flask, current_app
+from sqlalchemy import event
+from ..db.query_stats import statement_shape
+
+
+@contextmanager
+def assert_query_count(expected: int, app: Optional[Flask] = None) -> Iterator[List[str]]:
+    """Fail with AssertionError, listing the statements, unless exactly `expected` run in the block."""
+    engine = (app or current_app).extensions["db_engine"]
+    thread = threading.get_ident()
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        if threading.get_ident() == thread:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    if len(statements) != expected:
+        listing = "\n".join(f"  {i}. {statement_shape(s)[:200]}" for i, s in enumerate(statements, 1))
+        raise AssertionError(f"Expected {expected} queries, {len(statements)} were executed:\n{listing}")
@@ -0,0 +1,155 @@
+"""
+Token-bucket rate limiting for expensive endpoints (login, signup).
+
+Each rule keys requests by something (client IP, submitted email) and gives every key a bucket of
+`capacity` tokens refilled at `capacity / period` tokens per second; a request spends one token or
+is rejected with 429 and a Retry-After telling the client when the next token will be available.
+
+Buckets live in-process by default. Setting RATE_LIMIT_STORAGE_URL to a redis:// URL shares them
+between workers and hosts (requires the optional `redis` package; any Redis-compatible server works).
+"""
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Optional, Tuple
+from flask import Flask, current_app, request
+from .route_utils import make_response
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(rate: str) -> Tuple[int, float]:
+    """Parse "<count>/<second|minute|hour|day>" into (capacity, period in seconds)."""
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(second|minute|hour|day)s?\s*", rate or "")
+    if not match or int(match.group(1)) < 1:
+        raise ValueError(f"Invalid rate limit {rate!r}; expected e.g. '10/minute'")
+    return int(match.group(1)), float(_PERIODS[match.group(2)])
+
+
+class MemoryBucketStore:
+    """
+    Per-process buckets, kept in least-recently-used order and capped at `max_keys`. Past the cap
+    the least recently touched bucket is forgotten, which can only hand that key a full bucket early.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, period: float) -> float:
+        """Spend a token from `key`'s bucket; return 0 if allowed, else seconds until one is available."""
+        now = time.monotonic()
+        refill_rate = capacity / period
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / refill_rate
+            if tokens >= 1:
+                tokens -= 1
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class RedisBucketStore:
+    """Buckets shared through Redis; the refill-and-take step runs atomically as a Lua script."""
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local period = tonumber(ARGV[2])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+    local now = redis.call('TIME')
+    now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated_at = tonumber(bucket[2]) or now
+    local rate = capacity / period
+    tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+    local wait = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        wait = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(period))
+    return tostring(wait)
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_STORAGE_URL points at Redis but the 'redis' package is not installed") from e
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(self.SCRIPT)
+        self._redis_error = redis.RedisError
+
+    def take(self, key: str, capacity: int, period: float) -> float:
+        """Spend a token like MemoryBucketStore.take; while Redis is unreachable every request is allowed."""
+        try:
+            return float(self._take(keys=[self.prefix + key], args=[capacity, period]))
+        except self._redis_error as e:
+            logger.warning(f"Rate limit store unavailable, allowing request: {e}")
+            return 0.0
+
+
+def init_rate_limiter(app: Flask) -> None:
+    url = app.config.get("RATE_LIMIT_STORAGE_URL") or "memory://"
+    if url.startswith("memory://"):
+        store = MemoryBucketStore()
+    elif url.startswith(("redis://", "rediss://", "unix://")):
+        store = RedisBucketStore(url)
+    else:
+        raise ValueError(f"Unsupported RATE_LIMIT_STORAGE_URL: {url}")
+    app.extensions["rate_limit_store"] = store
+
+
+def client_ip() -> str:
+    """Client address as seen by the app (put ProxyFix in front when running behind a proxy)."""
+    return request.remote_addr or "unknown"
+
+
+def submitted_email() -> Optional[str]:
+    """The normalized email in the JSON body, if any."""
+    data = request.get_json(silent=True, force=True) or {}
+    email = data.get("email") if isinstance(data, dict) else None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+def rate_limit(name: str, key_func: Callable[[], Optional[str]], rate_config: str):
+    """
+    Limit the decorated route to the rate in app.config[`rate_config`] per key_func() value.
+    Requests whose key is None are not counted against this rule.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            store = current_app.extensions.get("rate_limit_store")
+            if store is None or not current_app.config.get("RATE_LIMIT_ENABLED", True):
+                return func(*args, **kwargs)
+
+            key = key_func()
+            if key is not None:
+                capacity, period = parse_rate(current_app.config[rate_config])
+                wait = store.take(f"{name}:{key}", capacity, period)
+                if wait > 0:
+                    retry_after = max(1, math.ceil(wait))
+                    return make_response({
+                        "status": "error",
+                        "message": f"Too many requests, retry in {retry_after} seconds",
+                        "error_code": "RATE_LIMITED"
+                    }, 429, {"Retry-After": str(retry_after)})
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,10 +1,12 @@
-from typing import Dict, Any
-from flask import Response, json
+from typing import Dict, Any, Optional
+from flask import Response
+from .json_utils import dumps_bytes
 
-def make_response(payload: Dict[str, Any], status: int = 200) -> Response:
+def make_response(payload: Dict[str, Any], status: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
     """Helper to return JSON responses consistently."""
     return Response(
-        response=json.dumps(payload),
+        response=dumps_bytes(payload),
         status=status,
-        mimetype="application/json"
+        mimetype="application/json",
+        headers=headers
     )
\ No newline at end of file
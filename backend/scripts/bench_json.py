@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of list-response serialization: the old path (row -> Student.from_dict -> to_dict
+-> Flask's stdlib JSON provider) against the new one (row dict -> orjson provider), for 100-row and
+10k-row student pages. No database is needed; rows are synthesized.
+
+Run from the backend directory:
+    python scripts/bench_json.py
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Importing the models builds the storage client; it is never called here
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SECRET_KEY", "unused")
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from app.models.student import Student  # noqa: E402
+from app.utils.json_utils import OrjsonProvider, orjson  # noqa: E402
+
+KEYS = ["id_number", "first_name", "last_name", "year_level", "gender", "program_code", "photo_path",
+        "row_version"]
+NAMES = ["Liam", "Olivia", "Noah", "Emma", "Mateo", "Sofía", "Lucas", "Chloé", "Santos", "Reyes"]
+
+
+def make_rows(n: int):
+    random.seed(n)
+    return [
+        (f"{random.randint(2021, 2024)}-{i:04d}", random.choice(NAMES), random.choice(NAMES),
+         random.randint(1, 5), random.choice(["MALE", "FEMALE", "OTHER"]), "BSCS", None, i)
+        for i in range(n)
+    ]
+
+
+def envelope(data):
+    return {"status": "success", "message": f"Found {len(data)} students", "data": data,
+            "meta": {"page": 1, "per_page": len(data), "total": len(data), "next_cursor": None, "prev_cursor": None}}
+
+
+def old_path(provider, rows):
+    students = [Student.from_dict(dict(zip(KEYS, row))) for row in rows]
+    return provider.dumps(envelope([s.to_dict() for s in students])).encode("utf-8")
+
+
+def new_path(provider, rows):
+    return provider.dumps_bytes(envelope([dict(zip(KEYS, row)) for row in rows]))
+
+
+def bench(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if orjson is None:
+        sys.exit("orjson is not installed; nothing to compare against")
+
+    app = Flask(__name__)
+    stdlib, fast = DefaultJSONProvider(app), OrjsonProvider(app)
+
+    for n in (100, 10_000):
+        rows = make_rows(n)
+        assert stdlib.loads(old_path(stdlib, rows)) == fast.loads(new_path(fast, rows))
+        before = bench(lambda: old_path(stdlib, rows), args.repeat)
+        after = bench(lambda: new_path(fast, rows), args.repeat)
+        print(f"{n:>6} rows  models+stdlib {before:8.3f} ms   dicts+orjson {after:8.3f} ms   {before / after:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark password verification under a concurrent login burst, with and without the bounded
+hashing pool (app/utils/password_hashing.py).
+
+A burst of `--logins` concurrent verifications runs alongside a stream of cheap "read" requests.
+"inline" verifies on every request thread, as the app used to; "pooled" sends them through
+PasswordHasher, which runs at most `--workers` hashes at once and rejects overflow with the
+503/Retry-After signal. Reported: login throughput, rejected logins and read-request latency.
+
+Run from the backend directory:
+    python scripts/bench_login.py
+    python scripts/bench_login.py --method pbkdf2:sha256:600000 --threads 32 --workers 2
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import check_password_hash, generate_password_hash  # noqa: E402
+from app.utils.password_hashing import PasswordHasher, PasswordHasherBusy  # noqa: E402
+
+
+def read_request() -> float:
+    """A cheap request: a little pure-Python work, timed end to end."""
+    started = time.perf_counter()
+    sum(i * i for i in range(2000))
+    return (time.perf_counter() - started) * 1000
+
+
+def run(label: str, verify, logins: int, threads: int, reads: int) -> None:
+    read_latencies = []
+    rejected = 0
+    accepted = 0
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def login() -> None:
+        nonlocal rejected, accepted
+        try:
+            verify()
+            with lock:
+                accepted += 1
+        except PasswordHasherBusy:
+            with lock:
+                rejected += 1
+
+    def reader() -> None:
+        while not done.is_set() and len(read_latencies) < reads:
+            read_latencies.append(read_request())
+            time.sleep(0.002)
+
+    reader_thread = threading.Thread(target=reader)
+    started = time.perf_counter()
+    reader_thread.start()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for _ in range(logins):
+            pool.submit(login)
+    elapsed = time.perf_counter() - started
+    done.set()
+    reader_thread.join()
+
+    latencies = sorted(read_latencies) or [0.0]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{label:<7} {accepted / elapsed:8.1f} logins/s  accepted={accepted:<4} rejected={rejected:<4} "
+          f"read p50={statistics.median(latencies):7.2f}ms p99={p99:7.2f}ms  ({elapsed:.2f}s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--method", default="scrypt")
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=32, help="concurrent request threads")
+    parser.add_argument("--workers", type=int, default=2, help="hashing pool size")
+    parser.add_argument("--queue", type=int, default=16, help="hashing pool queue limit")
+    parser.add_argument("--reads", type=int, default=500)
+    args = parser.parse_args()
+
+    pwhash = generate_password_hash("correct horse battery staple", args.method)
+    print(f"method={pwhash.split('$', 1)[0]} logins={args.logins} threads={args.threads} "
+          f"workers={args.workers} queue={args.queue} cpus={os.cpu_count()}")
+
+    run("inline", lambda: check_password_hash(pwhash, "correct horse battery staple"),
+        args.logins, args.threads, args.reads)
+
+    hasher = PasswordHasher(method=args.method, workers=args.workers, queue_size=args.queue)
+    run("pooled", lambda: hasher.verify(pwhash, "correct horse battery staple"),
+        args.logins, args.threads, args.reads)
+
+
+if __name__ == "__main__":
+    main()
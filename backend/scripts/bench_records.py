@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Measure time and memory of the get_all_students read path, before and after the slotted
+row records (StudentRecord in app/models/student.py).
+
+"before" turns every row into a dict, then a Student instance, then another dict via to_dict(),
+as Student.get_all and the service used to; "after" builds one slotted StudentRecord per row and
+hands the list to the JSON provider as is. Memory is the tracemalloc peak while the page is held.
+
+Run from the backend directory:
+    python scripts/bench_records.py                 # 10k synthesized rows, no database
+    python scripts/bench_records.py --db            # rows fetched from the configured database
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Importing the models builds the storage client; it is never called here
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SECRET_KEY", "unused")
+
+from flask import Flask  # noqa: E402
+from app.models.student import Student, StudentRecord  # noqa: E402
+from app.utils.json_utils import OrjsonProvider, orjson  # noqa: E402
+
+KEYS = ["id_number", "first_name", "last_name", "year_level", "gender", "program_code", "photo_path",
+        "row_version"]
+
+
+def synthesized_rows(n: int):
+    return [(f"2024-{i:04d}", f"First{i % 97}", f"Last{i % 89}", i % 5 + 1, "FEMALE", "BSCS", None, i)
+            for i in range(n)]
+
+
+def database_rows():
+    from app import create_app
+    from app.db.database import get_connection
+    from sqlalchemy import text
+
+    app = create_app()
+    with app.app_context():
+        return [tuple(row) for row in get_connection().execute(
+            text(f"SELECT {Student.SELECT_COLUMNS} FROM students ORDER BY last_name, first_name")
+        ).all()]
+
+
+def before(rows):
+    students = [Student.from_dict(dict(zip(KEYS, row))) for row in rows]
+    return [student.to_dict() for student in students]
+
+
+def after(rows):
+    return [StudentRecord(*row) for row in rows]
+
+
+def measure(label: str, build, rows, provider, repeat: int) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        provider.dumps_bytes(build(rows))
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    page = build(rows)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del page
+    print(f"  {label:<7} {best * 1000:8.2f} ms (build + serialize)   held {held / 1024:8.0f} KiB   "
+          f"peak {peak / 1024:8.0f} KiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--db", action="store_true", help="fetch rows from the configured database")
+    args = parser.parse_args()
+
+    if orjson is None:
+        sys.exit("orjson is not installed")
+
+    rows = database_rows() if args.db else synthesized_rows(args.rows)
+    provider = OrjsonProvider(Flask(__name__))
+    assert provider.loads(provider.dumps_bytes(before(rows))) == provider.loads(provider.dumps_bytes(after(rows)))
+
+    print(f"get_all_students over {len(rows)} rows")
+    measure("before", before, rows, provider, args.repeat)
+    measure("after", after, rows, provider, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
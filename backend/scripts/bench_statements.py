@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Measure the per-query Python overhead of building SQL statements, before and after the
+statement registry (app/db/statements.py).
+
+"before" rebuilds the query with f-strings, inlines LIMIT/OFFSET, wraps it in text() and
+sniffs the keyword, as execute_sql used to; "after" looks the shape up in the registry and binds
+the page as parameters.
+
+Run from the backend directory:
+    python scripts/bench_statements.py              # statement construction only, no database
+    python scripts/bench_statements.py --db         # also execute against the configured database
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+from app.db.statements import StatementRegistry  # noqa: E402
+
+COLUMNS = "id_number, first_name, last_name, year_level, gender, program_code, photo_path"
+FILTERS = "WHERE (first_name ILIKE :token_0 OR last_name ILIKE :token_1 OR id_number ILIKE :token_2 OR program_code ILIKE :token_3)"
+SORT = "ORDER BY last_name ASC, first_name ASC"
+PARAMS = {f"token_{i}": "%an%" for i in range(4)}
+
+# Primary-key lookup: cheap enough on the server that the client-side overhead is visible
+PK_FILTERS = "WHERE id_number = :id_number"
+PK_PARAMS = {"id_number": "0000-0000"}
+
+
+def build_before(page: int, page_size: int, filters: str = FILTERS, params: dict = PARAMS):
+    query = f"""
+        SELECT {COLUMNS}, COUNT(*) OVER() AS total_count
+        FROM students
+        {filters}
+        {SORT}
+        LIMIT {page_size} OFFSET {(page - 1) * page_size}
+    """
+    statement = text(query)
+    statement.text.strip().lower().startswith(("insert", "update", "delete", "create", "drop", "alter"))
+    return statement, params
+
+
+def make_build_after(registry: StatementRegistry):
+    def build_after(page: int, page_size: int, filters: str = FILTERS, params: dict = PARAMS):
+        params = dict(params, limit=page_size, offset=(page - 1) * page_size)
+        statement = registry.get(("Student", "search_with_count", COLUMNS, filters, SORT, "paged"), lambda: f"""
+            SELECT {COLUMNS}, COUNT(*) OVER() AS total_count
+            FROM students
+            {filters}
+            {SORT}
+            LIMIT :limit OFFSET :offset
+        """)
+        return statement, params
+    return build_after
+
+
+def timed(label: str, fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        fn(i % 50 + 1)
+    per_call_us = (time.perf_counter() - started) / iterations * 1e6
+    print(f"  {label:<8} {per_call_us:9.2f} us/query")
+    return per_call_us
+
+
+def bench_construction(iterations: int) -> None:
+    print(f"Statement construction ({iterations} queries over 50 pages)")
+    build_after = make_build_after(StatementRegistry())
+    before = timed("before", lambda page: build_before(page, 20), iterations)
+    after = timed("after", lambda page: build_after(page, 20), iterations)
+    print(f"  speedup  {before / after:9.1f}x")
+
+
+def bench_database(iterations: int) -> None:
+    from app import create_app
+    from app.db.database import get_connection
+
+    app = create_app()
+    build_after = make_build_after(StatementRegistry())
+    with app.app_context():
+        conn = get_connection()
+        # Compile + execute + fetch of a primary-key lookup; distinct inlined pages defeat
+        # SQLAlchemy's compiled cache on the "before" path
+        print(f"Execute against database ({iterations} queries over 50 pages)")
+        before = timed("before", lambda page: conn.execute(*build_before(page, 20, PK_FILTERS, PK_PARAMS)).all(), iterations)
+        after = timed("after", lambda page: conn.execute(*build_after(page, 20, PK_FILTERS, PK_PARAMS)).all(), iterations)
+        print(f"  saved    {before - after:9.2f} us/query")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--db", action="store_true", help="also execute the queries against the configured database")
+    args = parser.parse_args()
+
+    bench_construction(args.iterations)
+    if args.db:
+        bench_database(max(args.iterations // 10, 100))
+
+
+if __name__ == "__main__":
+    main()
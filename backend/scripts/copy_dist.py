@@ -3,20 +3,32 @@
 Copy build artifacts produced by Vite from backend/dist -> backend/static (assets)
 and backend/dist/index.html -> backend/templates/index.html
 
+Text assets and index.html also get precompressed .gz (and .br, when the optional brotli
+package is installed) siblings, which the app serves as-is to clients that accept them.
+
 Run from frontend directory via:
     npm run build:flask
 which calls: vite build && python ../backend/scripts/copy_dist.py
 """
 
+import gzip
 import os
 import shutil
 import sys
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # backend/
 DIST_DIR = os.path.join(BASE_DIR, "dist")        # backend/dist (vite outDir)
 STATIC_DIR = os.path.join(BASE_DIR, "static")    # backend/static
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")  # backend/templates
 
+PRECOMPRESS_EXTENSIONS = {".html", ".js", ".mjs", ".css", ".svg", ".json", ".webmanifest", ".txt", ".map", ".ico"}
+PRECOMPRESS_MIN_SIZE = 1024  # matches the default COMPRESSION_MIN_SIZE
+
 def ensure_dir(p):
     if not os.path.exists(p):
         os.makedirs(p, exist_ok=True)
@@ -68,6 +80,42 @@ def move_other_files():
                 shutil.rmtree(dest)
             shutil.move(src, dest)
 
+def write_if_smaller(path, data, size):
+    if len(data) < size:
+        with open(path, "wb") as f:
+            f.write(data)
+        return True
+    return False
+
+def precompress_file(path):
+    # drop siblings from an earlier build so a stale .br/.gz is never served
+    for suffix in (".gz", ".br"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    if os.path.splitext(path)[1].lower() not in PRECOMPRESS_EXTENSIONS:
+        return
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < PRECOMPRESS_MIN_SIZE:
+        return
+
+    # mtime=0 keeps the output reproducible across builds
+    written = [".gz"] if write_if_smaller(path + ".gz", gzip.compress(data, 9, mtime=0), len(data)) else []
+    if brotli is not None and write_if_smaller(path + ".br", brotli.compress(data, quality=11), len(data)):
+        written.append(".br")
+    if written:
+        print(f"Precompressed {path} ({', '.join(written)})")
+
+def precompress():
+    if brotli is None:
+        print("brotli not installed; writing .gz siblings only.")
+    for root in (STATIC_DIR, TEMPLATES_DIR):
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                if not name.endswith((".gz", ".br")):
+                    precompress_file(os.path.join(dirpath, name))
+
 def cleanup():
     if os.path.exists(DIST_DIR):
         try:
@@ -84,6 +132,7 @@ def main():
     move_assets()
     move_other_files()
     copy_index()
+    precompress()
     cleanup()
     print("✅ Build artifacts copied to backend (static + templates).")
 
@@ -0,0 +1,70 @@
+"""
+Fixtures for tests that run against PostgreSQL.
+
+The database is the one named by the DB_* environment variables the app reads; point them at a
+scratch database. The schema is bootstrapped and migrated if needed, and the tests are skipped
+when the database cannot be reached.
+"""
+import os
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+# Importing the app builds the storage client; the tests never call it
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SECRET_KEY", "unused")
+
+from app import create_app  # noqa: E402
+from app.db.bootstrap import bootstrap_schema_if_needed  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.config.update(TESTING=True, JWT_COOKIE_CSRF_PROTECT=False, RATE_LIMIT_ENABLED=False)
+    try:
+        with app.extensions["db_engine"].connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except OperationalError as e:
+        pytest.skip(f"Database unavailable: {e}")
+
+    with app.app_context():
+        bootstrap_schema_if_needed()
+    return app
+
+
+@pytest.fixture
+def execute(app):
+    """Run one SQL statement on its own connection and commit it."""
+    def run(sql, **params):
+        with app.extensions["db_engine"].begin() as conn:
+            return conn.execute(text(sql), params)
+    return run
+
+
+@pytest.fixture
+def admin(app, execute):
+    """An admin user, removed again after the test."""
+    from app.models import User
+
+    execute("DELETE FROM users WHERE username = 'test_admin'")
+    user_id = execute(
+        "INSERT INTO users (username, email, password_hash, role) "
+        "VALUES ('test_admin', 'test_admin@example.com', 'unused', 'admin') RETURNING user_id"
+    ).scalar()
+    with app.app_context():
+        user = User.find_by_id(user_id)
+    yield user
+    execute("DELETE FROM users WHERE user_id = :user_id", user_id=user_id)
+
+
+@pytest.fixture
+def client(app, admin):
+    """A test client signed in as `admin`."""
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        token = create_access_token(identity=str(admin.user_id), additional_claims=admin.token_claims())
+    client = app.test_client()
+    client.set_cookie("access_token_cookie", token)
+    return client
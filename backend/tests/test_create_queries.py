@@ -0,0 +1,100 @@
+"""
+Creates detect duplicate keys and missing references from the INSERT itself, so every create,
+successful or rejected, runs exactly one SQL statement.
+"""
+import pytest
+from app.utils.admin_required import current_token_version
+from app.utils.query_count import assert_query_count
+
+COLLEGE = "TSTC1"
+PROGRAM = "TSTP1"
+STUDENT = {
+    "id_number": "2099-0001",
+    "first_name": "Test",
+    "last_name": "Student",
+    "year_level": 1,
+    "gender": "MALE",
+    "program_code": PROGRAM,
+}
+
+
+@pytest.fixture
+def reference_rows(execute):
+    """A college and a program for the created rows to point at; test rows are removed afterwards."""
+    def cleanup():
+        execute("DELETE FROM students WHERE id_number = :id_number", id_number=STUDENT["id_number"])
+        execute("DELETE FROM programs WHERE program_code IN ('TSTP1', 'TSTP2')")
+        execute("DELETE FROM colleges WHERE college_code IN ('TSTC1', 'TSTC2')")
+        execute("DELETE FROM users WHERE username = 'test_user'")
+
+    cleanup()
+    execute("INSERT INTO colleges (college_code, college_name) VALUES (:code, 'Test College')", code=COLLEGE)
+    execute(
+        "INSERT INTO programs (program_code, program_name, college_code) VALUES (:code, 'Test Program', :college)",
+        code=PROGRAM, college=COLLEGE
+    )
+    yield
+    cleanup()
+
+
+def test_create_student_runs_one_query(app, client, reference_rows):
+    with assert_query_count(1, app):
+        response = client.post("/api/students", json=STUDENT)
+    assert response.status_code == 201
+
+
+def test_duplicate_student_is_reported_by_the_insert(app, client, reference_rows):
+    client.post("/api/students", json=STUDENT)
+
+    with assert_query_count(1, app):
+        response = client.post("/api/students", json=STUDENT)
+    assert response.status_code == 409
+    assert response.get_json()["error_code"] == "STUDENT_ID_EXISTS"
+
+
+def test_missing_program_is_reported_by_the_insert(app, client, reference_rows):
+    with assert_query_count(1, app):
+        response = client.post("/api/students", json=dict(STUDENT, program_code="NOPROG"))
+    assert response.status_code == 400
+    assert response.get_json()["error_code"] == "PROGRAM_NOT_FOUND"
+    assert "NOPROG" in response.get_json()["message"]
+
+
+def test_create_program_runs_one_query(app, client, reference_rows):
+    program = {"program_code": "TSTP2", "program_name": "Second Program", "college_code": COLLEGE}
+    with assert_query_count(1, app):
+        response = client.post("/api/programs", json=program)
+    assert response.status_code == 201
+
+    with assert_query_count(1, app):
+        response = client.post("/api/programs", json=program)
+    assert response.status_code == 409
+    assert response.get_json()["error_code"] == "PROGRAM_CODE_EXISTS"
+
+
+def test_create_college_runs_one_query(app, client, reference_rows):
+    college = {"college_code": "TSTC2", "college_name": "Second College"}
+    with assert_query_count(1, app):
+        response = client.post("/api/colleges", json=college)
+    assert response.status_code == 201
+
+    with assert_query_count(1, app):
+        response = client.post("/api/colleges", json=college)
+    assert response.status_code == 409
+    assert response.get_json()["error_code"] == "COLLEGE_CODE_EXISTS"
+
+
+def test_create_user_runs_one_query(app, client, admin, reference_rows):
+    user = {"username": "test_user", "email": "test_user@example.com", "password": "secret123", "role": "user"}
+    # The admin check reads the token epoch once per few seconds; warm it outside the count
+    with app.app_context():
+        current_token_version(str(admin.user_id))
+
+    with assert_query_count(1, app):
+        response = client.post("/api/users", json=user)
+    assert response.status_code == 201
+
+    with assert_query_count(1, app):
+        response = client.post("/api/users", json=dict(user, email="other@example.com"))
+    assert response.status_code == 409
+    assert response.get_json()["error_code"] == "USERNAME_EXISTS"
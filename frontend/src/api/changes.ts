@@ -0,0 +1,44 @@
+import { BASE_URL } from "./index";
+
+export type ChangeTable = "students" | "programs" | "colleges" | "users";
+
+// Row-level change pushed by /changes/stream (see backend db/migrations/0007_row_change_notify.sql)
+export interface RowChange {
+    table: ChangeTable;
+    op: "insert" | "update" | "delete";
+    key: string | number;
+    old_key?: string | number;  // set when an update changed the primary key
+    row?: Record<string, any>;  // absent on deletes and on rows too large to push
+}
+
+export interface ChangeStreamHandlers {
+    onChange: (change: RowChange) => void;
+    // Events may have been missed (reconnect, or the server says we fell behind): refetch
+    onResync: () => void;
+    onStatus?: (live: boolean) => void;
+}
+
+export function openChangeStream(handlers: ChangeStreamHandlers): () => void {
+    const source = new EventSource(`${BASE_URL}/changes/stream`, { withCredentials: true });
+    let opened = false;
+
+    source.onopen = () => {
+        handlers.onStatus?.(true);
+        // Every reconnect may have skipped events (the server also ends streams periodically)
+        if (opened) handlers.onResync();
+        opened = true;
+    };
+    source.onerror = () => {
+        // The browser retries on its own unless the server refused the stream (e.g. 401/503)
+        handlers.onStatus?.(false);
+    };
+    source.addEventListener("change", (event) => {
+        handlers.onChange(JSON.parse((event as MessageEvent).data));
+    });
+    source.addEventListener("resync", () => handlers.onResync());
+
+    return () => {
+        source.close();
+        handlers.onStatus?.(false);
+    };
+}
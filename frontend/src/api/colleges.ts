@@ -1,19 +1,32 @@
 import { apiClient } from "./index";
-import type { College, Paginated } from "../types";
+import type { College, Paginated, Delta } from "../types";
 
 export async function listColleges(params: Record<string, any>): Promise<Paginated<College>> {
     const { data } = await apiClient.get("/colleges", { params });
     return data as Paginated<College>;
 }
 
+export async function suggestColleges(q: string, limit = 10): Promise<Pick<College, "college_code" | "college_name">[]> {
+    const { data } = await apiClient.get("/colleges/suggest", { params: { q, limit } });
+    return data.data;
+}
+
 export async function createCollege(college: College) {
     return apiClient.post("/colleges", college);
 }
 
-export async function updateCollege(college_code: string, updates: Partial<College>) {
-    return apiClient.put(`/colleges/${college_code}`, updates);
+// With `row_version` (as last read), the update is refused with 409 VERSION_CONFLICT if the row changed since
+export async function updateCollege(college_code: string, updates: Partial<College>, row_version?: number) {
+    const headers = row_version === undefined ? undefined : { "If-Match": `"${row_version}"` };
+    return apiClient.put(`/colleges/${college_code}`, updates, { headers });
 }
 
 export async function deleteCollege(college_code: string) {
     return apiClient.delete(`/colleges/${college_code}`);
 }
+
+// Rows changed and keys deleted since a previous delta's `version` (0 for everything)
+export async function getCollegeChanges(since = 0): Promise<Delta<College>> {
+    const { data } = await apiClient.get("/colleges/delta", { params: { since } });
+    return data.data as Delta<College>;
+}
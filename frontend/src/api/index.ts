@@ -1,7 +1,7 @@
 import axios, { AxiosError } from "axios";
 import Cookies from "js-cookie";
 
-const BASE_URL = "http://127.0.0.1:5000/api"
+export const BASE_URL = "http://127.0.0.1:5000/api"
 
 export const apiClient = axios.create({
     baseURL: BASE_URL,
@@ -1,19 +1,32 @@
 import { apiClient } from "./index";
-import type { Program, Paginated } from "../types";
+import type { Program, Paginated, Delta } from "../types";
 
 export async function listPrograms(params: Record<string, any>): Promise<Paginated<Program>> {
     const { data } = await apiClient.get("/programs", { params });
     return data as Paginated<Program>;
 }
 
+export async function suggestPrograms(q: string, limit = 10): Promise<Pick<Program, "program_code" | "program_name">[]> {
+    const { data } = await apiClient.get("/programs/suggest", { params: { q, limit } });
+    return data.data;
+}
+
 export async function createProgram(program: Program) {
     return apiClient.post("/programs", program);
 }
 
-export async function updateProgram(program_code: string, updates: Partial<Program>) {
-    return apiClient.put(`/programs/${program_code}`, updates);
+// With `row_version` (as last read), the update is refused with 409 VERSION_CONFLICT if the row changed since
+export async function updateProgram(program_code: string, updates: Partial<Program>, row_version?: number) {
+    const headers = row_version === undefined ? undefined : { "If-Match": `"${row_version}"` };
+    return apiClient.put(`/programs/${program_code}`, updates, { headers });
 }
 
 export async function deleteProgram(program_code: string) {
     return apiClient.delete(`/programs/${program_code}`);
 }
+
+// Rows changed and keys deleted since a previous delta's `version` (0 for everything)
+export async function getProgramChanges(since = 0): Promise<Delta<Program>> {
+    const { data } = await apiClient.get("/programs/delta", { params: { since } });
+    return data.data as Delta<Program>;
+}
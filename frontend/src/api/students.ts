@@ -1,11 +1,16 @@
 import { apiClient } from "./index";
-import type { Student, Paginated } from "../types";
+import type { Student, Paginated, Delta } from "../types";
 
 export async function listStudents(params: Record<string, any>): Promise<Paginated<Student>> {
     const { data } = await apiClient.get("/students", { params });
     return data as Paginated<Student>;
 }
 
+export async function suggestStudents(q: string, limit = 10): Promise<Pick<Student, "id_number" | "first_name" | "last_name">[]> {
+    const { data } = await apiClient.get("/students/suggest", { params: { q, limit } });
+    return data.data;
+}
+
 export async function getStudent(id_number: string) {
     const { data } = await apiClient.get(`/students/${id_number}`);
     return data.data as Student;
@@ -15,14 +20,24 @@ export async function createStudent(student: Student) {
     return apiClient.post("/students", student);
 }
 
-export async function updateStudent(id_number: string, updates: Partial<Student>) {
-    return apiClient.put(`/students/${id_number}`, updates);
+// With `row_version` (as last read), the update is refused with 409 VERSION_CONFLICT if the row changed since
+export async function updateStudent(id_number: string, updates: Partial<Student>, row_version?: number) {
+    const headers = row_version === undefined ? undefined : { "If-Match": `"${row_version}"` };
+    return apiClient.put(`/students/${id_number}`, updates, { headers });
 }
 
 export async function deleteStudent(id_number: string) {
     return apiClient.delete(`/students/${id_number}`);
 }
 
+export async function batchUpdateStudents(ids: string[], updates: Partial<Pick<Student, "year_level" | "gender" | "program_code">>) {
+    return apiClient.patch(`/students/batch`, { ids, updates });
+}
+
+export async function batchDeleteStudents(ids: string[]) {
+    return apiClient.delete(`/students/batch`, { data: { ids } });
+}
+
 export async function getPhotoUploadUrl(id_number: string, filename: string, content_type: string) {
     const { data } = await apiClient.post(`/students/${id_number}/avatar/photo-upload-url`, {
         filename,
@@ -48,4 +63,10 @@ export async function getAvatarUrl(id_number: string) {
 export async function deleteAvatar(id_number: string) {
     const { data } = await apiClient.delete(`/students/${id_number}/avatar`);
     return data;
-}
\ No newline at end of file
+}
+
+// Rows changed and keys deleted since a previous delta's `version` (0 for everything)
+export async function getStudentChanges(since = 0): Promise<Delta<Student>> {
+    const { data } = await apiClient.get("/students/delta", { params: { since } });
+    return data.data as Delta<Student>;
+}
@@ -1,5 +1,5 @@
 import { apiClient } from "./index";
-import type { User, Paginated } from "../types";
+import type { User, Paginated, Delta } from "../types";
 
 export async function listUsers(params: Record<string, any>): Promise<Paginated<User>> {
     const { data } = await apiClient.get("/users", { params });
@@ -22,3 +22,9 @@ export async function updateUser(user_id: number, updates: Partial<User>) {
 export async function deleteUser(user_id: number) {
     return apiClient.delete(`/users/${user_id}`);
 }
+
+// Rows changed and keys deleted since a previous delta's `version` (0 for everything)
+export async function getUserChanges(since = 0): Promise<Delta<User>> {
+    const { data } = await apiClient.get("/users/delta", { params: { since } });
+    return data.data as Delta<User>;
+}
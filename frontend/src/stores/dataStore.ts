@@ -3,6 +3,21 @@ import { listStudents } from '../api/students'
 import { listPrograms } from '../api/programs'
 import { listColleges } from '../api/colleges'
 import { listUsers } from '../api/users'
+import { openChangeStream } from '../api/changes'
+import type { ChangeTable, RowChange } from '../api/changes'
+
+// Primary key of each collection, matching the `key` of change events
+const KEY_FIELDS: Record<ChangeTable, string> = {
+    students: 'id_number',
+    programs: 'program_code',
+    colleges: 'college_code',
+    users: 'user_id',
+}
+
+// Inserts can land anywhere in a sorted page, so they trigger a refetch; bursts share one
+const REFRESH_DELAY_MS = 250
+const pendingRefresh: Partial<Record<ChangeTable, ReturnType<typeof setTimeout>>> = {}
+let closeChangeStream: (() => void) | null = null
 
 export const useDataStore = defineStore('data', {
     state: () => ({
@@ -38,6 +53,8 @@ export const useDataStore = defineStore('data', {
             users: false,
         },
         version: 0,
+        // true while the change stream is connected and keeping loaded pages current
+        live: false,
     }),
     actions: {
         // fetch all with optional params map: { students?: params, programs?: params, colleges?: params }
@@ -137,6 +154,72 @@ export const useDataStore = defineStore('data', {
             this.colleges = this.colleges.filter((c: any) => c.college_code !== code)
         },
 
+        // open the server change stream once; row changes are then applied to the loaded pages
+        connectChanges() {
+            if (closeChangeStream) return
+            closeChangeStream = openChangeStream({
+                onChange: (change) => this.applyChange(change),
+                onResync: () => this.refreshLoaded(),
+                onStatus: (live) => { this.live = live },
+            })
+        },
+
+        disconnectChanges() {
+            closeChangeStream?.()
+            closeChangeStream = null
+            this.live = false
+        },
+
+        applyChange(change: RowChange) {
+            const type = change.table
+            if (!(type in KEY_FIELDS) || !this.loaded[type]) return
+            const keyField = KEY_FIELDS[type]
+            const items = this[type] as any[]
+            const key = change.old_key ?? change.key
+            const idx = items.findIndex((item: any) => item[keyField] === key)
+
+            if (change.op === 'delete') {
+                if (idx === -1) return
+                items.splice(idx, 1)
+                if (this.meta[type]) this.meta[type].total = Math.max(0, this.meta[type].total - 1)
+            } else if (change.op === 'update' && change.row && change.old_key === undefined) {
+                if (idx === -1) return
+                // keep only the fields the list already shows
+                const current = items[idx]
+                const next = { ...current }
+                for (const field of Object.keys(current)) {
+                    if (field in change.row) next[field] = change.row[field]
+                }
+                items.splice(idx, 1, next)
+            } else {
+                this.scheduleRefresh(type)
+            }
+        },
+
+        scheduleRefresh(type: ChangeTable) {
+            if (pendingRefresh[type]) return
+            pendingRefresh[type] = setTimeout(() => {
+                delete pendingRefresh[type]
+                this.refresh(type).catch((err) => console.error(`Failed to refresh ${type}:`, err))
+            }, REFRESH_DELAY_MS)
+        },
+
+        // refetch a loaded collection with its last params (cheap 304s when nothing changed)
+        async refresh(type: ChangeTable) {
+            if (!this.loaded[type]) return
+            const params = this.params[type]
+            if (type === 'students') await this.fetchStudents(params, true)
+            else if (type === 'programs') await this.fetchPrograms(params, true)
+            else if (type === 'colleges') await this.fetchColleges(params, true)
+            else await this.fetchUsers(params, true)
+        },
+
+        refreshLoaded() {
+            for (const type of Object.keys(KEY_FIELDS) as ChangeTable[]) {
+                this.scheduleRefresh(type)
+            }
+        },
+
         bumpVersion() {
             this.version++
         },
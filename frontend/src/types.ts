@@ -7,17 +7,20 @@ export interface Student {
     gender: Gender;
     program_code: string;   //FK to Program.program_code
     photo_path: string | null; // Path to photo in storage, null if no photo
+    row_version?: number;   // Set on rows read from the API; sent back as If-Match on edit
 }
 
 export interface Program {
     program_code: string;   //e.g., "BSCS"
     program_name: string;   //e.g., "Bachelor of Science in Computer Science"
     college_code: string;   //FK to College.college_code
+    row_version?: number;
 }
 
 export interface College {
     college_code: string;   //e.g., "COE"
     college_name: string;   //e.g., "College of Engineering"
+    row_version?: number;
 }
 
 export interface User {
@@ -37,6 +40,13 @@ export interface Paginated<T> {
     };
 }
 
+// Response of GET /<entity>/delta: pass `version` back as `since` on the next call
+export interface Delta<T> {
+    changed: (T & { row_version: number; updated_at: string })[];
+    deleted: string[];      // primary keys, as text
+    version: number;
+}
+
 export interface TableColumn<T> {
     key: keyof T
     label: string